@@ -0,0 +1,34 @@
+# new_backend_ruminate/api/conversation/context_trace_routes.py
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from new_backend_ruminate.dependencies import get_current_user
+from new_backend_ruminate.domain.user.entities.user import User
+from new_backend_ruminate.infrastructure.tracing.context_trace import context_trace_service
+
+router = APIRouter(prefix="/debug/context-traces")
+
+
+@router.get("")
+async def list_context_traces(
+    conversation_id: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(get_current_user)
+):
+    """List the current user's recent context traces, newest first"""
+    return context_trace_service.list_traces(
+        user_id=current_user.id,
+        conversation_id=conversation_id,
+        limit=limit
+    )
+
+
+@router.get("/{trace_id}")
+async def get_context_trace(
+    trace_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Get a single context trace"""
+    trace = context_trace_service.get_trace(trace_id)
+    if not trace or trace["user_id"] != current_user.id:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return trace
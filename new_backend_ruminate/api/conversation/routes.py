@@ -1,6 +1,6 @@
 # new_backend/api/conversation/routes.py
 import logging
-from fastapi import APIRouter, Depends, BackgroundTasks, Query, Header
+from fastapi import APIRouter, Depends, BackgroundTasks, Query, Header, HTTPException
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
@@ -161,11 +161,22 @@ async def update_message_metadata(
 async def stream(
     msg_id: str, 
     current_user: User = Depends(get_current_user_from_query_token),
-    hub: EventStreamHub = Depends(get_event_hub)
+    hub: EventStreamHub = Depends(get_event_hub),
+    svc: ConversationService = Depends(get_conversation_service),
+    session: AsyncSession = Depends(get_session),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
 ):
+    # Streams replay from the start, so only the conversation's owner may read them
+    if not await svc.get_message_for_user(msg_id, current_user.id, session):
+        raise HTTPException(status_code=404, detail="Message not found")
+
+    # Browsers resend the last seen id on reconnect; the Redis hub replays from there
     async def event_source():
-        async for chunk in hub.register_consumer(msg_id):
-            yield f"data: {chunk}\n\n"
+        async for event_id, chunk in hub.stream_events(msg_id, last_event_id=last_event_id):
+            if event_id:
+                yield f"id: {event_id}\ndata: {chunk}\n\n"
+            else:
+                yield f"data: {chunk}\n\n"
     return StreamingResponse(event_source(), media_type="text/event-stream")
 
 
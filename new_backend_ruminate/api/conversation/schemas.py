@@ -109,6 +109,7 @@ class MessageOut(BaseModel):
     version: int
     role: Role
     content: str
+    status: str = "completed"
     meta_data: Optional[dict] = None
     created_at: datetime
 
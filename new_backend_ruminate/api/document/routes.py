@@ -4,6 +4,7 @@ from datetime import datetime
 from fastapi import APIRouter, File, UploadFile, Depends, HTTPException, BackgroundTasks, Request
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+import hmac
 import io
 import uuid
 
@@ -23,9 +24,11 @@ from new_backend_ruminate.api.document.schemas import (
     ReadingProgressRequest
 )
 from new_backend_ruminate.services.document.service import DocumentService
-from new_backend_ruminate.dependencies import get_session, get_document_service, get_current_user, get_current_user_from_query_token, get_storage_service, get_ingestion_service
+from new_backend_ruminate.dependencies import get_session, get_document_service, get_current_user, get_current_user_from_query_token, get_storage_service, get_ingestion_service, get_pdf_pool, get_event_publisher
 from new_backend_ruminate.domain.user.entities.user import User
-from new_backend_ruminate.utils.file_validator import PDFValidator, SecurityScanner
+from new_backend_ruminate.utils.file_validator import PDFValidator
+from new_backend_ruminate.infrastructure.document_processing.pdf_pool import PdfProcessPool, PdfTaskTimeout
+from new_backend_ruminate.infrastructure.document_processing.marker_client import MARKER_WEBHOOK_CHANNEL
 from new_backend_ruminate.services.document.ingestion_service import IngestionService
 from new_backend_ruminate.config import settings
 
@@ -86,6 +89,7 @@ async def upload_document(
     svc: DocumentService = Depends(get_document_service),
     storage = Depends(get_storage_service),
     ingestion: IngestionService = Depends(get_ingestion_service),
+    pdf_pool: PdfProcessPool = Depends(get_pdf_pool),
 ):
     """
     Upload a PDF document for processing
@@ -108,6 +112,7 @@ async def upload_document(
                     user_id=current_user.id,
                     filename=file.filename,
                     file_stream=file.file,
+                    background=background_tasks,
                 )
             elif "application/json" in content_type:
                 body = await request.json()
@@ -116,6 +121,7 @@ async def upload_document(
                     user_id=current_user.id,
                     filename=s3_request.filename,
                     s3_key=s3_request.s3_key,
+                    background=background_tasks,
                 )
             else:
                 raise HTTPException(status_code=400, detail="Must provide either a file upload or JSON body with s3_key")
@@ -151,12 +157,16 @@ async def upload_document(
     # Check if this is a file upload or S3 URL upload
     if file and file.filename:
         # Traditional file upload path with comprehensive validation
-        # Step 1: Comprehensive PDF validation
-        PDFValidator.validate_and_raise(file)
-        # Step 2: Security scanning and read file content once
+        # Read file content once; validation and security scanning run in the
+        # PDF process pool so a large PDF doesn't block the event loop
         file_content = await file.read()
-        is_safe, security_warning = SecurityScanner.is_pdf_safe(file_content)
-        if not is_safe:
+        try:
+            validation_error, security_warning = await pdf_pool.check_bytes(file_content, file.filename)
+        except PdfTaskTimeout:
+            raise HTTPException(status_code=422, detail="Invalid PDF file: validation timed out")
+        if validation_error:
+            raise HTTPException(status_code=400, detail=f"Invalid PDF file: {validation_error}")
+        if security_warning:
             raise HTTPException(
                 status_code=422, 
                 detail=f"PDF contains potentially dangerous content: {security_warning}"
@@ -659,6 +669,34 @@ async def delete_document(
         raise HTTPException(status_code=500, detail=f"Error deleting document: {str(e)}")
 
 
+@router.post("/marker/webhook")
+async def marker_webhook(
+    request: Request,
+    secret: Optional[str] = None,
+    publisher = Depends(get_event_publisher)
+):
+    """
+    Completion callback from Marker. Relays the request id to whichever
+    process is polling that job, which then fetches the result right away.
+    """
+    expected = settings().marker_webhook_secret
+    if not settings().marker_webhook_url or not expected:
+        raise HTTPException(status_code=404, detail="Not found")
+    if not secret or not hmac.compare_digest(secret, expected):
+        raise HTTPException(status_code=403, detail="Invalid webhook secret")
+    
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    request_id = (payload.get("request_id") or payload.get("job_id")) if isinstance(payload, dict) else None
+    if not request_id:
+        raise HTTPException(status_code=400, detail="Missing request_id")
+    
+    await publisher.publish(MARKER_WEBHOOK_CHANNEL, str(request_id))
+    return {"status": "accepted"}
+
+
 @router.post("/{document_id}/start-processing", response_model=DocumentResponse)
 async def start_document_processing(
     document_id: str,
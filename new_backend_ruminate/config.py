@@ -52,12 +52,41 @@ class _Settings(BaseSettings):
     # ------------------------------------------------------------------ #
     marker_api_url: str = "https://www.datalab.to/api/v1/marker"
     marker_api_key: Optional[str] = None
-    marker_max_poll_attempts: int = 300          # 10 minutes with 2s intervals
+    marker_max_poll_attempts: int = 300          # with marker_poll_interval: give up after 10 minutes
     marker_poll_interval: int = 2                # seconds
+    marker_poll_rate: float = 4.0                # poll requests per second, across all jobs in a process
+    marker_poll_min_interval: float = 1.0        # shortest gap between polls of one job
+    marker_poll_max_interval: float = 30.0       # longest gap between polls of one job
+    marker_poll_backoff: float = 1.6             # interval growth per poll once a job is overdue
+    marker_expected_seconds_base: float = 10.0   # expected Marker time = base + per_page * pages
+    marker_expected_seconds_per_page: float = 1.5
+    marker_webhook_url: Optional[str] = None     # public URL of POST /documents/marker/webhook
+    marker_webhook_secret: Optional[str] = None  # must match the webhook's ?secret= parameter
+    marker_streaming_parse: bool = True          # parse completed results page by page
+    marker_spool_max_memory: int = 1_048_576     # bytes held in memory before spooling to disk
+    marker_connection_limit: int = 64            # pooled connections to Marker, all hosts
+    marker_connection_limit_per_host: int = 16   # pooled connections to any one Marker host
+    marker_keepalive_timeout: float = 30.0       # seconds an idle connection stays open for reuse
+    marker_dns_cache_ttl: int = 300              # seconds resolved Marker addresses are cached
+    marker_connect_timeout: float = 10.0         # seconds to establish a connection
+    marker_request_timeout: float = 300.0        # seconds for a whole request, upload included
     processing_mode: str = "inproc"             # inproc | queue
     upload_pipeline_mode: str = "ingestion"     # inproc | ingestion
     analyze_documents: bool = False              # generate summary/info in worker
+    content_dedup: bool = True                   # store PDFs by SHA-256 and reuse Marker results / summaries
     include_doc_summary_in_prompts: bool = False # include summary/info in prompts
+    chunk_summary_concurrency: int = 4           # concurrent chunk summary LLM calls
+    chunk_claim_timeout: float = 300.0           # seconds before a PROCESSING chunk's claim may be taken over
+    processing_max_in_flight: int = 32           # documents a worker processes at once (across all stages)
+    processing_download_concurrency: int = 8     # per-stage limits, see ProcessingStages
+    processing_validate_concurrency: int = 2     # CPU-bound, runs in the PDF process pool
+    processing_marker_concurrency: int = 32      # jobs submitted to / polling Marker
+    processing_persist_concurrency: int = 4      # DB writes of Marker results
+    processing_persist_batch_pages: int = 25     # pages (with their blocks) inserted per round-trip
+    processing_analysis_concurrency: int = 2     # LLM document summaries
+    pdf_pool_workers: int = 2                    # processes for PDF validation / page counting / splitting
+    pdf_task_timeout: float = 60.0               # seconds before a PDF task is abandoned
+    batch_upload_concurrency: int = 8            # chunk uploads in flight when splitting a large PDF
 
     # ------------------------------------------------------------------ #
     # Authentication                                                     #
@@ -79,7 +108,38 @@ class _Settings(BaseSettings):
     # ------------------------------------------------------------------ #
     event_backend: str = "inproc"               # inproc | redis
     queue_backend: str = "inproc"               # inproc | redis
+    queue_visibility_timeout: int = 300         # seconds a reserved job may go without a heartbeat
+    queue_heartbeat_interval: int = 30          # worker lease renewal period
+    queue_max_attempts: int = 5                 # failed attempts before a job is dead-lettered
+    queue_backoff_base: float = 5.0             # first retry delay in seconds, doubled per attempt
+    queue_backoff_max: float = 600.0
+    queue_reap_interval: int = 30               # how often workers requeue expired jobs
+    queue_fair_quantum: int = 1                 # DRR credit per user turn, in job cost units
     redis_url: str = "redis://localhost:6379/0"
+    sse_stream_maxlen: int = 10_000             # approx. entries kept per Redis stream
+    sse_stream_ttl: int = 3600                  # seconds a Redis stream lives after its last event
+    sse_block_ms: int = 15_000                  # XREAD block per poll
+    sse_queue_size: int = 256                   # in-process chunks buffered per SSE consumer
+    sse_overflow_policy: str = "drop_oldest"    # drop_oldest | coalesce | disconnect
+    stream_coalesce_window_ms: int = 40         # max delay before buffered LLM tokens are flushed
+    stream_coalesce_max_chars: int = 1024       # flush buffered LLM tokens early at this size
+    stream_checkpoint_chars: int = 2000         # persist partial assistant content every N chars ...
+    stream_checkpoint_interval: float = 2.0     # ... or every N seconds, whichever comes first
+
+    # ------------------------------------------------------------------ #
+    # Context building                                                   #
+    # ------------------------------------------------------------------ #
+    context_provider_timeout: float = 2.0       # seconds for page range / doc summary
+    chunk_summary_timeout: float = 3.0          # seconds; generation continues in background
+    context_trace_capacity: int = 200           # traces kept in the in-memory ring buffer
+    context_trace_sample_rate: float = 0.0      # fraction of non-debug turns traced
+
+    # ------------------------------------------------------------------ #
+    # Caching                                                            #
+    # ------------------------------------------------------------------ #
+    page_text_cache_backend: str = "auto"       # auto | inproc | redis | none
+    page_text_cache_max_bytes: int = 32 * 1024 * 1024  # inproc LRU budget
+    page_text_cache_ttl: int = 3600             # seconds, redis only
 
     # ------------------------------------------------------------------ #
     # Misc                                                                #
@@ -110,6 +170,17 @@ class _Settings(BaseSettings):
             f"@{values['db_host']}:{values['db_port']}/{values['db_name']}"
         )
 
+    @validator("page_text_cache_backend", always=True)
+    def _resolve_page_text_cache(cls, v, values):
+        # A separate worker process only invalidates its own in-process
+        # cache, so API replicas would serve stale page text forever
+        worker_backed = values.get("queue_backend") == "redis"
+        if v == "auto":
+            return "redis" if worker_backed else "inproc"
+        if v == "inproc" and worker_backed:
+            raise ValueError("page_text_cache_backend=inproc cannot be used with queue_backend=redis; use redis or none")
+        return v
+
     @property
     def db_dialect(self) -> str:
         """Return the database dialect based on the db_url."""
@@ -1,10 +1,10 @@
 # new_backend_ruminate/context/renderers/note_generation.py
 
 from __future__ import annotations
-from typing import List, Optional, Dict, Any
-import re
+from typing import List, Optional, Dict, Any, Union
+from new_backend_ruminate.utils.html_text import block_plain_text
 from new_backend_ruminate.domain.conversation.entities.message import Message, Role
-from new_backend_ruminate.domain.document.entities import Document, Block
+from new_backend_ruminate.domain.document.entities import Document, Block, BlockText
 from new_backend_ruminate.config import settings
 
 
@@ -14,7 +14,7 @@ class NoteGenerationContext:
     def build_context(
         self,
         document: Document,
-        block: Block,
+        block: Union[Block, BlockText],
         conversation_messages: List[Message],
         topic: Optional[str] = None,
         user_id: str = ""
@@ -27,7 +27,7 @@ class NoteGenerationContext:
         # Extract block content if available
         block_content = ""
         if block.html_content:
-            block_content = re.sub('<.*?>', '', block.html_content)[:500]
+            block_content = block_plain_text(block)[:500]
         
         # Build system prompt
         system_prompt = self._build_system_prompt(
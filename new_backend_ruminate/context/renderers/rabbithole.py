@@ -5,18 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from new_backend_ruminate.domain.conversation.entities.message import Message, Role
 from new_backend_ruminate.domain.conversation.entities.conversation import Conversation
 from new_backend_ruminate.infrastructure.document.models import DocumentModel, BlockModel
-import re
-
-
-def _strip_html(html_content: Optional[str]) -> str:
-    """Simple text extraction from HTML content"""
-    if not html_content:
-        return ""
-    # Remove HTML tags
-    text = re.sub(r'<[^>]+>', ' ', html_content)
-    # Clean up whitespace
-    text = ' '.join(text.split())
-    return text.strip()
+from new_backend_ruminate.utils.html_text import block_plain_text
 
 
 async def rabbithole_system_renderer(
@@ -38,7 +27,7 @@ async def rabbithole_system_renderer(
     if conv.source_block_id:
         block = await session.get(BlockModel, conv.source_block_id)
         if block and block.html_content:
-            block_content = _strip_html(block.html_content)
+            block_content = block_plain_text(block)
             block_type = block.block_type or "text"
             block_context = f"\nThe selected text is from a block of type '{block_type}' with context:\n{block_content}\n"
     
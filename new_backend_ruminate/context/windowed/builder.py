@@ -5,6 +5,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from new_backend_ruminate.domain.conversation.entities.conversation import Conversation
 from new_backend_ruminate.domain.conversation.entities.message import Message
 from new_backend_ruminate.context.windowed.context_window import ContextWindow
+from new_backend_ruminate.context.windowed.executor import ProviderExecutor, ProviderSpec, SessionFactory
+from new_backend_ruminate.context.windowed.page_resolver import CurrentPageResolver
 from new_backend_ruminate.context.windowed.providers import (
     SystemPromptProvider,
     DocumentSummaryProvider,
@@ -14,6 +16,8 @@ from new_backend_ruminate.context.windowed.providers import (
 from new_backend_ruminate.context.windowed.providers.chunk_summary import ChunkSummaryProvider
 from new_backend_ruminate.domain.document.repositories.document_repository_interface import DocumentRepositoryInterface
 from new_backend_ruminate.services.chunk import ChunkService
+from new_backend_ruminate.infrastructure.cache.page_text_cache import PageTextCache
+from new_backend_ruminate.infrastructure.tracing.context_trace import trace_event
 from new_backend_ruminate.config import settings
 
 
@@ -24,18 +28,28 @@ class WindowedContextBuilder:
         self, 
         doc_repo: DocumentRepositoryInterface, 
         page_radius: int = 3,
-        chunk_service: Optional[ChunkService] = None
+        chunk_service: Optional[ChunkService] = None,
+        page_text_cache: Optional[PageTextCache] = None,
+        session_factory: Optional[SessionFactory] = None
     ):
+        # Resolves the current page once per build for every page-aware provider
+        self.page_resolver = CurrentPageResolver(doc_repo)
+        
         self.system_prompt_provider = SystemPromptProvider(doc_repo)
         self.document_summary_provider = DocumentSummaryProvider(doc_repo)
-        self.page_range_provider = PageRangeProvider(doc_repo, page_radius=page_radius)
+        self.page_range_provider = PageRangeProvider(
+            doc_repo, page_radius=page_radius, page_cache=page_text_cache, page_resolver=self.page_resolver
+        )
         self.conversation_history_provider = ConversationHistoryProvider(doc_repo)
         
         # Initialize chunk summary provider if chunk service is provided
         if chunk_service:
-            self.chunk_summary_provider = ChunkSummaryProvider(doc_repo, chunk_service)
+            self.chunk_summary_provider = ChunkSummaryProvider(doc_repo, chunk_service, page_resolver=self.page_resolver)
         else:
             self.chunk_summary_provider = None
+        
+        # Providers other than conversation history get their own session from session_factory
+        self.executor = ProviderExecutor(session_factory)
     
     async def build(
         self, 
@@ -49,49 +63,67 @@ class WindowedContextBuilder:
         
         Compatible interface with existing ContextBuilder for drop-in replacement.
         """
-        # Build all parts concurrently for efficiency
-        system_prompt = await self.system_prompt_provider.get_system_prompt(
-            conv, session=session
-        )
-        document_summary = await self.document_summary_provider.get_document_summary(
-            conv, session=session
-        )
-        if not settings().include_doc_summary_in_prompts:
-            document_summary = None
+        cfg = settings()
         
-        # Get chunk summaries if available
-        chunk_summaries = ""
-        if self.chunk_summary_provider:
-            try:
-                chunk_summaries = await self.chunk_summary_provider.get_chunk_summaries(
-                    conv, thread, session=session
-                )
-            except Exception as e:
-                print(f"[WindowedContextBuilder] Warning: Failed to get chunk summaries: {e}")
-                # Continue without chunk summaries
+        current_page = None
+        if conv.document_id:
+            current_page = await self.page_resolver.resolve(conv, thread, session=session)
         
-        page_content = await self.page_range_provider.get_page_content(
-            conv, thread, session=session
-        )
-        conversation_history = await self.conversation_history_provider.render_conversation_history(
-            conv, thread, session=session
-        )
+        # Build all parts concurrently; optional parts degrade to empty on timeout
+        specs = [
+            ProviderSpec(
+                "system_prompt",
+                lambda s: self.system_prompt_provider.get_system_prompt(conv, session=s),
+            ),
+            ProviderSpec(
+                "conversation_history",
+                lambda s: self.conversation_history_provider.render_conversation_history(conv, thread, session=s),
+                shared_session=True,
+            ),
+        ]
+        if current_page is not None:
+            specs.append(ProviderSpec(
+                "page_content",
+                lambda s: self.page_range_provider.get_page_content(conv, thread, session=s, current_page=current_page),
+                timeout=cfg.context_provider_timeout,
+            ))
+        if cfg.include_doc_summary_in_prompts:
+            specs.append(ProviderSpec(
+                "document_summary",
+                lambda s: self.document_summary_provider.get_document_summary(conv, session=s),
+                timeout=cfg.context_provider_timeout,
+                default=None,
+            ))
+        if self.chunk_summary_provider and current_page is not None:
+            # Summaries still being generated keep running and are reused next turn
+            specs.append(ProviderSpec(
+                "chunk_summaries",
+                lambda s: self.chunk_summary_provider.get_chunk_summaries(conv, thread, session=s, current_page=current_page),
+                timeout=cfg.chunk_summary_timeout,
+                detach_on_timeout=True,
+            ))
         
-        # Debug output to file
-        with open("/tmp/context_debug.txt", "a") as f:
-            f.write(f"=== Context Build Debug ===\n")
-            f.write(f"Conv ID: {conv.id}\n")
-            f.write(f"Conv Type: {conv.type}\n") 
-            f.write(f"Document ID: {conv.document_id}\n")
-            f.write(f"Source Block ID: {conv.source_block_id}\n")
-            f.write(f"Thread length: {len(thread)}\n")
-            f.write(f"System prompt length: {len(system_prompt) if system_prompt else 0}\n")
-            f.write(f"Document summary length: {len(document_summary) if document_summary else 0}\n")
-            f.write(f"Chunk summaries length: {len(chunk_summaries) if chunk_summaries else 0}\n")
-            f.write(f"Page content length: {len(page_content) if page_content else 0}\n")
-            f.write(f"Conversation history length: {len(conversation_history) if conversation_history else 0}\n")
-            f.write(f"Page content preview: {page_content[:200] if page_content else 'EMPTY'}...\n")
-            f.write("===========================\n\n")
+        parts = await self.executor.run(specs, session)
+        system_prompt = parts["system_prompt"]
+        conversation_history = parts["conversation_history"]
+        page_content = parts.get("page_content", "")
+        document_summary = parts.get("document_summary")
+        chunk_summaries = parts.get("chunk_summaries", "")
+        
+        trace_event(
+            "context.built",
+            conversation_type=str(conv.type),
+            document_id=conv.document_id,
+            source_block_id=conv.source_block_id,
+            current_page=current_page,
+            thread_length=len(thread),
+            system_prompt_chars=len(system_prompt or ""),
+            document_summary_chars=len(document_summary or ""),
+            chunk_summaries_chars=len(chunk_summaries or ""),
+            page_content_chars=len(page_content or ""),
+            page_content_preview=(page_content or "")[:200],
+            history_messages=len(conversation_history or []),
+        )
         
         # Create context window and convert to LLM format
         window = ContextWindow(
@@ -0,0 +1,138 @@
+# new_backend_ruminate/context/windowed/executor.py
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncContextManager, Awaitable, Callable, Dict, List, Optional, Set
+from sqlalchemy.ext.asyncio import AsyncSession
+from new_backend_ruminate.infrastructure.db.bootstrap import session_scope
+from new_backend_ruminate.infrastructure.tracing.context_trace import trace_event
+
+logger = logging.getLogger(__name__)
+
+SessionFactory = Callable[[], AsyncContextManager[AsyncSession]]
+ProviderCall = Callable[[AsyncSession], Awaitable[Any]]
+
+
+@dataclass
+class ProviderSpec:
+    """One provider invocation for a context build"""
+    name: str
+    call: ProviderCall
+    # None means required: no timeout, errors propagate
+    timeout: Optional[float] = None
+    default: Any = ""
+    # Reuse the caller's session instead of opening one (at most one provider)
+    shared_session: bool = False
+    # On timeout, let the call finish in the background instead of cancelling it
+    detach_on_timeout: bool = False
+
+
+@dataclass
+class ProviderTiming:
+    name: str
+    elapsed_ms: float
+    outcome: str  # ok | timeout | error
+
+
+@dataclass
+class ProviderStats:
+    calls: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    timeouts: int = 0
+    errors: int = 0
+
+    @property
+    def avg_ms(self) -> float:
+        return self.total_ms / self.calls if self.calls else 0.0
+
+
+class ProviderExecutor:
+    """
+    Runs independent context providers concurrently.
+
+    An AsyncSession cannot be shared between concurrent tasks, so every
+    provider except the one marked shared_session gets its own session.
+    Optional providers that time out or fail contribute their default value.
+    """
+
+    def __init__(self, session_factory: Optional[SessionFactory] = None):
+        self._session_factory = session_factory or session_scope
+        self.stats: Dict[str, ProviderStats] = {}
+        self._detached: Set[asyncio.Task] = set()
+
+    async def run(self, specs: List[ProviderSpec], session: AsyncSession) -> Dict[str, Any]:
+        """Run all providers, returning results by name and recording their latency"""
+        timings: List[ProviderTiming] = []
+        results = await asyncio.gather(*(self._run_one(spec, session, timings) for spec in specs))
+        self._record(timings)
+        return {spec.name: result for spec, result in zip(specs, results)}
+
+    async def _run_one(self, spec: ProviderSpec, session: AsyncSession, timings: List[ProviderTiming]) -> Any:
+        start = time.perf_counter()
+        outcome = "ok"
+        task = asyncio.create_task(self._call(spec, session))
+        try:
+            if spec.timeout is None:
+                return await task
+            if spec.detach_on_timeout:
+                return await asyncio.wait_for(asyncio.shield(task), spec.timeout)
+            return await asyncio.wait_for(task, spec.timeout)
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            if spec.detach_on_timeout:
+                self._detach(spec.name, task)
+            print(f"[WindowedContextBuilder] {spec.name} timed out after {spec.timeout}s, continuing without it")
+            return spec.default
+        except Exception as e:
+            outcome = "error"
+            if spec.timeout is None:
+                raise
+            print(f"[WindowedContextBuilder] Warning: {spec.name} failed: {e}")
+            return spec.default
+        finally:
+            timings.append(ProviderTiming(spec.name, (time.perf_counter() - start) * 1000, outcome))
+
+    async def _call(self, spec: ProviderSpec, session: AsyncSession) -> Any:
+        async with self._session_for(spec, session) as provider_session:
+            return await spec.call(provider_session)
+
+    @asynccontextmanager
+    async def _session_for(self, spec: ProviderSpec, session: AsyncSession):
+        if spec.shared_session:
+            yield session
+        else:
+            async with self._session_factory() as own_session:
+                yield own_session
+
+    def _detach(self, name: str, task: asyncio.Task) -> None:
+        """Keep a timed-out call alive so its work (e.g. generated summaries) is not lost"""
+        self._detached.add(task)
+
+        def _done(t: asyncio.Task) -> None:
+            self._detached.discard(t)
+            if not t.cancelled() and t.exception() is not None:
+                print(f"[WindowedContextBuilder] Background {name} failed: {t.exception()}")
+
+        task.add_done_callback(_done)
+
+    def _record(self, timings: List[ProviderTiming]) -> None:
+        for timing in timings:
+            stats = self.stats.setdefault(timing.name, ProviderStats())
+            stats.calls += 1
+            stats.total_ms += timing.elapsed_ms
+            stats.max_ms = max(stats.max_ms, timing.elapsed_ms)
+            if timing.outcome == "timeout":
+                stats.timeouts += 1
+            elif timing.outcome == "error":
+                stats.errors += 1
+        trace_event("context.providers", timings=[
+            {"name": t.name, "elapsed_ms": round(t.elapsed_ms, 2), "outcome": t.outcome} for t in timings
+        ])
+        # Per-turn detail stays out of the normal logs; stats and traces carry it
+        if logger.isEnabledFor(logging.DEBUG):
+            summary = ", ".join(f"{t.name}={t.elapsed_ms:.1f}ms" + ("" if t.outcome == "ok" else f" ({t.outcome})") for t in timings)
+            logger.debug("Provider latency: %s", summary)
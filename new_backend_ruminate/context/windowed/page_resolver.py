@@ -0,0 +1,78 @@
+# new_backend_ruminate/context/windowed/page_resolver.py
+
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from new_backend_ruminate.domain.conversation.entities.conversation import Conversation, ConversationType
+from new_backend_ruminate.domain.conversation.entities.message import Message
+from new_backend_ruminate.domain.document.repositories.document_repository_interface import DocumentRepositoryInterface
+
+
+class CurrentPageResolver:
+    """
+    Resolves the page a conversation is currently focused on.
+
+    Rabbithole conversations are pinned to their source block; other
+    conversations follow the latest user message with a block_id and fall
+    back to the conversation's source block. All candidate blocks are
+    loaded in one IN query, and block_id -> page_number is cached for the
+    process lifetime since a block's page never changes after ingest.
+    """
+
+    def __init__(self, doc_repo: DocumentRepositoryInterface, max_cached_blocks: int = 100_000):
+        self.doc_repo = doc_repo
+        self.max_cached_blocks = max_cached_blocks
+        self._page_by_block: "OrderedDict[str, int]" = OrderedDict()
+
+    async def resolve(
+        self,
+        conv: Conversation,
+        thread: List[Message],
+        *,
+        session: AsyncSession
+    ) -> Optional[int]:
+        """Return the current page number, or None if no referenced block has one"""
+        candidates = self._candidate_block_ids(conv, thread)
+        
+        # Only candidates ranked above the first cached one need loading
+        cached_page = None
+        to_load = []
+        for block_id in candidates:
+            page_number = self._page_by_block.get(block_id)
+            if page_number is not None:
+                self._page_by_block.move_to_end(block_id)
+                cached_page = page_number
+                break
+            to_load.append(block_id)
+
+        if to_load:
+            loaded = await self._load_page_numbers(to_load, session)
+            for block_id in to_load:
+                if loaded.get(block_id) is not None:
+                    return loaded[block_id]
+        return cached_page
+
+    def _candidate_block_ids(self, conv: Conversation, thread: List[Message]) -> List[str]:
+        """Block ids to try, in priority order"""
+        if conv.type == ConversationType.RABBITHOLE:
+            return [conv.source_block_id] if conv.source_block_id else []
+
+        candidates = []
+        for msg in reversed(thread):
+            # Handle both string and enum role types
+            role_value = msg.role.value if hasattr(msg.role, 'value') else msg.role
+            if role_value == "user" and msg.block_id and msg.block_id not in candidates:
+                candidates.append(msg.block_id)
+        if conv.source_block_id and conv.source_block_id not in candidates:
+            candidates.append(conv.source_block_id)
+        return candidates
+
+    async def _load_page_numbers(self, block_ids: List[str], session: AsyncSession) -> Dict[str, int]:
+        """Load page numbers for block_ids in one query and cache them"""
+        loaded = await self.doc_repo.get_block_page_numbers(block_ids, session)
+        for block_id, page_number in loaded.items():
+            if page_number is not None:
+                self._page_by_block[block_id] = page_number
+        while len(self._page_by_block) > self.max_cached_blocks:
+            self._page_by_block.popitem(last=False)
+        return loaded
@@ -6,6 +6,7 @@ from new_backend_ruminate.domain.conversation.entities.conversation import Conve
 from new_backend_ruminate.domain.conversation.entities.message import Message
 from new_backend_ruminate.domain.document.repositories.document_repository_interface import DocumentRepositoryInterface
 from new_backend_ruminate.services.chunk import ChunkService
+from new_backend_ruminate.context.windowed.page_resolver import CurrentPageResolver
 
 
 class ChunkSummaryProvider:
@@ -14,29 +15,33 @@ class ChunkSummaryProvider:
     def __init__(
         self, 
         doc_repo: DocumentRepositoryInterface,
-        chunk_service: ChunkService
+        chunk_service: ChunkService,
+        page_resolver: Optional[CurrentPageResolver] = None
     ):
         """
         Args:
             doc_repo: Document repository for data access
             chunk_service: Service for chunk operations
+            page_resolver: Current page resolver, shared with other providers
         """
         self.doc_repo = doc_repo
         self.chunk_service = chunk_service
+        self.page_resolver = page_resolver or CurrentPageResolver(doc_repo)
     
     async def get_chunk_summaries(
         self, 
         conv: Conversation, 
         thread: List[Message], 
         *, 
-        session: AsyncSession
+        session: AsyncSession,
+        current_page: Optional[int] = None
     ) -> str:
-        """Get chunk summaries up to the current page"""
+        """Get chunk summaries up to the current page, deriving it from messages if not given"""
         if not conv.document_id:
             return ""
         
-        # Derive current page from conversation/messages
-        current_page = await self._derive_current_page(conv, thread, session=session)
+        if current_page is None:
+            current_page = await self._derive_current_page(conv, thread, session=session)
         if current_page is None:
             return ""
         
@@ -61,31 +66,7 @@ class ChunkSummaryProvider:
         session: AsyncSession
     ) -> Optional[int]:
         """Derive current page from conversation context"""
-        from new_backend_ruminate.domain.conversation.entities.conversation import ConversationType
-        
-        if conv.type == ConversationType.RABBITHOLE:
-            # Rabbithole conversations have fixed page context
-            if conv.source_block_id:
-                block = await self.doc_repo.get_block(conv.source_block_id, session)
-                if block and block.page_number is not None:
-                    return block.page_number
-        else:
-            # Normal conversations - check messages for block_id
-            for msg in reversed(thread):
-                # Handle both string and enum role types
-                role_value = msg.role.value if hasattr(msg.role, 'value') else msg.role
-                if role_value == "user" and msg.block_id:
-                    block = await self.doc_repo.get_block(msg.block_id, session)
-                    if block and block.page_number is not None:
-                        return block.page_number
-            
-            # Fallback to conversation's source_block_id
-            if conv.source_block_id:
-                block = await self.doc_repo.get_block(conv.source_block_id, session)
-                if block and block.page_number is not None:
-                    return block.page_number
-        
-        return None
+        return await self.page_resolver.resolve(conv, thread, session=session)
     
     def _format_chunk_summaries(self, chunk_summaries: List[tuple]) -> str:
         """Format chunk summaries into readable text"""
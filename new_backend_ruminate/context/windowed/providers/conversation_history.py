@@ -5,7 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from new_backend_ruminate.domain.conversation.entities.conversation import Conversation, ConversationType
 from new_backend_ruminate.domain.conversation.entities.message import Message, Role
 from new_backend_ruminate.domain.document.repositories.document_repository_interface import DocumentRepositoryInterface
-import re
+from new_backend_ruminate.utils.html_text import block_plain_text
 
 
 class ConversationHistoryProvider:
@@ -67,18 +67,8 @@ class ConversationHistoryProvider:
         if conv.source_block_id:
             block = await self.doc_repo.get_block(conv.source_block_id, session)
             if block and block.html_content:
-                block_content = self._strip_html(block.html_content)
-                if block_content.strip():
+                block_content = block_plain_text(block)
+                if block_content:
                     enhanced_content += f"\n\n[Block context: {block_content[:200]}...]"
         
         return enhanced_content
-    
-    def _strip_html(self, html_content: str) -> str:
-        """Simple text extraction from HTML content"""
-        if not html_content:
-            return ""
-        # Remove HTML tags
-        text = re.sub(r'<[^>]+>', ' ', html_content)
-        # Clean up whitespace
-        text = ' '.join(text.split())
-        return text.strip()
\ No newline at end of file
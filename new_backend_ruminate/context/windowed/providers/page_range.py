@@ -1,63 +1,79 @@
 # new_backend_ruminate/context/windowed/providers/page_range.py
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from new_backend_ruminate.domain.conversation.entities.conversation import Conversation
 from new_backend_ruminate.domain.conversation.entities.message import Message
 from new_backend_ruminate.domain.document.entities.page import Page
 from new_backend_ruminate.domain.document.repositories.document_repository_interface import DocumentRepositoryInterface
-import re
+from new_backend_ruminate.context.windowed.page_resolver import CurrentPageResolver
+from new_backend_ruminate.infrastructure.cache.page_text_cache import PageTextCache
+from new_backend_ruminate.infrastructure.tracing.context_trace import trace_event
+from new_backend_ruminate.utils.html_text import block_plain_text
 
 
 class PageRangeProvider:
     """Provides page range content for context"""
     
-    def __init__(self, doc_repo: DocumentRepositoryInterface, page_radius: int = 3):
+    def __init__(
+        self,
+        doc_repo: DocumentRepositoryInterface,
+        page_radius: int = 3,
+        page_cache: Optional[PageTextCache] = None,
+        page_resolver: Optional[CurrentPageResolver] = None
+    ):
         """
         Args:
             doc_repo: Document repository for data access
             page_radius: Number of pages to include on each side of current page
+            page_cache: Optional cache of rendered page text; when every page in
+                the window is cached no database or HTML work is done
+            page_resolver: Current page resolver, shared with other providers
         """
         self.page_radius = page_radius
         self.doc_repo = doc_repo
+        self.page_cache = page_cache
+        self.page_resolver = page_resolver or CurrentPageResolver(doc_repo)
     
     async def get_page_content(
         self, 
         conv: Conversation, 
         thread: List[Message], 
         *, 
-        session: AsyncSession
+        session: AsyncSession,
+        current_page: Optional[int] = None
     ) -> str:
-        """Get page range content based on current page derived from messages"""
+        """Get page range content around current_page, deriving it from messages if not given"""
         if not conv.document_id:
-            with open("/tmp/page_range_debug.txt", "a") as f:
-                f.write("get_page_content: No document_id, returning empty\n\n")
+            trace_event("page_range.skipped", reason="no_document")
             return ""
             
-        current_page = await self._derive_current_page(conv, thread, session=session)
         if current_page is None:
-            with open("/tmp/page_range_debug.txt", "a") as f:
-                f.write("get_page_content: No current_page derived, returning empty\n\n")
+            current_page = await self._derive_current_page(conv, thread, session=session)
+        if current_page is None:
+            trace_event("page_range.skipped", reason="no_current_page")
             return ""
+        
+        if self.page_cache:
+            page_texts = await self._get_cached_page_texts(conv.document_id, current_page, session)
+            return self._format_page_texts(page_texts, current_page)
             
-        with open("/tmp/page_range_debug.txt", "a") as f:
-            f.write(f"get_page_content: Fetching pages around page {current_page} with radius {self.page_radius}\n")
-            
-        pages = await self.doc_repo.get_pages_in_range_with_blocks(
+        # Text-only projections: block images/polygons are never loaded here
+        pages = await self.doc_repo.get_pages_in_range_with_block_texts(
             conv.document_id, 
             current_page, 
             self.page_radius, 
             session
         )
         
-        with open("/tmp/page_range_debug.txt", "a") as f:
-            f.write(f"get_page_content: Found {len(pages)} pages: {[p.page_number for p in pages]}\n")
-        
         result = await self._format_page_content(pages, current_page, session)
-        
-        with open("/tmp/page_range_debug.txt", "a") as f:
-            f.write(f"get_page_content: Formatted content length: {len(result)}\n\n")
-        
+        trace_event(
+            "page_range.loaded",
+            current_page=current_page,
+            radius=self.page_radius,
+            pages=[p.page_number for p in pages],
+            chars=len(result),
+        )
         return result
     
     async def _derive_current_page(
@@ -68,96 +84,83 @@ class PageRangeProvider:
         session: AsyncSession
     ) -> Optional[int]:
         """Derive current page based on conversation type"""
-        from new_backend_ruminate.domain.conversation.entities.conversation import ConversationType
-        import os
+        return await self.page_resolver.resolve(conv, thread, session=session)
+    
+    async def _get_cached_page_texts(
+        self, 
+        document_id: str, 
+        current_page: int, 
+        session: AsyncSession
+    ) -> Dict[int, str]:
+        """Rendered text for each page in the window, filling cache misses from the database"""
+        page_numbers = range(max(current_page - self.page_radius, 0), current_page + self.page_radius + 1)
+        page_texts = await self.page_cache.get_many(document_id, page_numbers)
+        missing = [n for n in page_numbers if n not in page_texts]
         
-        # Debug to file
-        debug_info = []
-        debug_info.append(f"PageRangeProvider: Deriving current page for conv_type={conv.type}, document_id={conv.document_id}")
+        trace_event("page_range.cache", current_page=current_page, cached=len(page_texts), missing=missing)
         
-        if conv.type == ConversationType.RABBITHOLE:
-            # Rabbithole conversations have FIXED page context based on source_block_id
-            debug_info.append(f"PageRangeProvider: RABBITHOLE conv, source_block_id={conv.source_block_id}")
-            if conv.source_block_id:
-                block = await self.doc_repo.get_block(conv.source_block_id, session)
-                debug_info.append(f"PageRangeProvider: Found source block: {block.id if block else None}, page_number={block.page_number if block else None}")
-                if block and block.page_number:
-                    with open("/tmp/page_range_debug.txt", "a") as f:
-                        f.write("\n".join(debug_info) + f"\nReturning page: {block.page_number}\n\n")
-                    return block.page_number
-        else:
-            # Normal conversations have DYNAMIC page context from latest message
-            debug_info.append(f"PageRangeProvider: DYNAMIC page derivation, checking {len(thread)} messages")
-            for i, msg in enumerate(reversed(thread)):
-                # Handle both string and enum role types
-                role_value = msg.role.value if hasattr(msg.role, 'value') else msg.role
-                debug_info.append(f"PageRangeProvider: Message {i}: role={role_value}, block_id={msg.block_id}")
-                if role_value == "user" and msg.block_id:
-                    block = await self.doc_repo.get_block(msg.block_id, session)
-                    debug_info.append(f"PageRangeProvider: Found user message block: {block.id if block else None}, page_number={block.page_number if block else None}")
-                    if block and block.page_number:
-                        with open("/tmp/page_range_debug.txt", "a") as f:
-                            f.write("\n".join(debug_info) + f"\nReturning page: {block.page_number}\n\n")
-                        return block.page_number
-            
-            # Fall back to conversation's source_block_id if available
-            debug_info.append(f"PageRangeProvider: Falling back to conv source_block_id={conv.source_block_id}")
-            if conv.source_block_id:
-                block = await self.doc_repo.get_block(conv.source_block_id, session)
-                debug_info.append(f"PageRangeProvider: Found fallback block: {block.id if block else None}, page_number={block.page_number if block else None}")
-                if block and block.page_number:
-                    with open("/tmp/page_range_debug.txt", "a") as f:
-                        f.write("\n".join(debug_info) + f"\nReturning page: {block.page_number}\n\n")
-                    return block.page_number
+        if missing:
+            pages = await self.doc_repo.get_pages_in_range_with_block_texts(
+                document_id, 
+                current_page, 
+                self.page_radius, 
+                session
+            )
+            # Only pages that exist are cached: a page the document doesn't have
+            # yet (still processing, or past the end) is looked up again next time
+            fresh = {
+                page.page_number: await self._render_page_text(page, session)
+                for page in pages if page.page_number in missing
+            }
+            await self.page_cache.set_many(document_id, fresh)
+            page_texts.update(fresh)
         
-        debug_info.append("PageRangeProvider: No current page found, returning None")
-        with open("/tmp/page_range_debug.txt", "a") as f:
-            f.write("\n".join(debug_info) + "\n\n")
-        return None
+        return page_texts
     
-    async def _format_page_content(self, pages: List[Page], current_page: int, session: AsyncSession) -> str:
-        """Format pages into readable context with page markers"""
-        if not pages:
-            return ""
-            
+    def _format_page_texts(self, page_texts: Dict[int, str], current_page: int) -> str:
+        """Format rendered page texts into readable context with page markers"""
         content_parts = []
         
-        for page in pages:
-            page_marker = f"--- Page {page.page_number}"
-            if page.page_number == current_page:
-                page_marker += " (CURRENT)"
-            page_marker += " ---"
-            
-            # Use preloaded blocks if available, otherwise fall back to query
-            if page.blocks is not None:
-                blocks = page.blocks
-            else:
-                blocks = await self.doc_repo.get_blocks_by_page(page.id, session)
-            
-            page_text_parts = []
-            
-            for block in blocks:
-                if block.html_content:
-                    block_text = self._strip_html(block.html_content)
-                    if block_text.strip():
-                        page_text_parts.append(block_text)
-            
-            page_text = " ".join(page_text_parts)
-            
-            with open("/tmp/page_range_debug.txt", "a") as f:
-                f.write(f"Page {page.page_number}: {len(blocks)} blocks, {len(page_text)} chars\n")
-            
+        for page_number in sorted(page_texts):
+            page_text = page_texts[page_number]
             if page_text.strip():
-                content_parts.append(f"{page_marker}\n{page_text}")
+                content_parts.append(f"{self._page_marker(page_number, current_page)}\n{page_text}")
         
         return "\n\n".join(content_parts)
     
-    def _strip_html(self, html_content: str) -> str:
-        """Simple text extraction from HTML content"""
-        if not html_content:
+    @staticmethod
+    def _page_marker(page_number: int, current_page: int) -> str:
+        page_marker = f"--- Page {page_number}"
+        if page_number == current_page:
+            page_marker += " (CURRENT)"
+        return page_marker + " ---"
+    
+    async def _render_page_text(self, page: Page, session: AsyncSession) -> str:
+        """Join the plain text of a page's blocks"""
+        # Use preloaded blocks if available, otherwise fall back to query
+        if page.blocks is not None:
+            blocks = page.blocks
+        else:
+            blocks = await self.doc_repo.get_text_blocks(
+                page.document_id, session,
+                start_page=page.page_number, end_page=page.page_number + 1
+            )
+        
+        page_text_parts = []
+        
+        for block in blocks:
+            block_text = block_plain_text(block)
+            if block_text:
+                page_text_parts.append(block_text)
+        
+        page_text = " ".join(page_text_parts)
+        trace_event("page_range.page", page_number=page.page_number, blocks=len(blocks), chars=len(page_text))
+        return page_text
+    
+    async def _format_page_content(self, pages: List[Page], current_page: int, session: AsyncSession) -> str:
+        """Format pages into readable context with page markers"""
+        if not pages:
             return ""
-        # Remove HTML tags
-        text = re.sub(r'<[^>]+>', ' ', html_content)
-        # Clean up whitespace
-        text = ' '.join(text.split())
-        return text.strip()
\ No newline at end of file
+        
+        page_texts = {page.page_number: await self._render_page_text(page, session) for page in pages}
+        return self._format_page_texts(page_texts, current_page)
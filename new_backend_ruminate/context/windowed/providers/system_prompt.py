@@ -5,6 +5,7 @@ from new_backend_ruminate.domain.conversation.entities.conversation import Conve
 from new_backend_ruminate.context.prompts import default_system_prompts, agent_system_prompt
 from new_backend_ruminate.domain.ports.tool import tool_registry
 from new_backend_ruminate.domain.document.repositories.document_repository_interface import DocumentRepositoryInterface
+from new_backend_ruminate.utils.html_text import block_plain_text
 
 
 class SystemPromptProvider:
@@ -36,8 +37,6 @@ class SystemPromptProvider:
         session: AsyncSession
     ) -> str:
         """Format rabbithole system prompt with selected text and context"""
-        import re
-        
         template = default_system_prompts["rabbithole"]
         
         # Get document information
@@ -50,9 +49,7 @@ class SystemPromptProvider:
         if conv.source_block_id:
             block = await self.doc_repo.get_block(conv.source_block_id, session)
             if block and block.html_content:
-                # Strip HTML tags
-                block_content = re.sub(r'<[^>]+>', ' ', block.html_content)
-                block_content = ' '.join(block_content.split()).strip()
+                block_content = block_plain_text(block)
                 block_type = block.block_type.value if hasattr(block.block_type, 'value') else str(block.block_type)
                 block_context = f"\nThe selected text is from a block of type '{block_type}' with context:\n{block_content}\n"
         
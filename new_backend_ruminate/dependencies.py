@@ -15,6 +15,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from new_backend_ruminate.config import settings
 from new_backend_ruminate.infrastructure.sse.hub import EventStreamHub
+from new_backend_ruminate.infrastructure.sse.redis_stream_hub import RedisStreamHub
 from new_backend_ruminate.infrastructure.conversation.rds_conversation_repository import RDSConversationRepository
 from new_backend_ruminate.infrastructure.document.rds_document_repository import RDSDocumentRepository
 from new_backend_ruminate.infrastructure.document.rds_text_enhancement_repository import RDSTextEnhancementRepository
@@ -40,13 +41,12 @@ from new_backend_ruminate.services.auth.service import AuthService
 
 # New: event publisher abstraction + adapters
 from typing import AsyncIterator
-from new_backend_ruminate.infrastructure.events.redis_publisher import RedisEventPublisher
 
 class EventPublisher:
     async def publish(self, stream_id: str, chunk: str) -> None:
         raise NotImplementedError
 
-    async def subscribe(self, stream_id: str) -> AsyncIterator[str]:
+    async def subscribe(self, stream_id: str, from_latest: bool = False) -> AsyncIterator[str]:
         raise NotImplementedError
 
 class InProcessEventPublisher(EventPublisher):
@@ -56,27 +56,42 @@ class InProcessEventPublisher(EventPublisher):
     async def publish(self, stream_id: str, chunk: str) -> None:
         await self._hub.publish(stream_id, chunk)
 
-    async def subscribe(self, stream_id: str) -> AsyncIterator[str]:
+    async def subscribe(self, stream_id: str, from_latest: bool = False) -> AsyncIterator[str]:
+        # Nothing is retained in-process: every subscriber starts from the latest event
         async for item in self._hub.register_consumer(stream_id):
             yield item
 
 # New: processing queue singletons
 from new_backend_ruminate.infrastructure.queue.inproc_queue import InProcessProcessingQueue
 from new_backend_ruminate.infrastructure.queue.redis_queue import RedisProcessingQueue
+from new_backend_ruminate.infrastructure.document_processing.marker_client import MarkerClient
+from new_backend_ruminate.infrastructure.document_processing.pdf_pool import PdfProcessPool
+from new_backend_ruminate.infrastructure.document_processing.stages import ProcessingStages
+from new_backend_ruminate.infrastructure.cache.page_text_cache import InProcessPageTextCache, RedisPageTextCache
 
 register_agent_renderers()
 
 # ────────────────────────── singletons ─────────────────────────── #
 
-_hub = EventStreamHub()
-# Select event publisher backend
+# Select event backend: Redis Streams are shared by all replicas and replay
+# history to late or reconnecting subscribers
 if settings().event_backend == "redis":
-    _event_publisher = RedisEventPublisher(url=settings().redis_url)
+    _hub = RedisStreamHub(url=settings().redis_url)
+    _event_publisher = _hub
 else:
+    _hub = EventStreamHub()
     _event_publisher = InProcessEventPublisher(_hub)
 
+# Rendered page text cache (shared by the repository for invalidation)
+if settings().page_text_cache_backend == "redis":
+    _page_text_cache = RedisPageTextCache(url=settings().redis_url)
+elif settings().page_text_cache_backend == "inproc":
+    _page_text_cache = InProcessPageTextCache()
+else:
+    _page_text_cache = None
+
 _repo = RDSConversationRepository()
-_document_repo = RDSDocumentRepository()
+_document_repo = RDSDocumentRepository(page_text_cache=_page_text_cache)
 _user_repo = RDSUserRepository()
 _text_enhancement_repo = RDSTextEnhancementRepository()
 
@@ -85,6 +100,9 @@ if settings().queue_backend == "redis":
     _processing_queue = RedisProcessingQueue(url=settings().redis_url)
 else:
     _processing_queue = InProcessProcessingQueue()
+_pdf_pool = PdfProcessPool()
+_processing_stages = ProcessingStages(pdf_pool=_pdf_pool)
+_marker_client = MarkerClient()
 
 if settings().use_responses_api:
     print(f"[Dependencies] Initializing OpenAIResponsesLLM with web_search={settings().enable_web_search}")
@@ -103,7 +121,11 @@ _storage = get_object_storage_singleton()
 _document_analyzer = LLMDocumentAnalyzer(_llm) if settings().analyze_documents else None
 _note_generation_context = NoteGenerationContext()
 _chunk_service = ChunkService(_document_repo, _llm)
-_ctx_builder = WindowedContextBuilder(_document_repo, chunk_service=_chunk_service)
+_ctx_builder = WindowedContextBuilder(
+    _document_repo,
+    chunk_service=_chunk_service,
+    page_text_cache=_page_text_cache,
+)
 # Auth components (only initialize if settings are provided)
 _google_client = None
 _jwt_manager = None
@@ -134,19 +156,22 @@ _document_service = DocumentService(
     chunk_service=_chunk_service,
     processing_queue=_processing_queue,
     event_publisher=_event_publisher,
+    marker_client=_marker_client,
+    stages=_processing_stages,
+    pdf_pool=_pdf_pool,
 )
 # New: ingestion service singleton
 _ingestion_service = IngestionService(
     repo=_document_repo,
     storage=_storage,
-    processing_queue=_processing_queue,
+    document_service=_document_service,
     conversation_service=_conversation_service,
 )
 _text_enhancement_service = TextEnhancementService(_text_enhancement_repo, _llm)
 # ─────────────────────── DI provider helpers ───────────────────── #
 
 def get_event_hub() -> EventStreamHub:
-    """Return the process-wide in-memory hub (singleton)."""
+    """Return the process-wide event hub (in-memory or Redis Streams singleton)."""
     return _hub
 
 def get_event_publisher() -> EventPublisher:
@@ -158,6 +183,12 @@ def get_event_publisher() -> EventPublisher:
 def get_processing_queue():
     return _processing_queue
 
+def get_pdf_pool() -> PdfProcessPool:
+    return _pdf_pool
+
+def get_marker_client() -> MarkerClient:
+    return _marker_client
+
 def get_context_builder() -> ContextBuilder:
     """Return the singleton ContextBuilder; stateless, safe to share."""
     return _ctx_builder
@@ -21,6 +21,12 @@ class Role(str, Enum):
     TOOL = "tool"
 
 
+class MessageStatus(str, Enum):
+    STREAMING = "streaming"                        # assistant reply still being generated
+    COMPLETED = "completed"
+    FAILED = "failed"                              # generation stopped; content is partial
+
+
 class Message(Base):                               # pure ORM, no Pydantic
     __tablename__ = "messages"
     __table_args__ = (
@@ -35,6 +41,8 @@ class Message(Base):                               # pure ORM, no Pydantic
     version         = Column(Integer, nullable=True)
     role            = Column(SAEnum(Role), nullable=False)
     content         = Column(Text, default="")
+    status          = Column(String(16), nullable=False, default=MessageStatus.COMPLETED.value,
+                             server_default=MessageStatus.COMPLETED.value)
     meta_data       = Column(JSON, nullable=True)
     created_at      = Column(DateTime, default=datetime.utcnow)
     active_child_id = Column(
@@ -37,7 +37,9 @@ class ConversationRepository(ABC):
     @abstractmethod
     async def set_active_child(self, parent_id: str, child_id: str, session: AsyncSession) -> None: ...
     @abstractmethod
-    async def update_message_content(self, mid: str, new: str, session: AsyncSession) -> None: ...
+    async def update_message_content(
+        self, mid: str, new: str, session: AsyncSession, status: str | None = None
+    ) -> None: ...
     @abstractmethod
     async def update_message_metadata(self, mid: str, meta_data: dict, session: AsyncSession) -> None: ...
     @abstractmethod
@@ -1,5 +1,6 @@
 from .document import Document, DocumentStatus
 from .page import Page
 from .block import Block, BlockType
+from .block_text import BlockText
 
-__all__ = ['Document', 'DocumentStatus', 'Page', 'Block', 'BlockType']
\ No newline at end of file
+__all__ = ['Document', 'DocumentStatus', 'Page', 'Block', 'BlockType', 'BlockText']
\ No newline at end of file
@@ -4,6 +4,9 @@ from uuid import uuid4
 from datetime import datetime
 from dataclasses import dataclass, field
 
+from new_backend_ruminate.utils.html_text import html_to_text
+from new_backend_ruminate.domain.document.entities.change_tracking import ChangeTracking
+
 
 class BlockType(str, Enum):
     """All possible block types from Marker API"""
@@ -37,7 +40,7 @@ class BlockType(str, Enum):
 
 
 @dataclass
-class Block:
+class Block(ChangeTracking):
     """Domain entity for document Block"""
     id: str = field(default_factory=lambda: str(uuid4()))
     document_id: str = ""
@@ -45,6 +48,7 @@ class Block:
     chunk_id: Optional[str] = None  # Reference to chunk this block belongs to
     block_type: Optional[BlockType] = None
     html_content: Optional[str] = None
+    plain_text: Optional[str] = None  # html_content with tags stripped, computed at ingest
     polygon: Optional[List[List[float]]] = None  # Marker uses polygon
     page_number: Optional[int] = None
     section_hierarchy: Optional[Dict[str, str]] = None
@@ -66,11 +70,13 @@ class Block:
         if not block_type_str:
             raise ValueError("Block type is required from Marker response")
         
+        html_content = marker_block.get('html')
         return cls(
             document_id=document_id,
             page_id=page_id,
             block_type=BlockType(block_type_str),
-            html_content=marker_block.get('html'),
+            html_content=html_content,
+            plain_text=html_to_text(html_content),
             polygon=marker_block.get('polygon'),
             section_hierarchy=marker_block.get('section_hierarchy'),
             metadata=marker_block.get('metadata'),
@@ -89,6 +95,7 @@ class Block:
             "chunk_id": self.chunk_id,
             "block_type": self.block_type.value if self.block_type else None,
             "html_content": self.html_content,
+            "plain_text": self.plain_text,
             "polygon": self.polygon,
             "page_number": self.page_number,
             "section_hierarchy": self.section_hierarchy,
@@ -0,0 +1,17 @@
+from typing import Optional
+from dataclasses import dataclass
+
+from new_backend_ruminate.domain.document.entities.block import BlockType
+
+
+@dataclass(slots=True)
+class BlockText:
+    """Lightweight text-only projection of a Block (no images, polygon or metadata)"""
+    id: str
+    document_id: str
+    page_id: Optional[str] = None
+    chunk_id: Optional[str] = None
+    block_type: Optional[BlockType] = None
+    html_content: Optional[str] = None
+    plain_text: Optional[str] = None
+    page_number: Optional[int] = None
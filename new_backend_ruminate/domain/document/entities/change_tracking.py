@@ -0,0 +1,34 @@
+from typing import Optional, Set
+
+
+class ChangeTracking:
+    """
+    Dataclass mixin recording which fields were assigned since the entity
+    was loaded or last saved, so repositories can write only those.
+
+    Tracking starts at mark_clean(); an entity that was never marked clean
+    (e.g. built by hand) reports None, meaning every field may have changed.
+    """
+
+    def __setattr__(self, name: str, value) -> None:
+        changed = self.__dict__.get("_changed_fields")
+        if changed is not None:
+            changed.add(name)
+        object.__setattr__(self, name, value)
+
+    def mark_clean(self) -> None:
+        """Start tracking from the current state (called once it matches the database)"""
+        object.__setattr__(self, "_changed_fields", set())
+
+    def changed_fields(self) -> Optional[Set[str]]:
+        """
+        Fields assigned since mark_clean(), or None if untracked. Dict and
+        list fields can be mutated in place, so they always count as changed.
+        """
+        changed = self.__dict__.get("_changed_fields")
+        if changed is None:
+            return None
+        return changed | {
+            name for name, value in self.__dict__.items()
+            if isinstance(value, (dict, list)) and not name.startswith("_")
+        }
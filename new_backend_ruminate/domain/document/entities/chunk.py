@@ -4,6 +4,8 @@ from enum import Enum
 from datetime import datetime
 from dataclasses import dataclass, field
 
+from new_backend_ruminate.domain.document.entities.change_tracking import ChangeTracking
+
 
 class ChunkStatus(str, Enum):
     UNPROCESSED = "UNPROCESSED"
@@ -13,7 +15,7 @@ class ChunkStatus(str, Enum):
 
 
 @dataclass
-class Chunk:
+class Chunk(ChangeTracking):
     """Domain entity for document chunks (20-page windows)"""
     id: str = field(default_factory=lambda: str(uuid4()))
     document_id: str = ""
@@ -31,6 +33,11 @@ class Chunk:
         self.status = ChunkStatus.PROCESSING
         self.updated_at = datetime.now()
     
+    def release(self) -> None:
+        """Give up a processing claim without a result"""
+        self.status = ChunkStatus.UNPROCESSED
+        self.updated_at = datetime.now()
+    
     def set_ready(self, summary: str) -> None:
         """Mark chunk as ready with summary"""
         self.status = ChunkStatus.READY
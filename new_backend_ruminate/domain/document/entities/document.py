@@ -4,6 +4,8 @@ from enum import Enum
 from datetime import datetime
 from dataclasses import dataclass, field
 
+from new_backend_ruminate.domain.document.entities.change_tracking import ChangeTracking
+
 
 class DocumentStatus(str, Enum):
     PENDING = "PENDING"
@@ -15,7 +17,7 @@ class DocumentStatus(str, Enum):
 
 
 @dataclass
-class Document:
+class Document(ChangeTracking):
     """Domain entity for Document"""
     id: str = field(default_factory=lambda: str(uuid4()))
     user_id: Optional[str] = None
@@ -29,6 +31,7 @@ class Document:
     processing_error: Optional[str] = None
     marker_job_id: Optional[str] = None
     marker_check_url: Optional[str] = None
+    content_hash: Optional[str] = None          # SHA-256 of the PDF; keys the blob and Marker result cache
     # Batch processing fields
     parent_document_id: Optional[str] = None    # Links to parent document for chunks
     batch_id: Optional[str] = None              # Groups chunks from same upload
@@ -87,6 +90,7 @@ class Document:
             "processing_error": self.processing_error,
             "marker_job_id": self.marker_job_id,
             "marker_check_url": self.marker_check_url,
+            "content_hash": self.content_hash,
             "parent_document_id": self.parent_document_id,
             "batch_id": self.batch_id,
             "chunk_index": self.chunk_index,
@@ -1,8 +1,10 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from new_backend_ruminate.domain.document.entities import Document, Page, Block
+from new_backend_ruminate.domain.document.entities import Document, Page, Block, BlockText
 from new_backend_ruminate.domain.document.entities.chunk import Chunk
+from new_backend_ruminate.domain.conversation.entities.conversation import Conversation
+from new_backend_ruminate.domain.conversation.entities.message import Message
 
 
 class DocumentRepositoryInterface(ABC):
@@ -13,6 +15,26 @@ class DocumentRepositoryInterface(ABC):
         """Create a new document"""
         pass
     
+    @abstractmethod
+    async def create_document_with_conversation(
+        self,
+        document: Document,
+        conversation: Optional[Conversation],
+        root_message: Optional[Message],
+        session: AsyncSession,
+    ) -> Document:
+        """Create a document, its main conversation and root message in one transaction"""
+        pass
+    
+    @abstractmethod
+    async def create_documents_with_conversations(
+        self,
+        entries: List[Tuple[Document, Optional[Conversation], Optional[Message]]],
+        session: AsyncSession,
+    ) -> int:
+        """Create many documents with their main conversations in one transaction"""
+        pass
+    
     @abstractmethod
     async def get_document(self, document_id: str, session: AsyncSession) -> Optional[Document]:
         """Get a document by ID"""
@@ -28,6 +50,45 @@ class DocumentRepositoryInterface(ABC):
         """Update an existing document"""
         pass
     
+    @abstractmethod
+    async def advance_reading_progress(
+        self, document_id: str, user_id: str, block_id: str, position: int, session: AsyncSession
+    ) -> Optional[Document]:
+        """Move the user's reading progress forward if position is further; None if unchanged"""
+        pass
+    
+    @abstractmethod
+    async def claim_document_for_processing(self, document_id: str, session: AsyncSession) -> Optional[Document]:
+        """
+        Atomically move a PENDING, PROCESSING_MARKER or ERROR document to
+        PROCESSING_MARKER; None if it is missing, READY or in any other state
+        """
+        pass
+    
+    @abstractmethod
+    async def fail_document_processing(
+        self, document_id: str, error: str, session: AsyncSession
+    ) -> Optional[Document]:
+        """Atomically put a document that is not READY in ERROR state; None if unchanged"""
+        pass
+    
+    @abstractmethod
+    async def get_analyzed_document_by_hash(
+        self, content_hash: str, session: AsyncSession, exclude_id: Optional[str] = None
+    ) -> Optional[Document]:
+        """Get the latest READY, summarised document with the given content hash"""
+        pass
+    
+    @abstractmethod
+    async def count_documents_by_pdf_path(self, s3_pdf_path: str, session: AsyncSession) -> int:
+        """Number of documents, cloned copies included, that point at this stored PDF"""
+        pass
+    
+    @abstractmethod
+    async def delete_document_content(self, document_id: str, session: AsyncSession) -> None:
+        """Delete a document's chunks, pages and blocks, keeping the document row"""
+        pass
+    
     @abstractmethod
     async def delete_document(self, document_id: str, session: AsyncSession) -> bool:
         """Delete a document"""
@@ -39,6 +100,11 @@ class DocumentRepositoryInterface(ABC):
         """Create multiple pages"""
         pass
     
+    @abstractmethod
+    async def bulk_create_pages(self, pages: List[Page], session: AsyncSession) -> int:
+        """Insert pages in a single round-trip without refreshing them"""
+        pass
+    
     @abstractmethod
     async def get_pages_by_document(self, document_id: str, session: AsyncSession) -> List[Page]:
         """Get all pages for a document"""
@@ -55,19 +121,46 @@ class DocumentRepositoryInterface(ABC):
         """Create multiple blocks"""
         pass
     
+    @abstractmethod
+    async def bulk_create_blocks(self, blocks: List[Block], session: AsyncSession) -> int:
+        """Insert blocks in a single round-trip without refreshing them"""
+        pass
+    
     @abstractmethod
     async def get_blocks_by_document(self, document_id: str, session: AsyncSession) -> List[Block]:
         """Get all blocks for a document"""
         pass
     
+    @abstractmethod
+    async def get_text_blocks(
+        self,
+        document_id: str,
+        session: AsyncSession,
+        chunk_id: Optional[str] = None,
+        start_page: Optional[int] = None,
+        end_page: Optional[int] = None
+    ) -> List[BlockText]:
+        """Get blocks by chunk or page range [start_page, end_page) in reading order, text columns only"""
+        pass
+    
+    @abstractmethod
+    async def get_block_text(self, block_id: str, session: AsyncSession) -> Optional[BlockText]:
+        """Get the text-only projection of a specific block"""
+        pass
+    
+    @abstractmethod
+    async def get_block_page_numbers(self, block_ids: List[str], session: AsyncSession) -> Dict[str, Optional[int]]:
+        """Map block ids to their page numbers in a single query"""
+        pass
+    
     @abstractmethod
     async def get_blocks_by_page(self, page_id: str, session: AsyncSession) -> List[Block]:
         """Get all blocks for a page"""
         pass
     
     @abstractmethod
-    async def get_block(self, block_id: str, session: AsyncSession) -> Optional[Block]:
-        """Get a specific block"""
+    async def get_block(self, block_id: str, session: AsyncSession, include_images: bool = True) -> Optional[Block]:
+        """Get a specific block (images are deferred unless include_images)"""
         pass
     
     @abstractmethod
@@ -102,6 +195,17 @@ class DocumentRepositoryInterface(ABC):
         """Get pages in range with their blocks eagerly loaded (fixes N+1 query)"""
         pass
     
+    @abstractmethod
+    async def get_pages_in_range_with_block_texts(
+        self, 
+        document_id: str, 
+        center_page: int, 
+        radius: int, 
+        session: AsyncSession
+    ) -> List[Page]:
+        """Get pages in range with text-only block projections eagerly loaded"""
+        pass
+    
     # Chunk operations
     @abstractmethod
     async def create_chunks(self, chunks: List[Chunk], session: AsyncSession) -> List[Chunk]:
@@ -123,6 +227,16 @@ class DocumentRepositoryInterface(ABC):
         """Update a chunk"""
         pass
     
+    @abstractmethod
+    async def claim_chunks_for_processing(
+        self, chunk_ids: List[str], session: AsyncSession, stale_after: Optional[float] = None
+    ) -> List[Chunk]:
+        """
+        Atomically move UNPROCESSED chunks (and PROCESSING ones untouched for
+        stale_after seconds) to PROCESSING, returning only those claimed by this caller
+        """
+        pass
+    
     @abstractmethod
     async def get_chunks_up_to_page(self, document_id: str, page_number: int, session: AsyncSession) -> List[Chunk]:
         """Get all chunks that contain pages up to and including the given page number"""
@@ -1,8 +1,9 @@
 # new_backend_ruminate/domain/ports/document_analyzer.py
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
 
 from new_backend_ruminate.domain.document.entities.block import Block
+from new_backend_ruminate.domain.document.entities.block_text import BlockText
 
 
 class DocumentAnalyzer(ABC):
@@ -11,14 +12,14 @@ class DocumentAnalyzer(ABC):
     @abstractmethod
     async def generate_document_summary(
         self, 
-        blocks: List[Block], 
+        blocks: List[Union[Block, BlockText]], 
         document_title: str
     ) -> str:
         """
         Generate a comprehensive summary of the entire document.
         
         Args:
-            blocks: List of document blocks containing the content
+            blocks: Document blocks (full or text-only projections) containing the content
             document_title: Title of the document for context
             
         Returns:
@@ -29,7 +30,7 @@ class DocumentAnalyzer(ABC):
     @abstractmethod
     async def generate_document_info(
         self, 
-        blocks: List[Block], 
+        blocks: List[Union[Block, BlockText]], 
         current_title: str
     ) -> Dict[str, Any]:
         """
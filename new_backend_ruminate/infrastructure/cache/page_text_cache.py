@@ -0,0 +1,159 @@
+# new_backend_ruminate/infrastructure/cache/page_text_cache.py
+from __future__ import annotations
+import logging
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from new_backend_ruminate.config import settings
+from new_backend_ruminate.infrastructure.redis_client import build_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class PageTextCache(ABC):
+    """
+    Rendered plain text per page, keyed by (document_id, page_number).
+
+    Only pages the database returned are cached; a page range that runs past
+    the end of a document is looked up again on the next build. Writers
+    invalidate through the document repository whenever pages or blocks
+    change.
+    """
+
+    @abstractmethod
+    async def get_many(self, document_id: str, page_numbers: Iterable[int]) -> Dict[int, str]:
+        """Cached text for those of page_numbers that are present"""
+        pass
+
+    @abstractmethod
+    async def set_many(self, document_id: str, texts: Dict[int, str]) -> None:
+        """Cache text per page number"""
+        pass
+
+    @abstractmethod
+    async def invalidate_pages(self, document_id: str, page_numbers: Iterable[int]) -> None:
+        """Drop the given pages of a document"""
+        pass
+
+    @abstractmethod
+    async def invalidate_document(self, document_id: str) -> None:
+        """Drop every cached page of a document"""
+        pass
+
+
+class InProcessPageTextCache(PageTextCache):
+    """LRU cache bounded by the UTF-8 size of the cached text"""
+
+    def __init__(self, max_bytes: Optional[int] = None) -> None:
+        self._max_bytes = max_bytes if max_bytes is not None else settings().page_text_cache_max_bytes
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[str, int]]" = OrderedDict()
+        self._pages_by_document: Dict[str, Set[int]] = {}
+        self._size = 0
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    async def get_many(self, document_id: str, page_numbers: Iterable[int]) -> Dict[int, str]:
+        found = {}
+        for page_number in page_numbers:
+            key = (document_id, page_number)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                found[page_number] = entry[0]
+        return found
+
+    async def set_many(self, document_id: str, texts: Dict[int, str]) -> None:
+        for page_number, text in texts.items():
+            cost = len(text.encode("utf-8"))
+            if cost > self._max_bytes:
+                continue
+            self._discard((document_id, page_number))
+            self._entries[(document_id, page_number)] = (text, cost)
+            self._pages_by_document.setdefault(document_id, set()).add(page_number)
+            self._size += cost
+        self._evict()
+
+    async def invalidate_pages(self, document_id: str, page_numbers: Iterable[int]) -> None:
+        for page_number in page_numbers:
+            self._discard((document_id, page_number))
+
+    async def invalidate_document(self, document_id: str) -> None:
+        for page_number in list(self._pages_by_document.get(document_id, ())):
+            self._discard((document_id, page_number))
+
+    def _discard(self, key: Tuple[str, int]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._size -= entry[1]
+        document_id, page_number = key
+        pages = self._pages_by_document.get(document_id)
+        if pages is not None:
+            pages.discard(page_number)
+            if not pages:
+                del self._pages_by_document[document_id]
+
+    def _evict(self) -> None:
+        while self._size > self._max_bytes and self._entries:
+            key = next(iter(self._entries))
+            self._discard(key)
+
+
+class RedisPageTextCache(PageTextCache):
+    """
+    One hash per document (page_text:<document_id>) with a field per page.
+
+    The memory budget is enforced by the Redis server (maxmemory with an
+    allkeys-lru policy); each hash also expires after the configured TTL.
+    Redis errors are logged and treated as cache misses.
+    """
+
+    def __init__(self, url: str | None = None, ttl_seconds: Optional[int] = None) -> None:
+        self._url = url or settings().redis_url
+        self._ttl = ttl_seconds if ttl_seconds is not None else settings().page_text_cache_ttl
+        self._client = build_redis_client(self._url)
+
+    @staticmethod
+    def _key(document_id: str) -> str:
+        return f"page_text:{document_id}"
+
+    async def get_many(self, document_id: str, page_numbers: Iterable[int]) -> Dict[int, str]:
+        page_numbers = list(page_numbers)
+        if not page_numbers:
+            return {}
+        try:
+            values = await self._client.hmget(self._key(document_id), [str(n) for n in page_numbers])
+        except Exception as e:
+            logger.warning(f"[PageTextCache] get failed for {document_id}: {e}")
+            return {}
+        return {n: v for n, v in zip(page_numbers, values) if v is not None}
+
+    async def set_many(self, document_id: str, texts: Dict[int, str]) -> None:
+        if not texts:
+            return
+        key = self._key(document_id)
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                pipe.hset(key, mapping={str(n): text for n, text in texts.items()})
+                pipe.expire(key, self._ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"[PageTextCache] set failed for {document_id}: {e}")
+
+    async def invalidate_pages(self, document_id: str, page_numbers: Iterable[int]) -> None:
+        fields = [str(n) for n in page_numbers]
+        if not fields:
+            return
+        try:
+            await self._client.hdel(self._key(document_id), *fields)
+        except Exception as e:
+            logger.warning(f"[PageTextCache] invalidate failed for {document_id}: {e}")
+
+    async def invalidate_document(self, document_id: str) -> None:
+        try:
+            await self._client.delete(self._key(document_id))
+        except Exception as e:
+            logger.warning(f"[PageTextCache] invalidate failed for {document_id}: {e}")
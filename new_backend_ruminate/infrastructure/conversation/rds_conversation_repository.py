@@ -187,12 +187,15 @@ class RDSConversationRepository(ConversationRepository):
         await session.execute(sql, {"parent_id": parent_id, "child_id": child_id})
 
     async def update_message_content(
-        self, mid: str, new: str, session: AsyncSession
+        self, mid: str, new: str, session: AsyncSession, status: str | None = None
     ) -> None:
+        values = {"content": new}
+        if status is not None:
+            values["status"] = status
         await session.execute(
             update(Message)
             .where(Message.id == mid)
-            .values(content=new)
+            .values(**values)
         )
     
     async def update_message_metadata(
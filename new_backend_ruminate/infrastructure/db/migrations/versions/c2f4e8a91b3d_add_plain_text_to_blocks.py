@@ -0,0 +1,65 @@
+"""add plain_text to blocks
+
+Revision ID: c2f4e8a91b3d
+Revises: 94db5553009f
+Create Date: 2025-08-12 10:14:32.418207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from new_backend_ruminate.infrastructure.db.migrations.clone_function import create_clone_function
+from new_backend_ruminate.utils.html_text import html_to_text
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2f4e8a91b3d'
+down_revision: Union[str, None] = '94db5553009f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    op.add_column('blocks', sa.Column('plain_text', sa.Text(), nullable=True))
+
+    # Backfill existing blocks in batches using the same extractor as ingest
+    blocks = sa.table(
+        'blocks',
+        sa.column('id', sa.String),
+        sa.column('html_content', sa.Text),
+        sa.column('plain_text', sa.Text),
+    )
+    bind = op.get_bind()
+    last_id = ""
+    while True:
+        rows = bind.execute(
+            sa.select(blocks.c.id, blocks.c.html_content)
+            .where(blocks.c.id > last_id)
+            .where(blocks.c.html_content.isnot(None))
+            .where(blocks.c.plain_text.is_(None))
+            .order_by(blocks.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        bind.execute(
+            blocks.update()
+            .where(blocks.c.id == sa.bindparam('block_id'))
+            .values(plain_text=sa.bindparam('text')),
+            [{"block_id": row.id, "text": html_to_text(row.html_content)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+    # Cloned documents must carry plain_text over with their blocks
+    if bind.dialect.name == "postgresql":
+        create_clone_function(with_plain_text=True, with_content_hash=False)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        create_clone_function(with_plain_text=False, with_content_hash=False)
+    op.drop_column('blocks', 'plain_text')
@@ -0,0 +1,27 @@
+"""add status to messages
+
+Revision ID: d5a7c3e9f210
+Revises: c2f4e8a91b3d
+Create Date: 2025-08-14 09:21:05.532114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a7c3e9f210'
+down_revision: Union[str, None] = 'c2f4e8a91b3d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # streaming | completed | failed; existing messages are complete
+    op.add_column('messages', sa.Column('status', sa.String(length=16), nullable=False, server_default='completed'))
+
+
+def downgrade() -> None:
+    op.drop_column('messages', 'status')
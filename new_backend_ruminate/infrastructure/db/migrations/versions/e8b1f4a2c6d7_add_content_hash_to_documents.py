@@ -0,0 +1,29 @@
+"""add content_hash to documents
+
+Revision ID: e8b1f4a2c6d7
+Revises: d5a7c3e9f210
+Create Date: 2025-08-18 14:02:47.218306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b1f4a2c6d7'
+down_revision: Union[str, None] = 'd5a7c3e9f210'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # SHA-256 of the uploaded PDF, used to deduplicate blobs and Marker runs
+    op.add_column('documents', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_documents_content_hash'), 'documents', ['content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_documents_content_hash'), table_name='documents')
+    op.drop_column('documents', 'content_hash')
@@ -0,0 +1,30 @@
+"""copy content_hash in clone_document_with_everything
+
+Revision ID: f1c7d2e9a4b6
+Revises: e8b1f4a2c6d7
+Create Date: 2025-08-21 09:37:12.604518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from new_backend_ruminate.infrastructure.db.migrations.clone_function import create_clone_function
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c7d2e9a4b6'
+down_revision: Union[str, None] = 'e8b1f4a2c6d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Cloned template documents share the source's PDF blob, so they carry its hash too
+    if op.get_bind().dialect.name == "postgresql":
+        create_clone_function(with_plain_text=True, with_content_hash=True)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        create_clone_function(with_plain_text=True, with_content_hash=False)
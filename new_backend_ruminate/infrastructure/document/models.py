@@ -20,6 +20,7 @@ class DocumentModel(Base):
     processing_error = Column(String, nullable=True)
     marker_job_id = Column(String, nullable=True)
     marker_check_url = Column(String, nullable=True)
+    content_hash = Column(String(64), nullable=True, index=True)  # SHA-256 of the PDF
     # Batch processing fields
     parent_document_id = Column(String, ForeignKey("documents.id"), nullable=True)
     batch_id = Column(String, nullable=True)
@@ -42,8 +43,9 @@ class DocumentModel(Base):
     chunks = relationship("ChunkModel", back_populates="document", cascade="all, delete-orphan")
     conversations = relationship("Conversation", back_populates="document", foreign_keys="Conversation.document_id")
     messages = relationship("Message", back_populates="document")
-    # Main conversation relationship
-    main_conversation = relationship("Conversation", foreign_keys=[main_conversation_id])
+    # Main conversation relationship; post_update breaks the documents <-> conversations
+    # cycle so a document and its conversation can be inserted in the same flush
+    main_conversation = relationship("Conversation", foreign_keys=[main_conversation_id], post_update=True)
     # Batch processing relationships
     parent_document = relationship("DocumentModel", remote_side=[id], backref="child_documents")
     # Text enhancements relationship
@@ -96,6 +98,7 @@ class BlockModel(Base):
     chunk_id = Column(String, ForeignKey("chunks.id"), nullable=True)  # Reference to chunk
     block_type = Column(String, nullable=True)
     html_content = Column(Text, nullable=True)
+    plain_text = Column(Text, nullable=True)  # html_content stripped of tags at ingest
     polygon = Column(JSON, nullable=True)
     page_number = Column(Integer, nullable=True)
     section_hierarchy = Column(JSON, nullable=True)
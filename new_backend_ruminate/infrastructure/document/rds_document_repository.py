@@ -1,42 +1,110 @@
 """RDS (PostgreSQL) implementation of DocumentRepositoryInterface"""
-from typing import List, Optional
+import json
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, or_, exists, func, insert, update, delete, inspect
+from sqlalchemy.orm import defer, load_only, selectinload
 from new_backend_ruminate.domain.document.repositories.document_repository_interface import DocumentRepositoryInterface
-from new_backend_ruminate.domain.document.entities import Document, Page, Block, DocumentStatus, BlockType
+from new_backend_ruminate.domain.document.entities import Document, Page, Block, BlockText, DocumentStatus, BlockType
 from new_backend_ruminate.domain.document.entities.chunk import Chunk, ChunkStatus
+from new_backend_ruminate.domain.conversation.entities.conversation import Conversation
+from new_backend_ruminate.domain.conversation.entities.message import Message
 from new_backend_ruminate.infrastructure.document.models import DocumentModel, PageModel, BlockModel, ChunkModel
-from datetime import datetime
+from new_backend_ruminate.infrastructure.cache.page_text_cache import PageTextCache
+from new_backend_ruminate.utils.html_text import html_to_text
+from datetime import datetime, timedelta
+
+
+# Columns written by the bulk insert paths, in COPY order
+_PAGE_COLUMNS = (
+    "id", "document_id", "page_number", "polygon", "block_ids",
+    "section_hierarchy", "html_content", "created_at", "updated_at",
+)
+_BLOCK_COLUMNS = (
+    "id", "document_id", "page_id", "chunk_id", "block_type", "html_content",
+    "plain_text", "polygon", "page_number", "section_hierarchy", "meta_data", "images",
+    "is_critical", "critical_summary", "created_at", "updated_at",
+)
+# Columns loaded for text-only block projections
+_BLOCK_TEXT_COLUMNS = (
+    BlockModel.id,
+    BlockModel.document_id,
+    BlockModel.page_id,
+    BlockModel.chunk_id,
+    BlockModel.block_type,
+    BlockModel.html_content,
+    BlockModel.plain_text,
+    BlockModel.page_number,
+)
+_PAGE_JSON_COLUMNS = frozenset({"polygon", "block_ids", "section_hierarchy"})
+_BLOCK_JSON_COLUMNS = frozenset({"polygon", "section_hierarchy", "meta_data", "images"})
+# Domain field -> column for the fields each update method may write
+_DOCUMENT_UPDATE_COLUMNS = {
+    name: name for name in (
+        "status", "s3_pdf_path", "title", "summary", "document_info", "arguments",
+        "key_themes_terms", "processing_error", "marker_job_id", "marker_check_url",
+        "content_hash", "parent_document_id", "batch_id", "chunk_index", "total_chunks",
+        "is_auto_processed", "furthest_read_block_id", "furthest_read_position",
+        "furthest_read_updated_at", "main_conversation_id",
+    )
+}
+_BLOCK_UPDATE_COLUMNS = {
+    "chunk_id": "chunk_id",
+    "is_critical": "is_critical",
+    "critical_summary": "critical_summary",
+    "metadata": "meta_data",
+}
+_CHUNK_UPDATE_COLUMNS = {name: name for name in ("status", "summary", "processing_error")}
+# Statuses of documents whose processing never completed; a job may (re)claim these
+_CLAIMABLE_DOCUMENT_STATUSES = (
+    DocumentStatus.PENDING.value,
+    DocumentStatus.PROCESSING_MARKER.value,
+    DocumentStatus.ERROR.value,
+)
+
+
+def _changed_values(entity, columns: Dict[str, str]) -> Dict[str, Any]:
+    """Column values for the entity's changed fields, or every updatable field if it is untracked"""
+    changed = entity.changed_fields()
+    values = {
+        column: getattr(entity, name)
+        for name, column in columns.items()
+        if changed is None or name in changed
+    }
+    if isinstance(values.get("status"), Enum):
+        values["status"] = values["status"].value
+    values["updated_at"] = datetime.now()
+    return values
+
+
+async def _update_returning(model, entity_id: str, values: Dict[str, Any], session: AsyncSession):
+    """Single UPDATE ... RETURNING by primary key; None if the row does not exist"""
+    result = await session.execute(
+        update(model)
+        .where(model.id == entity_id)
+        .values(**values)
+        .returning(model)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
 
 
 class RDSDocumentRepository(DocumentRepositoryInterface):
     """PostgreSQL implementation of document repository"""
     
+    def __init__(self, page_text_cache: Optional[PageTextCache] = None):
+        """
+        Args:
+            page_text_cache: Rendered page text cache, invalidated here whenever
+                pages or blocks are written
+        """
+        self._page_text_cache = page_text_cache
+    
     # Document operations
     async def create_document(self, document: Document, session: AsyncSession) -> Document:
         """Create a new document"""
-        db_document = DocumentModel(
-            id=document.id,
-            user_id=document.user_id,
-            status=document.status.value if isinstance(document.status, DocumentStatus) else document.status,
-            s3_pdf_path=document.s3_pdf_path,
-            title=document.title,
-            summary=document.summary,
-            document_info=document.document_info,
-            arguments=document.arguments,
-            key_themes_terms=document.key_themes_terms,
-            processing_error=document.processing_error,
-            marker_job_id=document.marker_job_id,
-            marker_check_url=document.marker_check_url,
-            parent_document_id=document.parent_document_id,
-            batch_id=document.batch_id,
-            chunk_index=document.chunk_index,
-            total_chunks=document.total_chunks,
-            is_auto_processed=document.is_auto_processed,
-            main_conversation_id=document.main_conversation_id,
-            created_at=document.created_at,
-            updated_at=document.updated_at
-        )
+        db_document = self._to_db_document(document)
         
         session.add(db_document)
         await session.commit()
@@ -44,6 +112,45 @@ class RDSDocumentRepository(DocumentRepositoryInterface):
         
         return self._to_domain_document(db_document)
     
+    async def create_document_with_conversation(
+        self,
+        document: Document,
+        conversation: Optional[Conversation],
+        root_message: Optional[Message],
+        session: AsyncSession,
+    ) -> Document:
+        """Create a document and its main conversation in one transaction"""
+        await self.create_documents_with_conversations([(document, conversation, root_message)], session)
+        return document
+    
+    async def create_documents_with_conversations(
+        self,
+        entries: List[Tuple[Document, Optional[Conversation], Optional[Message]]],
+        session: AsyncSession,
+    ) -> int:
+        """
+        Unit of work for uploads: every document row (storage key included),
+        its main conversation and the conversation's root system message are
+        written in one flush and one commit, with no refresh or re-select.
+        The conversation and root message must be unsaved and already linked
+        to each other (ids, root_message_id and active thread set).
+        """
+        for document, conversation, root_message in entries:
+            db_document = self._to_db_document(document)
+            session.add(db_document)
+            if conversation is None:
+                continue
+            # Through the relationships, so the flush orders documents ->
+            # conversations -> messages and back-fills main_conversation_id
+            conversation.document = db_document
+            db_document.main_conversation = conversation
+            session.add(conversation)
+            if root_message is not None:
+                session.add(root_message)
+            document.main_conversation_id = conversation.id
+        await session.commit()
+        return len(entries)
+    
     async def get_document(self, document_id: str, session: AsyncSession) -> Optional[Document]:
         """Get a document by ID"""
         result = await session.execute(
@@ -67,42 +174,118 @@ class RDSDocumentRepository(DocumentRepositoryInterface):
         return [self._to_domain_document(doc) for doc in db_documents]
     
     async def update_document(self, document: Document, session: AsyncSession) -> Document:
-        """Update an existing document"""
-        result = await session.execute(
-            select(DocumentModel).where(DocumentModel.id == document.id)
+        """Update an existing document, writing only its changed fields"""
+        db_document = await _update_returning(
+            DocumentModel, document.id, _changed_values(document, _DOCUMENT_UPDATE_COLUMNS), session
         )
-        db_document = result.scalar_one_or_none()
-        
         if not db_document:
             raise ValueError(f"Document {document.id} not found")
         
-        # Update fields
-        db_document.status = document.status.value if isinstance(document.status, DocumentStatus) else document.status
-        db_document.s3_pdf_path = document.s3_pdf_path
-        db_document.title = document.title
-        db_document.summary = document.summary
-        db_document.document_info = document.document_info
-        db_document.arguments = document.arguments
-        db_document.key_themes_terms = document.key_themes_terms
-        db_document.processing_error = document.processing_error
-        db_document.marker_job_id = document.marker_job_id
-        db_document.marker_check_url = document.marker_check_url
-        db_document.parent_document_id = document.parent_document_id
-        db_document.batch_id = document.batch_id
-        db_document.chunk_index = document.chunk_index
-        db_document.total_chunks = document.total_chunks
-        db_document.is_auto_processed = document.is_auto_processed
-        db_document.furthest_read_block_id = document.furthest_read_block_id
-        db_document.furthest_read_position = document.furthest_read_position
-        db_document.furthest_read_updated_at = document.furthest_read_updated_at
-        db_document.main_conversation_id = document.main_conversation_id
-        db_document.updated_at = datetime.now()
-        
         await session.commit()
-        await session.refresh(db_document)
+        document.mark_clean()
         
         return self._to_domain_document(db_document)
     
+    async def advance_reading_progress(
+        self, document_id: str, user_id: str, block_id: str, position: int, session: AsyncSession
+    ) -> Optional[Document]:
+        """
+        Move reading progress forward in one conditional UPDATE: only when the
+        document belongs to user_id, block_id is one of its blocks and position
+        is past the stored one. Returns None when nothing was updated.
+        """
+        now = datetime.now()
+        result = await session.execute(
+            update(DocumentModel)
+            .where(
+                DocumentModel.id == document_id,
+                DocumentModel.user_id == user_id,
+                or_(
+                    DocumentModel.furthest_read_position.is_(None),
+                    DocumentModel.furthest_read_position < position,
+                ),
+                exists().where(BlockModel.id == block_id, BlockModel.document_id == document_id),
+            )
+            .values(
+                furthest_read_block_id=block_id,
+                furthest_read_position=position,
+                furthest_read_updated_at=now,
+                updated_at=now,
+            )
+            .returning(DocumentModel)
+            .execution_options(populate_existing=True)
+        )
+        db_document = result.scalar_one_or_none()
+        await session.commit()
+        
+        return self._to_domain_document(db_document) if db_document else None
+    
+    async def claim_document_for_processing(self, document_id: str, session: AsyncSession) -> Optional[Document]:
+        """
+        Move a document that has not completed (PENDING, PROCESSING_MARKER or
+        ERROR) to PROCESSING_MARKER in one conditional UPDATE. Returns None when
+        the document is missing or in any other state, READY included.
+        """
+        result = await session.execute(
+            update(DocumentModel)
+            .where(
+                DocumentModel.id == document_id,
+                DocumentModel.status.in_(_CLAIMABLE_DOCUMENT_STATUSES),
+            )
+            .values(status=DocumentStatus.PROCESSING_MARKER.value, updated_at=datetime.now())
+            .returning(DocumentModel)
+            .execution_options(populate_existing=True)
+        )
+        db_document = result.scalar_one_or_none()
+        await session.commit()
+        
+        return self._to_domain_document(db_document) if db_document else None
+    
+    async def fail_document_processing(
+        self, document_id: str, error: str, session: AsyncSession
+    ) -> Optional[Document]:
+        """Put a document that is not READY in ERROR state; None if it is READY or missing"""
+        result = await session.execute(
+            update(DocumentModel)
+            .where(
+                DocumentModel.id == document_id,
+                DocumentModel.status != DocumentStatus.READY.value,
+            )
+            .values(status=DocumentStatus.ERROR.value, processing_error=error, updated_at=datetime.now())
+            .returning(DocumentModel)
+            .execution_options(populate_existing=True)
+        )
+        db_document = result.scalar_one_or_none()
+        await session.commit()
+        
+        return self._to_domain_document(db_document) if db_document else None
+    
+    async def get_analyzed_document_by_hash(
+        self, content_hash: str, session: AsyncSession, exclude_id: Optional[str] = None
+    ) -> Optional[Document]:
+        """Most recent READY document with this content hash that already has a summary"""
+        query = (
+            select(DocumentModel)
+            .where(
+                DocumentModel.content_hash == content_hash,
+                DocumentModel.status == DocumentStatus.READY.value,
+                DocumentModel.summary.is_not(None),
+            )
+            .order_by(DocumentModel.updated_at.desc())
+            .limit(1)
+        )
+        if exclude_id:
+            query = query.where(DocumentModel.id != exclude_id)
+        result = await session.execute(query)
+        db_document = result.scalar_one_or_none()
+        return self._to_domain_document(db_document) if db_document else None
+    
+    async def count_documents_by_pdf_path(self, s3_pdf_path: str, session: AsyncSession) -> int:
+        """Number of documents, cloned copies included, that point at this stored PDF"""
+        return await session.scalar(
+            select(func.count()).select_from(DocumentModel).where(DocumentModel.s3_pdf_path == s3_pdf_path)
+        )
+    
     async def delete_document(self, document_id: str, session: AsyncSession) -> bool:
         """Delete a document"""
         result = await session.execute(
@@ -113,9 +296,21 @@ class RDSDocumentRepository(DocumentRepositoryInterface):
         if db_document:
             await session.delete(db_document)
             await session.commit()
+            if self._page_text_cache:
+                await self._page_text_cache.invalidate_document(document_id)
             return True
         return False
     
+    async def delete_document_content(self, document_id: str, session: AsyncSession) -> None:
+        """Delete a document's chunks, pages and blocks, keeping the document row"""
+        # Blocks reference pages and chunks, so they go first
+        await session.execute(delete(BlockModel).where(BlockModel.document_id == document_id))
+        await session.execute(delete(PageModel).where(PageModel.document_id == document_id))
+        await session.execute(delete(ChunkModel).where(ChunkModel.document_id == document_id))
+        await session.commit()
+        if self._page_text_cache:
+            await self._page_text_cache.invalidate_document(document_id)
+    
     # Page operations
     async def create_pages(self, pages: List[Page], session: AsyncSession) -> List[Page]:
         """Create multiple pages"""
@@ -136,6 +331,7 @@ class RDSDocumentRepository(DocumentRepositoryInterface):
             db_pages.append(db_page)
         
         await session.commit()
+        await self._invalidate_page_text((p.document_id, p.page_number) for p in pages)
         
         # Refresh all pages
         for db_page in db_pages:
@@ -143,6 +339,13 @@ class RDSDocumentRepository(DocumentRepositoryInterface):
         
         return [self._to_domain_page(p) for p in db_pages]
     
+    async def bulk_create_pages(self, pages: List[Page], session: AsyncSession) -> int:
+        """Insert pages in a single round-trip without refreshing them"""
+        rows = [self._page_row(page) for page in pages]
+        await self._bulk_insert(PageModel, _PAGE_COLUMNS, _PAGE_JSON_COLUMNS, rows, session)
+        await self._invalidate_page_text((p.document_id, p.page_number) for p in pages)
+        return len(rows)
+    
     async def get_pages_by_document(self, document_id: str, session: AsyncSession) -> List[Page]:
         """Get all pages for a document"""
         result = await session.execute(
@@ -177,6 +380,7 @@ class RDSDocumentRepository(DocumentRepositoryInterface):
                 chunk_id=block.chunk_id,
                 block_type=block.block_type.value if block.block_type else None,
                 html_content=block.html_content,
+                plain_text=self._plain_text(block),
                 polygon=block.polygon,
                 page_number=block.page_number,
                 section_hierarchy=block.section_hierarchy,
@@ -191,6 +395,7 @@ class RDSDocumentRepository(DocumentRepositoryInterface):
             db_blocks.append(db_block)
         
         await session.commit()
+        await self._invalidate_page_text((b.document_id, b.page_number) for b in blocks)
         
         # Refresh all blocks
         for db_block in db_blocks:
@@ -198,6 +403,13 @@ class RDSDocumentRepository(DocumentRepositoryInterface):
         
         return [self._to_domain_block(b) for b in db_blocks]
     
+    async def bulk_create_blocks(self, blocks: List[Block], session: AsyncSession) -> int:
+        """Insert blocks in a single round-trip without refreshing them"""
+        rows = [self._block_row(block) for block in blocks]
+        await self._bulk_insert(BlockModel, _BLOCK_COLUMNS, _BLOCK_JSON_COLUMNS, rows, session)
+        await self._invalidate_page_text((b.document_id, b.page_number) for b in blocks)
+        return len(rows)
+    
     async def get_blocks_by_document(self, document_id: str, session: AsyncSession) -> List[Block]:
         """Get all blocks for a document in proper reading order"""
         # First get all pages for this document in order
@@ -238,6 +450,75 @@ class RDSDocumentRepository(DocumentRepositoryInterface):
         
         return [self._to_domain_block(block) for block in ordered_blocks]
     
+    async def get_text_blocks(
+        self,
+        document_id: str,
+        session: AsyncSession,
+        chunk_id: Optional[str] = None,
+        start_page: Optional[int] = None,
+        end_page: Optional[int] = None
+    ) -> List[BlockText]:
+        """Get blocks in reading order with only their text columns loaded"""
+        conditions = [BlockModel.document_id == document_id]
+        if chunk_id is not None:
+            conditions.append(BlockModel.chunk_id == chunk_id)
+        if start_page is not None:
+            conditions.append(BlockModel.page_number >= start_page)
+        if end_page is not None:
+            conditions.append(BlockModel.page_number < end_page)
+        
+        # Select columns rather than entities so images/polygon/meta_data never load
+        result = await session.execute(
+            select(*_BLOCK_TEXT_COLUMNS)
+            .where(and_(*conditions))
+            .order_by(BlockModel.page_number, BlockModel.id)
+        )
+        blocks = [self._to_block_text(row) for row in result]
+        if not blocks:
+            return blocks
+        
+        # Order within each page by the page's block_ids (reading order)
+        page_numbers = {b.page_number for b in blocks if b.page_number is not None}
+        pages_result = await session.execute(
+            select(PageModel.block_ids)
+            .where(
+                and_(
+                    PageModel.document_id == document_id,
+                    PageModel.page_number.in_(sorted(page_numbers))
+                )
+            )
+        )
+        positions = {}
+        for (block_ids,) in pages_result:
+            for position, block_id in enumerate(block_ids or []):
+                positions[block_id] = position
+        
+        blocks.sort(key=lambda b: (
+            b.page_number if b.page_number is not None else float("inf"),
+            positions.get(b.id, len(positions))
+        ))
+        return blocks
+    
+    async def get_block_text(self, block_id: str, session: AsyncSession) -> Optional[BlockText]:
+        """Get the text-only projection of a specific block"""
+        result = await session.execute(
+            select(*_BLOCK_TEXT_COLUMNS).where(BlockModel.id == block_id)
+        )
+        row = result.first()
+        
+        if row:
+            return self._to_block_text(row)
+        return None
+    
+    async def get_block_page_numbers(self, block_ids: List[str], session: AsyncSession) -> Dict[str, Optional[int]]:
+        """Map block ids to their page numbers in a single IN query; unknown ids are omitted"""
+        if not block_ids:
+            return {}
+        result = await session.execute(
+            select(BlockModel.id, BlockModel.page_number).where(BlockModel.id.in_(set(block_ids)))
+        )
+        return {row.id: row.page_number for row in result}
+    
     async def get_blocks_by_page(self, page_id: str, session: AsyncSession) -> List[Block]:
         """Get all blocks for a page"""
         result = await session.execute(
@@ -249,11 +530,12 @@ class RDSDocumentRepository(DocumentRepositoryInterface):
         
         return [self._to_domain_block(block) for block in db_blocks]
     
-    async def get_block(self, block_id: str, session: AsyncSession) -> Optional[Block]:
-        """Get a specific block"""
-        result = await session.execute(
-            select(BlockModel).where(BlockModel.id == block_id)
-        )
+    async def get_block(self, block_id: str, session: AsyncSession, include_images: bool = True) -> Optional[Block]:
+        """Get a specific block (images are deferred unless include_images)"""
+        query = select(BlockModel).where(BlockModel.id == block_id)
+        if not include_images:
+            query = query.options(defer(BlockModel.images))
+        result = await session.execute(query)
         db_block = result.scalar_one_or_none()
         
         if db_block:
@@ -261,24 +543,16 @@ class RDSDocumentRepository(DocumentRepositoryInterface):
         return None
     
     async def update_block(self, block: Block, session: AsyncSession) -> Block:
-        """Update a block (for critical content analysis)"""
-        result = await session.execute(
-            select(BlockModel).where(BlockModel.id == block.id)
+        """Update a block (for critical content analysis), writing only its changed fields"""
+        db_block = await _update_returning(
+            BlockModel, block.id, _changed_values(block, _BLOCK_UPDATE_COLUMNS), session
         )
-        db_block = result.scalar_one_or_none()
-        
         if not db_block:
             raise ValueError(f"Block {block.id} not found")
         
-        # Update all modifiable fields
-        db_block.chunk_id = block.chunk_id  # Update chunk assignment
-        db_block.is_critical = block.is_critical
-        db_block.critical_summary = block.critical_summary
-        db_block.meta_data = block.metadata  # Update metadata field
-        db_block.updated_at = datetime.now()
-        
         await session.commit()
-        await session.refresh(db_block)
+        block.mark_clean()
+        await self._invalidate_page_text([(db_block.document_id, db_block.page_number)])
         
         return self._to_domain_block(db_block)
     
@@ -326,8 +600,6 @@ class RDSDocumentRepository(DocumentRepositoryInterface):
         session: AsyncSession
     ) -> List[Page]:
         """Get pages in range with their blocks eagerly loaded (fixes N+1 query)"""
-        from sqlalchemy.orm import selectinload
-        
         result = await session.execute(
             select(PageModel)
             .options(selectinload(PageModel.blocks))  # Eager load blocks
@@ -343,6 +615,38 @@ class RDSDocumentRepository(DocumentRepositoryInterface):
         db_pages = result.scalars().all()
         return [self._to_domain_page_with_blocks(page) for page in db_pages]
     
+    async def get_pages_in_range_with_block_texts(
+        self, 
+        document_id: str, 
+        center_page: int, 
+        radius: int, 
+        session: AsyncSession
+    ) -> List[Page]:
+        """Get pages in range with text-only block projections eagerly loaded"""
+        result = await session.execute(
+            select(PageModel)
+            .options(selectinload(PageModel.blocks).load_only(*_BLOCK_TEXT_COLUMNS))
+            .where(
+                and_(
+                    PageModel.document_id == document_id,
+                    PageModel.page_number >= center_page - radius,
+                    PageModel.page_number <= center_page + radius
+                )
+            )
+            .order_by(PageModel.page_number)
+        )
+        db_pages = result.scalars().all()
+        
+        pages = []
+        for db_page in db_pages:
+            page = self._to_domain_page(db_page)
+            # Keep the page's reading order (block_ids), unreferenced blocks last
+            positions = {block_id: i for i, block_id in enumerate(db_page.block_ids or [])}
+            ordered = sorted(db_page.blocks, key=lambda b: (positions.get(b.id, len(positions)), b.id))
+            page.blocks = [self._to_block_text(block) for block in ordered]
+            pages.append(page)
+        return pages
+    
     def _to_domain_page_with_blocks(self, db_page: PageModel) -> Page:
         """Convert DB page with preloaded blocks to domain entity"""
         page = self._to_domain_page(db_page)
@@ -350,10 +654,129 @@ class RDSDocumentRepository(DocumentRepositoryInterface):
         page.blocks = [self._to_domain_block(block) for block in db_page.blocks]
         return page
     
+    async def _invalidate_page_text(self, page_keys) -> None:
+        """Drop cached page text for the given (document_id, page_number) pairs"""
+        if not self._page_text_cache:
+            return
+        pages_by_document: Dict[str, set] = {}
+        for document_id, page_number in page_keys:
+            if document_id is None:
+                continue
+            if page_number is None:
+                # Page unknown: drop everything cached for the document
+                pages_by_document[document_id] = None
+            elif pages_by_document.get(document_id, set()) is not None:
+                pages_by_document.setdefault(document_id, set()).add(page_number)
+        for document_id, page_numbers in pages_by_document.items():
+            if page_numbers is None:
+                await self._page_text_cache.invalidate_document(document_id)
+            else:
+                await self._page_text_cache.invalidate_pages(document_id, page_numbers)
+    
+    # Bulk insert helpers
+    async def _bulk_insert(
+        self,
+        model,
+        columns: tuple,
+        json_columns: frozenset,
+        rows: List[Dict[str, Any]],
+        session: AsyncSession
+    ) -> None:
+        """Write rows with COPY on PostgreSQL, or a multi-row INSERT elsewhere"""
+        if not rows:
+            return
+        
+        if session.bind.dialect.name == "postgresql":
+            # COPY runs on the session's own connection, so it shares its transaction
+            connection = await session.connection()
+            raw_connection = await connection.get_raw_connection()
+            records = [
+                tuple(
+                    json.dumps(row[col]) if col in json_columns and row[col] is not None else row[col]
+                    for col in columns
+                )
+                for row in rows
+            ]
+            await raw_connection.driver_connection.copy_records_to_table(
+                model.__tablename__, records=records, columns=list(columns)
+            )
+        else:
+            # executemany of a single INSERT statement (SQLite and other dialects)
+            await session.execute(insert(model), rows)
+        
+        await session.commit()
+    
+    def _page_row(self, page: Page) -> Dict[str, Any]:
+        """Convert domain page to a column dict for bulk insert"""
+        return {
+            "id": page.id,
+            "document_id": page.document_id,
+            "page_number": page.page_number,
+            "polygon": page.polygon,
+            "block_ids": page.block_ids or [],
+            "section_hierarchy": page.section_hierarchy or {},
+            "html_content": page.html_content or "",
+            "created_at": page.created_at,
+            "updated_at": page.updated_at
+        }
+    
+    def _block_row(self, block: Block) -> Dict[str, Any]:
+        """Convert domain block to a column dict for bulk insert"""
+        return {
+            "id": block.id,
+            "document_id": block.document_id,
+            "page_id": block.page_id,
+            "chunk_id": block.chunk_id,
+            "block_type": block.block_type.value if block.block_type else None,
+            "html_content": block.html_content,
+            "plain_text": self._plain_text(block),
+            "polygon": block.polygon,
+            "page_number": block.page_number,
+            "section_hierarchy": block.section_hierarchy,
+            "meta_data": block.metadata,
+            "images": block.images,
+            "is_critical": block.is_critical,
+            "critical_summary": block.critical_summary,
+            "created_at": block.created_at,
+            "updated_at": block.updated_at
+        }
+    
+    def _plain_text(self, block: Block) -> Optional[str]:
+        """Plain text to store for a block; extracted here if the caller did not"""
+        if block.plain_text is not None or block.html_content is None:
+            return block.plain_text
+        return html_to_text(block.html_content)
+    
     # Helper methods to convert between domain and DB models
+    def _to_db_document(self, document: Document) -> DocumentModel:
+        """Convert domain entity to a new DB model"""
+        return DocumentModel(
+            id=document.id,
+            user_id=document.user_id,
+            status=document.status.value if isinstance(document.status, DocumentStatus) else document.status,
+            s3_pdf_path=document.s3_pdf_path,
+            title=document.title,
+            summary=document.summary,
+            document_info=document.document_info,
+            arguments=document.arguments,
+            key_themes_terms=document.key_themes_terms,
+            processing_error=document.processing_error,
+            marker_job_id=document.marker_job_id,
+            marker_check_url=document.marker_check_url,
+            content_hash=document.content_hash,
+            parent_document_id=document.parent_document_id,
+            batch_id=document.batch_id,
+            chunk_index=document.chunk_index,
+            total_chunks=document.total_chunks,
+            is_auto_processed=document.is_auto_processed,
+            main_conversation_id=document.main_conversation_id,
+            created_at=document.created_at,
+            updated_at=document.updated_at
+        )
+    
     def _to_domain_document(self, db_document: DocumentModel) -> Document:
-        """Convert DB model to domain entity"""
-        return Document(
+        """Convert DB model to domain entity, tracking changes from here on"""
+        document = Document(
             id=db_document.id,
             user_id=db_document.user_id,
             status=DocumentStatus(db_document.status),
@@ -366,6 +789,7 @@ class RDSDocumentRepository(DocumentRepositoryInterface):
             processing_error=db_document.processing_error,
             marker_job_id=db_document.marker_job_id,
             marker_check_url=db_document.marker_check_url,
+            content_hash=db_document.content_hash,
             parent_document_id=db_document.parent_document_id,
             batch_id=db_document.batch_id,
             chunk_index=db_document.chunk_index,
@@ -378,6 +802,8 @@ class RDSDocumentRepository(DocumentRepositoryInterface):
             created_at=db_document.created_at,
             updated_at=db_document.updated_at
         )
+        document.mark_clean()
+        return document
     
     def _to_domain_page(self, db_page: PageModel) -> Page:
         """Convert DB model to domain entity"""
@@ -394,28 +820,46 @@ class RDSDocumentRepository(DocumentRepositoryInterface):
         )
     
     def _to_domain_block(self, db_block: BlockModel) -> Block:
-        """Convert DB model to domain entity"""
-        return Block(
+        """Convert DB model to domain entity, tracking changes from here on"""
+        # Deferred columns that were not loaded stay None rather than lazy-loading
+        unloaded = inspect(db_block).unloaded
+        block = Block(
             id=db_block.id,
             document_id=db_block.document_id,
             page_id=db_block.page_id,
             chunk_id=db_block.chunk_id,
             block_type=BlockType(db_block.block_type) if db_block.block_type else None,
             html_content=db_block.html_content,
+            plain_text=db_block.plain_text,
             polygon=db_block.polygon,
             page_number=db_block.page_number,
             section_hierarchy=db_block.section_hierarchy,
             metadata=db_block.meta_data,
-            images=db_block.images,
+            images=None if "images" in unloaded else db_block.images,
             is_critical=db_block.is_critical,
             critical_summary=db_block.critical_summary,
             created_at=db_block.created_at,
             updated_at=db_block.updated_at
         )
+        block.mark_clean()
+        return block
+    
+    def _to_block_text(self, row) -> BlockText:
+        """Convert a text-column row or partially loaded DB block to a projection"""
+        return BlockText(
+            id=row.id,
+            document_id=row.document_id,
+            page_id=row.page_id,
+            chunk_id=row.chunk_id,
+            block_type=BlockType(row.block_type) if row.block_type else None,
+            html_content=row.html_content,
+            plain_text=row.plain_text,
+            page_number=row.page_number
+        )
     
     def _to_domain_chunk(self, db_chunk: ChunkModel) -> Chunk:
-        """Convert DB model to domain entity"""
-        return Chunk(
+        """Convert DB model to domain entity, tracking changes from here on"""
+        chunk = Chunk(
             id=db_chunk.id,
             document_id=db_chunk.document_id,
             chunk_index=db_chunk.chunk_index,
@@ -427,6 +871,8 @@ class RDSDocumentRepository(DocumentRepositoryInterface):
             created_at=db_chunk.created_at,
             updated_at=db_chunk.updated_at
         )
+        chunk.mark_clean()
+        return chunk
     
     # Chunk operations
     async def create_chunks(self, chunks: List[Chunk], session: AsyncSession) -> List[Chunk]:
@@ -479,26 +925,73 @@ class RDSDocumentRepository(DocumentRepositoryInterface):
         return None
     
     async def update_chunk(self, chunk: Chunk, session: AsyncSession) -> Chunk:
-        """Update a chunk"""
-        result = await session.execute(
-            select(ChunkModel).where(ChunkModel.id == chunk.id)
+        """Update a chunk, writing only its changed fields"""
+        db_chunk = await _update_returning(
+            ChunkModel, chunk.id, _changed_values(chunk, _CHUNK_UPDATE_COLUMNS), session
         )
-        db_chunk = result.scalar_one_or_none()
-        
         if not db_chunk:
             raise ValueError(f"Chunk {chunk.id} not found")
         
-        # Update fields
-        db_chunk.status = chunk.status.value if isinstance(chunk.status, ChunkStatus) else chunk.status
-        db_chunk.summary = chunk.summary
-        db_chunk.processing_error = chunk.processing_error
-        db_chunk.updated_at = datetime.now()
-        
         await session.commit()
-        await session.refresh(db_chunk)
+        chunk.mark_clean()
         
         return self._to_domain_chunk(db_chunk)
     
+    async def claim_chunks_for_processing(
+        self, chunk_ids: List[str], session: AsyncSession, stale_after: Optional[float] = None
+    ) -> List[Chunk]:
+        """
+        Atomically move UNPROCESSED chunks to PROCESSING, returning only those claimed by this caller.
+        With stale_after, PROCESSING chunks not updated for that many seconds are
+        reclaimed too: their claimer crashed or was cancelled before releasing them.
+        """
+        if not chunk_ids:
+            return []
+        
+        claimable = ChunkModel.status == ChunkStatus.UNPROCESSED.value
+        if stale_after is not None:
+            claimable = or_(
+                claimable,
+                and_(
+                    ChunkModel.status == ChunkStatus.PROCESSING.value,
+                    ChunkModel.updated_at < datetime.now() - timedelta(seconds=stale_after)
+                )
+            )
+        
+        # Lock candidate rows; rows already locked by another claimer are skipped
+        # (FOR UPDATE is a no-op on SQLite, where the conditional UPDATE below
+        # still guarantees a chunk is claimed at most once)
+        locked = await session.execute(
+            select(ChunkModel.id)
+            .where(and_(ChunkModel.id.in_(chunk_ids), claimable))
+            .with_for_update(skip_locked=True)
+        )
+        locked_ids = list(locked.scalars().all())
+        if not locked_ids:
+            await session.commit()
+            return []
+        
+        result = await session.execute(
+            update(ChunkModel)
+            .where(and_(ChunkModel.id.in_(locked_ids), claimable))
+            .values(status=ChunkStatus.PROCESSING.value, updated_at=datetime.now())
+            .returning(ChunkModel.id)
+            .execution_options(synchronize_session=False)
+        )
+        claimed_ids = list(result.scalars().all())
+        await session.commit()
+        
+        if not claimed_ids:
+            return []
+        
+        claimed = await session.execute(
+            select(ChunkModel)
+            .where(ChunkModel.id.in_(claimed_ids))
+            .order_by(ChunkModel.chunk_index)
+            .execution_options(populate_existing=True)
+        )
+        return [self._to_domain_chunk(chunk) for chunk in claimed.scalars().all()]
+    
     async def get_chunks_up_to_page(self, document_id: str, page_number: int, session: AsyncSession) -> List[Chunk]:
         """Get all chunks that contain pages up to and including the given page number"""
         # Calculate which chunk contains the given page
@@ -513,6 +1006,8 @@ class RDSDocumentRepository(DocumentRepositoryInterface):
                 )
             )
             .order_by(ChunkModel.chunk_index)
+            # Chunks may have been updated by other sessions (parallel summaries)
+            .execution_options(populate_existing=True)
         )
         db_chunks = result.scalars().all()
         
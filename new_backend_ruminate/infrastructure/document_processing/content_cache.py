@@ -0,0 +1,87 @@
+"""Content-addressed PDF storage and Marker result cache"""
+import hashlib
+import logging
+import os
+import tempfile
+from typing import BinaryIO, IO, Optional
+
+from new_backend_ruminate.domain.object_storage.storage_interface import ObjectStorageInterface
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+BLOB_PREFIX = "blobs/sha256/"
+
+
+def sha256_stream(file: BinaryIO) -> str:
+    """SHA-256 of a seekable file, read in chunks; leaves the file rewound"""
+    file.seek(0)
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def sha256_file(path: str) -> str:
+    with open(path, "rb") as f:
+        return sha256_stream(f)
+
+
+def blob_key(content_hash: str) -> str:
+    """Storage key of the single stored copy of a PDF"""
+    return f"{BLOB_PREFIX}{content_hash[:2]}/{content_hash}.pdf"
+
+
+def is_blob_key(key: str) -> bool:
+    """Blobs are shared between documents; only the last one referencing a blob deletes it"""
+    return key.startswith(BLOB_PREFIX)
+
+
+class MarkerResultCache:
+    """
+    Completed Marker payloads in object storage, keyed by the PDF's SHA-256
+    and a fingerprint of the Marker options used to produce them, so a
+    repeat upload can be materialised without another Marker run.
+    """
+
+    def __init__(self, storage: ObjectStorageInterface, options_fingerprint: str) -> None:
+        self._storage = storage
+        self._fingerprint = options_fingerprint
+
+    def key(self, content_hash: str) -> str:
+        return f"marker-cache/{self._fingerprint}/{content_hash}.json"
+
+    async def get(self, content_hash: str) -> Optional[IO[bytes]]:
+        """Open the cached payload, or None on a miss"""
+        fd, path = tempfile.mkstemp(prefix="ruminate_marker_", suffix=".json")
+        os.close(fd)
+        try:
+            await self._storage.download_to_path(self.key(content_hash), path)
+            # Unlinked right away; the open handle keeps the data until closed
+            fp = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Marker result cache read failed for {content_hash}: {e}")
+            return None
+        finally:
+            os.remove(path)
+        logger.info(f"Marker result cache hit for {content_hash}")
+        return fp
+
+    async def delete(self, content_hash: str) -> None:
+        """Drop the cached payload once no document has this content; best-effort"""
+        try:
+            await self._storage.delete_file(self.key(content_hash))
+        except Exception as e:
+            logger.warning(f"Marker result cache delete failed for {content_hash}: {e}")
+
+    async def put(self, content_hash: str, payload: IO[bytes]) -> None:
+        """Store a completed payload; best-effort, the payload is left rewound"""
+        try:
+            await self._storage.upload_file(payload, self.key(content_hash), content_type="application/json")
+        except Exception as e:
+            logger.warning(f"Marker result cache write failed for {content_hash}: {e}")
+        finally:
+            payload.seek(0)
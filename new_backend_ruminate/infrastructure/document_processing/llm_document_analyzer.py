@@ -1,10 +1,11 @@
 # new_backend_ruminate/infrastructure/document_processing/llm_document_analyzer.py
-from typing import List, Dict, Any
-import re
+from typing import List, Dict, Any, Union
+from new_backend_ruminate.utils.html_text import block_plain_text
 
 from new_backend_ruminate.domain.ports.document_analyzer import DocumentAnalyzer
 from new_backend_ruminate.domain.ports.llm import LLMService
 from new_backend_ruminate.domain.document.entities.block import Block
+from new_backend_ruminate.domain.document.entities.block_text import BlockText
 from new_backend_ruminate.domain.conversation.entities.message import Message, Role
 from new_backend_ruminate.infrastructure.llm.openai_responses_llm import OpenAIResponsesLLM
 
@@ -15,23 +16,13 @@ class LLMDocumentAnalyzer(DocumentAnalyzer):
     def __init__(self, llm: LLMService):
         self._llm = llm
     
-    def _strip_html(self, html_content: str) -> str:
-        """Remove HTML tags from content"""
-        if not html_content:
-            return ""
-        # Remove HTML tags
-        text = re.sub(r'<[^>]+>', ' ', html_content)
-        # Clean up whitespace
-        text = ' '.join(text.split())
-        return text.strip()
-    
-    def _prepare_document_content(self, blocks: List[Block]) -> str:
+    def _prepare_document_content(self, blocks: List[Union[Block, BlockText]]) -> str:
         """Prepare document content from blocks for summarization"""
         content_parts = []
         
         for block in blocks:
             if block.html_content:
-                text = self._strip_html(block.html_content)
+                text = block_plain_text(block)
                 if text:  # Only add non-empty content
                     content_parts.append(text)
         
@@ -39,7 +30,7 @@ class LLMDocumentAnalyzer(DocumentAnalyzer):
     
     async def generate_document_summary(
         self, 
-        blocks: List[Block], 
+        blocks: List[Union[Block, BlockText]], 
         document_title: str
     ) -> str:
         """Generate a comprehensive summary of the document"""
@@ -90,7 +81,7 @@ The summary should:
     
     async def generate_document_info(
         self, 
-        blocks: List[Block], 
+        blocks: List[Union[Block, BlockText]], 
         current_title: str
     ) -> Dict[str, Any]:
         """Extract structured information about the document"""
@@ -110,7 +101,7 @@ The summary should:
             
             # Add content from blocks in the first 5 pages
             if len(pages_seen) <= 5 and block.html_content:
-                text = self._strip_html(block.html_content)
+                text = block_plain_text(block)
                 if text:
                     content_parts.append(text)
         
@@ -1,14 +1,28 @@
 """Marker API client for document processing"""
 import asyncio
+import hashlib
 import json
 import logging
-from typing import Dict, Any, Optional, List
-from dataclasses import dataclass
+import tempfile
+from typing import Dict, Any, Optional, List, AsyncIterator, Iterator, IO, Union
+from dataclasses import asdict, dataclass
 import aiohttp
+import ijson
 from new_backend_ruminate.config import settings
+from new_backend_ruminate.infrastructure.document_processing.marker_poller import MarkerPollMultiplexer, MarkerRateLimited
 
 logger = logging.getLogger(__name__)
 
+# Event publisher channel the API relays Marker webhook request ids on
+MARKER_WEBHOOK_CHANNEL = "marker_webhooks"
+
+
+def _retry_after(response: aiohttp.ClientResponse) -> Optional[float]:
+    try:
+        return float(response.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
+
 
 @dataclass
 class MarkerResponse:
@@ -18,24 +32,177 @@ class MarkerResponse:
     check_url: Optional[str] = None
     pages: Optional[List[Dict[str, Any]]] = None
     error: Optional[str] = None
+    # Streaming mode: completed payload spooled to a temp file, parsed page by page
+    page_count: Optional[int] = None
+    result_file: Optional[IO[bytes]] = None
+    
+    def close(self) -> None:
+        """Release the spooled payload, if any"""
+        if self.result_file is not None:
+            self.result_file.close()
+            self.result_file = None
+
+
+@dataclass
+class _ConnectionStats:
+    requests: int = 0
+    connections_created: int = 0
+    connections_reused: int = 0
+    dns_cache_hits: int = 0
+    dns_cache_misses: int = 0
 
 
 class MarkerClient:
-    """Client for interacting with Marker API for document processing"""
+    """
+    Client for interacting with Marker API for document processing.
+
+    All requests share one long-lived aiohttp session whose connector pools
+    keep-alive connections per host and caches DNS, so submits and polls
+    reuse TCP/TLS connections instead of handshaking for every job. Call
+    start() and close() from the app or worker lifecycle; the session is
+    also created lazily on first use.
+    """
+    
+    # Form options sent with every submission; they determine the result, so
+    # they are part of the result cache key
+    SUBMIT_OPTIONS = {
+        'langs': 'English',
+        'output_format': 'json',
+        'paginate': 'true',
+        'force_ocr': 'false',
+        'use_llm': 'true',
+        'strip_existing_ocr': 'false',
+        'disable_image_extraction': 'false',
+    }
     
     def __init__(self):
         self.base_url = settings().marker_api_url
         self.api_key = settings().marker_api_key
         self.max_poll_attempts = settings().marker_max_poll_attempts
         self.poll_interval = settings().marker_poll_interval
+        self.streaming_parse = settings().marker_streaming_parse
+        self.spool_max_memory = settings().marker_spool_max_memory
+        self.webhook_url = settings().marker_webhook_url
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._stats = _ConnectionStats()
+        self.poller = MarkerPollMultiplexer(self._poll_once)
+        self._webhook_listener: Optional[asyncio.Task] = None
     
-    async def process_document(self, file_content: bytes, filename: str) -> MarkerResponse:
+    async def start(self, notifications=None) -> None:
+        """
+        Open the shared session; idempotent. With webhooks configured, also
+        listen on the event publisher for completions relayed by the API.
+        """
+        self._get_session()
+        if self.webhook_url and notifications is not None and self._webhook_listener is None:
+            self._webhook_listener = asyncio.create_task(self._listen_for_webhooks(notifications))
+    
+    async def close(self) -> None:
+        """Close the shared session and its pooled connections"""
+        if self._webhook_listener is not None:
+            self._webhook_listener.cancel()
+            self._webhook_listener = None
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            await session.close()
+            logger.info(f"Closed Marker session: {self.metrics()}")
+    
+    async def _listen_for_webhooks(self, notifications) -> None:
+        while True:
+            try:
+                # Only new webhooks: old ids would be replayed on every re-subscribe and restart
+                async for request_id in notifications.subscribe(MARKER_WEBHOOK_CHANNEL, from_latest=True):
+                    self.poller.notify(request_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Marker webhook listener error: {e}")
+            await asyncio.sleep(1)
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            cfg = settings()
+            connector = aiohttp.TCPConnector(
+                limit=cfg.marker_connection_limit,
+                limit_per_host=cfg.marker_connection_limit_per_host,
+                keepalive_timeout=cfg.marker_keepalive_timeout,
+                ttl_dns_cache=cfg.marker_dns_cache_ttl,
+            )
+            timeout = aiohttp.ClientTimeout(
+                total=cfg.marker_request_timeout,
+                connect=cfg.marker_connect_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=timeout,
+                trace_configs=[self._trace_config()],
+            )
+            logger.info(
+                f"Opened Marker session (limit={cfg.marker_connection_limit}, "
+                f"per_host={cfg.marker_connection_limit_per_host})"
+            )
+        return self._session
+    
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        stats = self._stats
+
+        async def on_request_start(session, ctx, params):
+            stats.requests += 1
+
+        async def on_connection_create_end(session, ctx, params):
+            stats.connections_created += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            stats.connections_reused += 1
+
+        async def on_dns_cache_hit(session, ctx, params):
+            stats.dns_cache_hits += 1
+
+        async def on_dns_cache_miss(session, ctx, params):
+            stats.dns_cache_misses += 1
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace_config.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace_config
+    
+    def options_fingerprint(self) -> str:
+        """Short digest of the submission options, for keying cached results"""
+        encoded = json.dumps(self.SUBMIT_OPTIONS, sort_keys=True).encode()
+        return hashlib.sha256(encoded).hexdigest()[:16]
+    
+    async def response_from_payload(self, payload: IO[bytes]) -> MarkerResponse:
+        """Wrap a completed Marker payload (e.g. from the result cache) for streamed parsing"""
+        summary = await asyncio.to_thread(self._scan_result, payload)
+        return MarkerResponse(status="completed", page_count=summary["page_count"], result_file=payload)
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Request and connection-reuse counters for the shared session"""
+        stats = asdict(self._stats)
+        connections = stats["connections_created"] + stats["connections_reused"]
+        stats["reuse_ratio"] = round(stats["connections_reused"] / connections, 3) if connections else 0.0
+        stats["session_open"] = self._session is not None and not self._session.closed
+        stats["poller"] = self.poller.metrics()
+        return stats
+    
+    async def process_document(
+        self,
+        file_content: Union[bytes, IO[bytes]],
+        filename: str,
+        page_count: Optional[int] = None,
+    ) -> MarkerResponse:
         """
         Submit a document to Marker API for processing and poll until complete
         
         Args:
-            file_content: PDF file content as bytes
+            file_content: PDF file content as bytes, or an open binary file
+                          which is streamed to Marker without being read into memory
             filename: Name of the file
+            page_count: Pages in the document, if known; sets the expected
+                        processing time the first poll is scheduled around
             
         Returns:
             MarkerResponse with processed document data
@@ -48,167 +215,268 @@ class MarkerClient:
         
         # Poll for completion
         if submit_response.check_url:
-            return await self._poll_for_completion(submit_response.check_url)
+            return await self._poll_for_completion(
+                submit_response.check_url,
+                request_id=submit_response.job_id,
+                page_count=page_count,
+            )
         
         return submit_response
     
-    async def _submit_document(self, file_content: bytes, filename: str) -> MarkerResponse:
+    async def _submit_document(self, file_content: Union[bytes, IO[bytes]], filename: str) -> MarkerResponse:
         """Submit document to Marker API"""
-        async with aiohttp.ClientSession() as session:
-            headers = {}
-            if self.api_key:
-                headers["X-Api-Key"] = self.api_key
-            
-            # Prepare multipart form data
-            data = aiohttp.FormData()
-            data.add_field('file', file_content, filename=filename, content_type='application/pdf')
-            data.add_field('langs', 'English')
-            data.add_field('output_format', 'json')
-            data.add_field('paginate', 'true')
-            data.add_field('force_ocr', 'false')
-            data.add_field('use_llm', 'true')
-            data.add_field('strip_existing_ocr', 'false')
-            data.add_field('disable_image_extraction', 'false')
-            
-            logger.info(f"Submitting document to Marker API: {self.base_url}")
-            logger.debug(f"Headers: {headers}")
-            
-            try:
-                async with session.post(
-                    self.base_url,
-                    data=data,
-                    headers=headers
-                ) as response:
-                    response_text = await response.text()
-                    logger.info(f"Marker API response status: {response.status}")
-                    logger.debug(f"Response text: {response_text}")
-                    
-                    try:
-                        result = json.loads(response_text)
-                    except json.JSONDecodeError:
-                        logger.error(f"Failed to parse JSON response: {response_text}")
-                        return MarkerResponse(
-                            status="error",
-                            error=f"Invalid JSON response: {response_text}"
-                        )
-                    
-                    if response.status == 200:
-                        # Check for success field
-                        if not result.get('success', False):
-                            error_msg = result.get('error', 'Marker API request failed')
-                            logger.error(f"Marker API request failed: {error_msg}")
-                            return MarkerResponse(
-                                status="error",
-                                error=error_msg
-                            )
-                        
-                        # Handle different possible response formats
-                        job_id = result.get("job_id") or result.get("request_id")
-                        check_url = result.get("check_url") or result.get("request_check_url")
-                        logger.info(f"Document submitted successfully. Job ID: {job_id}, Check URL: {check_url}")
-                        return MarkerResponse(
-                            status="processing",
-                            job_id=job_id,
-                            check_url=check_url
-                        )
-                    else:
-                        error_msg = result.get("error", f"HTTP {response.status}")
-                        logger.error(f"Marker API error: {error_msg}")
+        session = self._get_session()
+        headers = {}
+        if self.api_key:
+            headers["X-Api-Key"] = self.api_key
+        
+        # Prepare multipart form data
+        data = aiohttp.FormData()
+        data.add_field('file', file_content, filename=filename, content_type='application/pdf')
+        for name, value in self.SUBMIT_OPTIONS.items():
+            data.add_field(name, value)
+        if self.webhook_url:
+            data.add_field('webhook_url', self.webhook_url)
+        
+        logger.info(f"Submitting document to Marker API: {self.base_url}")
+        logger.debug(f"Headers: {headers}")
+        
+        try:
+            async with session.post(
+                self.base_url,
+                data=data,
+                headers=headers
+            ) as response:
+                response_text = await response.text()
+                logger.info(f"Marker API response status: {response.status}")
+                logger.debug(f"Response text: {response_text}")
+                
+                try:
+                    result = json.loads(response_text)
+                except json.JSONDecodeError:
+                    logger.error(f"Failed to parse JSON response: {response_text}")
+                    return MarkerResponse(
+                        status="error",
+                        error=f"Invalid JSON response: {response_text}"
+                    )
+                
+                if response.status == 200:
+                    # Check for success field
+                    if not result.get('success', False):
+                        error_msg = result.get('error', 'Marker API request failed')
+                        logger.error(f"Marker API request failed: {error_msg}")
                         return MarkerResponse(
                             status="error",
                             error=error_msg
                         )
-                        
-            except Exception as e:
-                logger.error(f"Error submitting to Marker API: {e}")
+                    
+                    # Handle different possible response formats
+                    job_id = result.get("job_id") or result.get("request_id")
+                    check_url = result.get("check_url") or result.get("request_check_url")
+                    logger.info(f"Document submitted successfully. Job ID: {job_id}, Check URL: {check_url}")
+                    return MarkerResponse(
+                        status="processing",
+                        job_id=job_id,
+                        check_url=check_url
+                    )
+                else:
+                    error_msg = result.get("error", f"HTTP {response.status}")
+                    logger.error(f"Marker API error: {error_msg}")
+                    return MarkerResponse(
+                        status="error",
+                        error=error_msg
+                    )
+                    
+        except Exception as e:
+            logger.error(f"Error submitting to Marker API: {e}")
+            return MarkerResponse(
+                status="error",
+                error=str(e)
+            )
+
+    async def _poll_for_completion(
+        self,
+        check_url: str,
+        request_id: Optional[str] = None,
+        page_count: Optional[int] = None,
+    ) -> MarkerResponse:
+        """Wait for the shared poll multiplexer to report the job complete"""
+        logger.info(f"Tracking Marker job at: {check_url}")
+        result = await self.poller.wait(
+            check_url,
+            request_id=request_id,
+            page_count=page_count,
+            timeout=self.max_poll_attempts * self.poll_interval,
+        )
+        if result is None:
+            return MarkerResponse(
+                status="error",
+                error="Processing timeout - exceeded maximum poll time"
+            )
+        return result
+    
+    async def _poll_once(self, check_url: str) -> Optional[MarkerResponse]:
+        """
+        Check a job once. Returns the final MarkerResponse, or None while
+        Marker is still processing. Raises MarkerRateLimited on HTTP 429.
+        """
+        session = self._get_session()
+        headers = {}
+        if self.api_key:
+            headers["X-Api-Key"] = self.api_key
+        
+        async with session.get(check_url, headers=headers) as response:
+            # Handle rate limiting
+            if response.status == 429:
+                raise MarkerRateLimited(_retry_after(response))
+            
+            if self.streaming_parse:
+                return await self._handle_streamed_poll(response)
+            
+            response_text = await response.text()
+            logger.debug(f"Poll response status: {response.status}")
+            logger.debug(f"Poll response text: {response_text[:500]}...")  # Truncate long responses
+        
+        try:
+            result = json.loads(response_text)
+        except json.JSONDecodeError:
+            logger.error(f"Failed to parse JSON response: {response_text}")
+            return None
+        
+        status = result.get("status", "unknown")
+        logger.info(f"Document processing status: {status}")
+        
+        if status in ["completed", "complete"]:
+            # Check for success
+            if not result.get("success", False):
+                error_msg = result.get('error', 'Processing failed')
+                logger.error(f"Processing failed: {error_msg}")
                 return MarkerResponse(
                     status="error",
-                    error=str(e)
+                    error=error_msg
                 )
-    
-    async def _poll_for_completion(self, check_url: str) -> MarkerResponse:
-        """Poll Marker API until processing is complete"""
-        logger.info(f"Starting to poll Marker API at: {check_url}")
-        async with aiohttp.ClientSession() as session:
-            headers = {}
-            if self.api_key:
-                headers["X-Api-Key"] = self.api_key
             
-            for attempt in range(self.max_poll_attempts):
-                try:
-                    logger.debug(f"Poll attempt {attempt + 1}/{self.max_poll_attempts}")
-                    async with session.get(check_url, headers=headers) as response:
-                        response_text = await response.text()
-                        logger.debug(f"Poll response status: {response.status}")
-                        logger.debug(f"Poll response text: {response_text[:500]}...")  # Truncate long responses
-                        
-                        # Handle rate limiting
-                        if response.status == 429:
-                            logger.warning("Rate limit hit. Waiting 30 seconds before retrying...")
-                            await asyncio.sleep(30)
-                            continue
-                        
-                        try:
-                            result = json.loads(response_text)
-                        except json.JSONDecodeError:
-                            logger.error(f"Failed to parse JSON response: {response_text}")
-                            await asyncio.sleep(self.poll_interval)
-                            continue
-                        
-                        status = result.get("status", "unknown")
-                        logger.info(f"Document processing status: {status}")
-                        
-                        if status in ["completed", "complete"]:
-                            # Check for success
-                            if not result.get("success", False):
-                                error_msg = result.get('error', 'Processing failed')
-                                logger.error(f"Processing failed: {error_msg}")
-                                return MarkerResponse(
-                                    status="error",
-                                    error=error_msg
-                                )
-                            
-                            # Get the JSON response data
-                            json_data = result.get('json', {})
-                            if not json_data:
-                                logger.error("No JSON data in completed response")
-                                return MarkerResponse(
-                                    status="error",
-                                    error="No JSON data in response"
-                                )
-                            
-                            # Process the hierarchical structure
-                            pages = self._process_marker_json(json_data)
-                            
-                            logger.info(f"Processing completed! Got {len(pages)} pages")
-                            return MarkerResponse(
-                                status="completed",
-                                pages=pages
-                            )
-                        elif status == "failed":
-                            error_msg = result.get("error", "Processing failed")
-                            logger.error(f"Processing failed: {error_msg}")
-                            return MarkerResponse(
-                                status="error",
-                                error=error_msg
-                            )
-                        elif status in ["processing", "pending"]:
-                            # Continue polling
-                            logger.debug(f"Still processing, waiting {self.poll_interval}s before next poll")
-                            await asyncio.sleep(self.poll_interval)
-                        else:
-                            logger.warning(f"Unknown Marker status: {status}")
-                            await asyncio.sleep(self.poll_interval)
-                            
-                except Exception as e:
-                    logger.error(f"Error polling Marker API: {e}")
-                    # Continue polling on transient errors
-                    await asyncio.sleep(self.poll_interval)
+            # Get the JSON response data
+            json_data = result.get('json', {})
+            if not json_data:
+                logger.error("No JSON data in completed response")
+                return MarkerResponse(
+                    status="error",
+                    error="No JSON data in response"
+                )
             
+            # Process the hierarchical structure
+            pages = self._process_marker_json(json_data)
+            
+            logger.info(f"Processing completed! Got {len(pages)} pages")
+            return MarkerResponse(
+                status="completed",
+                pages=pages
+            )
+        elif status == "failed":
+            error_msg = result.get("error", "Processing failed")
+            logger.error(f"Processing failed: {error_msg}")
             return MarkerResponse(
                 status="error",
-                error="Processing timeout - exceeded maximum poll attempts"
+                error=error_msg
             )
+        elif status not in ["processing", "pending"]:
+            logger.warning(f"Unknown Marker status: {status}")
+        return None
+
+    async def _handle_streamed_poll(self, response: aiohttp.ClientResponse) -> Optional[MarkerResponse]:
+        """
+        Spool a poll response to a temp file and inspect it with an incremental parser.
+        Returns a final MarkerResponse, or None if processing is still in progress.
+        """
+        spool = tempfile.SpooledTemporaryFile(max_size=self.spool_max_memory)
+        try:
+            async for data in response.content.iter_chunked(64 * 1024):
+                spool.write(data)
+            
+            try:
+                summary = await asyncio.to_thread(self._scan_result, spool)
+            except ijson.JSONError as e:
+                logger.error(f"Failed to parse JSON response: {e}")
+                spool.close()
+                return None
+            
+            status = summary.get("status", "unknown")
+            logger.info(f"Document processing status: {status}")
+            
+            if status in ["completed", "complete"]:
+                if not summary.get("success", False):
+                    error_msg = summary.get('error') or 'Processing failed'
+                    logger.error(f"Processing failed: {error_msg}")
+                    spool.close()
+                    return MarkerResponse(status="error", error=error_msg)
+                
+                if not summary["has_json"]:
+                    logger.error("No JSON data in completed response")
+                    spool.close()
+                    return MarkerResponse(status="error", error="No JSON data in response")
+                
+                logger.info(f"Processing completed! Got {summary['page_count']} pages")
+                return MarkerResponse(
+                    status="completed",
+                    page_count=summary["page_count"],
+                    result_file=spool
+                )
+            elif status == "failed":
+                error_msg = summary.get("error") or "Processing failed"
+                logger.error(f"Processing failed: {error_msg}")
+                spool.close()
+                return MarkerResponse(status="error", error=error_msg)
+            
+            if status not in ["processing", "pending"]:
+                logger.warning(f"Unknown Marker status: {status}")
+            spool.close()
+            return None
+        except BaseException:
+            spool.close()
+            raise
+    
+    def _scan_result(self, fp: IO[bytes]) -> Dict[str, Any]:
+        """Read top-level status fields and count pages without materialising the payload"""
+        fp.seek(0)
+        summary: Dict[str, Any] = {"page_count": 0, "has_json": False}
+        for prefix, event, value in ijson.parse(fp):
+            if prefix in ("status", "success", "error") and event in ("string", "boolean", "null"):
+                summary[prefix] = value
+            elif prefix == "json" and event == "map_key":
+                summary["has_json"] = True
+            elif prefix == "json.children.item.block_type" and value == "Page":
+                summary["page_count"] += 1
+        return summary
+    
+    async def iter_pages(self, marker_response: MarkerResponse) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield simplified pages from a completed response, one at a time.
+        Streams from the spooled payload when available so only one page is in memory.
+        """
+        if marker_response.pages is not None:
+            for page in marker_response.pages:
+                yield page
+            return
+        
+        if marker_response.result_file is None:
+            return
+        
+        pages = self._iter_spooled_pages(marker_response.result_file)
+        while True:
+            # Parsing is CPU-bound; keep it off the event loop
+            page = await asyncio.to_thread(next, pages, None)
+            if page is None:
+                break
+            yield page
+    
+    def _iter_spooled_pages(self, fp: IO[bytes]) -> Iterator[Dict[str, Any]]:
+        """Incrementally parse top-level children from a spooled payload"""
+        fp.seek(0)
+        for page_number, page_data in enumerate(ijson.items(fp, "json.children.item", use_float=True)):
+            page = self._process_marker_page(page_number, page_data)
+            if page is not None:
+                yield page
     
     def _process_marker_json(self, json_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
@@ -222,40 +490,46 @@ class MarkerClient:
         logger.debug(f"Processing {len(children)} top-level children from Marker response")
         
         for page_number, page_data in enumerate(children):
-            # Skip non-Page blocks at top level
-            if page_data.get('block_type') != 'Page':
-                logger.warning(f"Skipping non-Page block at top level: {page_data.get('block_type')}")
-                continue
-            
-            # Extract page information
-            page_html = page_data.get('html', "")
-            if page_html:
-                # Unescape HTML entities in page HTML too
-                page_html = (page_html
-                    .replace('&lt;', '<')
-                    .replace('&gt;', '>')
-                    .replace('&amp;', '&')
-                    .replace('&quot;', '"')
-                    .replace('&#39;', "'")
-                    .replace('&nbsp;', ' ')
-                )
-            
-            page = {
-                "page_number": page_number + 1,  # 1-based numbering for display
-                "polygon": page_data.get('polygon'),
-                "html": page_html,
-                "blocks": []
-            }
-            
-            # Process blocks within this page
-            page_blocks = self._extract_blocks(page_data.get('children', []))
-            page["blocks"] = page_blocks
-            
-            pages.append(page)
-            logger.debug(f"Processed page {page_number + 1} with {len(page_blocks)} blocks")
+            page = self._process_marker_page(page_number, page_data)
+            if page is not None:
+                pages.append(page)
         
         return pages
     
+    def _process_marker_page(self, page_number: int, page_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Convert one top-level Marker child to a simplified page, or None if it is not a Page"""
+        # Skip non-Page blocks at top level
+        if page_data.get('block_type') != 'Page':
+            logger.warning(f"Skipping non-Page block at top level: {page_data.get('block_type')}")
+            return None
+        
+        # Extract page information
+        page_html = page_data.get('html', "")
+        if page_html:
+            # Unescape HTML entities in page HTML too
+            page_html = (page_html
+                .replace('&lt;', '<')
+                .replace('&gt;', '>')
+                .replace('&amp;', '&')
+                .replace('&quot;', '"')
+                .replace('&#39;', "'")
+                .replace('&nbsp;', ' ')
+            )
+        
+        page = {
+            "page_number": page_number + 1,  # 1-based numbering for display
+            "polygon": page_data.get('polygon'),
+            "html": page_html,
+            "blocks": []
+        }
+        
+        # Process blocks within this page
+        page_blocks = self._extract_blocks(page_data.get('children', []))
+        page["blocks"] = page_blocks
+        
+        logger.debug(f"Processed page {page_number + 1} with {len(page_blocks)} blocks")
+        return page
+    
     def _extract_blocks(self, block_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Recursively extract blocks from hierarchical structure
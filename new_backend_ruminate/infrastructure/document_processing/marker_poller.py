@@ -0,0 +1,265 @@
+"""Shared, rate-limited polling of Marker jobs"""
+import asyncio
+import heapq
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from new_backend_ruminate.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class MarkerRateLimited(Exception):
+    """Marker answered 429; retry_after is the server's hint in seconds, if any"""
+
+    def __init__(self, retry_after: Optional[float] = None):
+        super().__init__("Marker rate limit hit")
+        self.retry_after = retry_after
+
+
+@dataclass
+class _PollJob:
+    check_url: str
+    request_id: Optional[str]
+    future: asyncio.Future
+    expected_at: float
+    deadline: float
+    due: float = 0.0
+    polls: int = 0
+    overdue_polls: int = 0
+
+
+@dataclass
+class _PollStats:
+    polls: int = 0
+    completed: int = 0
+    timed_out: int = 0
+    rate_limited: int = 0
+    webhook_notifications: int = 0
+
+
+class _RateBudget:
+    """Token bucket shared by every poll this process sends"""
+
+    def __init__(self, rate: float) -> None:
+        self._rate = rate
+        self._capacity = max(1.0, rate)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self._rate)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every poll back, e.g. after a 429; no tokens accrue while paused"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+        self._updated = self._paused_until
+
+
+class MarkerPollMultiplexer:
+    """
+    Tracks every outstanding Marker check_url in the process and polls them
+    from one scheduler task.
+
+    Each job is first polled shortly before its expected completion time
+    (estimated from its page count), then with exponential backoff and
+    jitter. Polls go through a shared token bucket, so the request rate to
+    Marker stays within budget however many jobs are in flight, and a 429
+    pauses all polling for the server's Retry-After. notify() polls a job
+    immediately, for webhook-style completion; when webhooks are enabled
+    polling only runs as a slow fallback.
+    """
+
+    def __init__(
+        self,
+        poll_once: Callable[[str], Awaitable[Optional[Any]]],
+        *,
+        rate: Optional[float] = None,
+        min_interval: Optional[float] = None,
+        max_interval: Optional[float] = None,
+        backoff: Optional[float] = None,
+        expected_base: Optional[float] = None,
+        expected_per_page: Optional[float] = None,
+        webhooks: Optional[bool] = None,
+    ) -> None:
+        cfg = settings()
+        self._poll_once = poll_once
+        self._budget = _RateBudget(rate or cfg.marker_poll_rate)
+        self._min_interval = min_interval if min_interval is not None else cfg.marker_poll_min_interval
+        self._max_interval = max_interval if max_interval is not None else cfg.marker_poll_max_interval
+        self._backoff = backoff or cfg.marker_poll_backoff
+        self._expected_base = expected_base if expected_base is not None else cfg.marker_expected_seconds_base
+        self._expected_per_page = expected_per_page if expected_per_page is not None else cfg.marker_expected_seconds_per_page
+        self._webhooks = webhooks if webhooks is not None else bool(cfg.marker_webhook_url)
+        self._jobs: Dict[str, _PollJob] = {}
+        self._by_request: Dict[str, str] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: set = set()
+        self._stats = _PollStats()
+
+    async def wait(
+        self,
+        check_url: str,
+        *,
+        request_id: Optional[str] = None,
+        page_count: Optional[int] = None,
+        timeout: float,
+    ) -> Optional[Any]:
+        """
+        Track check_url until poll_once returns a result, and return it.
+        Returns None if the job is still pending after timeout seconds.
+        """
+        now = time.monotonic()
+        expected = self._expected_base + self._expected_per_page * (page_count or 0)
+        job = _PollJob(
+            check_url=check_url,
+            request_id=request_id,
+            future=asyncio.get_running_loop().create_future(),
+            expected_at=now + expected,
+            deadline=now + timeout,
+        )
+        key = f"{id(job)}:{check_url}"
+        self._jobs[key] = job
+        if request_id:
+            self._by_request[request_id] = key
+        # Nothing to see before a fraction of the expected time has passed
+        self._schedule(key, job, min(self._max_interval, max(self._min_interval, expected / 2)))
+        self._ensure_running()
+        try:
+            return await job.future
+        finally:
+            self._forget(key)
+
+    def notify(self, request_id: str) -> bool:
+        """Poll the job now, e.g. when Marker's webhook reports it finished"""
+        key = self._by_request.get(request_id)
+        job = self._jobs.get(key) if key else None
+        if job is None:
+            return False
+        self._stats.webhook_notifications += 1
+        self._schedule(key, job, 0)
+        return True
+
+    def metrics(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "tracked_jobs": len(self._jobs),
+            "in_flight_polls": len(self._inflight),
+            "overdue_jobs": sum(1 for j in self._jobs.values() if now > j.expected_at),
+            "polls": self._stats.polls,
+            "completed": self._stats.completed,
+            "timed_out": self._stats.timed_out,
+            "rate_limited": self._stats.rate_limited,
+            "webhook_notifications": self._stats.webhook_notifications,
+        }
+
+    def _schedule(self, key: str, job: _PollJob, delay: float) -> None:
+        job.due = time.monotonic() + delay
+        self._seq += 1
+        heapq.heappush(self._heap, (job.due, self._seq, key))
+        self._wakeup.set()
+
+    def _forget(self, key: str) -> None:
+        job = self._jobs.pop(key, None)
+        if job is not None and job.request_id:
+            self._by_request.pop(job.request_id, None)
+
+    def _ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._task.get_loop() is loop:
+            return
+        if self._task is not None and self._task.get_loop() is not loop:
+            self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run())
+
+    def _next_delay(self, job: _PollJob) -> float:
+        remaining = job.expected_at - time.monotonic()
+        if self._webhooks and remaining <= 0:
+            delay = self._max_interval
+        elif remaining > 0:
+            delay = max(self._min_interval, remaining / 2)
+        else:
+            delay = self._min_interval * self._backoff ** job.overdue_polls
+            job.overdue_polls += 1
+        return min(delay, self._max_interval) * random.uniform(0.8, 1.2)
+
+    async def _run(self) -> None:
+        while self._jobs:
+            # Drop heap entries for finished jobs or superseded schedules
+            while self._heap:
+                due, _, key = self._heap[0]
+                job = self._jobs.get(key)
+                if job is not None and job.due == due:
+                    break
+                heapq.heappop(self._heap)
+            if not self._heap:
+                if not self._jobs:
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            due, _, key = self._heap[0]
+            delay = due - time.monotonic()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._heap)
+            await self._budget.acquire()
+            job = self._jobs.get(key)
+            if job is None or job.future.done():
+                continue
+            job.due = float("inf")                  # in flight; rescheduled when the poll returns
+            task = asyncio.create_task(self._poll(key, job))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _poll(self, key: str, job: _PollJob) -> None:
+        job.polls += 1
+        self._stats.polls += 1
+        try:
+            result = await self._poll_once(job.check_url)
+        except MarkerRateLimited as e:
+            pause = e.retry_after or min(self._max_interval, self._min_interval * self._backoff ** (self._stats.rate_limited + 1))
+            self._stats.rate_limited += 1
+            logger.warning(f"Marker rate limit hit; pausing all polls for {pause:.1f}s")
+            self._budget.pause(pause)
+            result = None
+        except Exception as e:
+            # Transient errors: keep polling on the normal schedule
+            logger.error(f"Error polling Marker API: {e}")
+            result = None
+
+        if job.future.done() or key not in self._jobs:
+            return
+        if result is not None:
+            self._stats.completed += 1
+            job.future.set_result(result)
+        elif time.monotonic() >= job.deadline:
+            self._stats.timed_out += 1
+            job.future.set_result(None)
+        else:
+            self._schedule(key, job, self._next_delay(job))
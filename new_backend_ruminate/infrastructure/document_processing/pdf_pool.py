@@ -0,0 +1,173 @@
+# new_backend_ruminate/infrastructure/document_processing/pdf_pool.py
+from __future__ import annotations
+import asyncio
+import io
+import logging
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional, Tuple
+
+from new_backend_ruminate.config import settings
+from new_backend_ruminate.utils.file_validator import PDFValidator, SecurityScanner
+
+logger = logging.getLogger(__name__)
+
+
+class PdfTaskTimeout(TimeoutError):
+    """A PDF task exceeded its time budget; the pool's processes were recycled"""
+
+
+# ───────────────────────── functions run in worker processes ───────────────────────── #
+
+def check_pdf_bytes(file_content: bytes, filename: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """Returns (validation_error, security_warning); both None if the PDF is acceptable"""
+    is_valid, error_message = PDFValidator.validate_bytes(file_content, filename=filename)
+    if not is_valid:
+        return error_message, None
+    is_safe, security_warning = SecurityScanner.is_pdf_safe(file_content)
+    if not is_safe:
+        return None, security_warning
+    return None, None
+
+
+def validate_pdf_file(path: str, filename: str) -> Optional[str]:
+    """
+    Validate a PDF on disk without materialising it: structure checks read
+    only the regions they need and the security scan searches an mmap of the
+    file, so memory use doesn't grow with PDF size. Returns an error
+    message, or None if acceptable.
+    """
+    is_valid, error_message = PDFValidator.validate_path(path, filename=filename)
+    if not is_valid:
+        return f"Invalid PDF file: {error_message}"
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        is_safe, security_warning = SecurityScanner.is_pdf_safe(mapped)
+    if not is_safe:
+        return f"PDF contains potentially dangerous content: {security_warning}"
+    return None
+
+
+def count_pdf_pages(file_content: bytes) -> int:
+    import PyPDF2
+    return len(PyPDF2.PdfReader(io.BytesIO(file_content)).pages)
+
+
+def count_pdf_file_pages(path: str) -> int:
+    import PyPDF2
+    with open(path, "rb") as f:
+        return len(PyPDF2.PdfReader(f).pages)
+
+
+def split_pdf(file_content: bytes, pages_per_chunk: int) -> List[bytes]:
+    import PyPDF2
+    reader = PyPDF2.PdfReader(io.BytesIO(file_content))
+    total_pages = len(reader.pages)
+    chunks = []
+    for start_page in range(0, total_pages, pages_per_chunk):
+        end_page = min(start_page + pages_per_chunk, total_pages)
+        writer = PyPDF2.PdfWriter()
+        for page_num in range(start_page, end_page):
+            writer.add_page(reader.pages[page_num])
+        chunk_buffer = io.BytesIO()
+        writer.write(chunk_buffer)
+        chunks.append(chunk_buffer.getvalue())
+    return chunks
+
+
+def split_pdf_range(src_path: str, start_page: int, end_page: int, dest_path: str) -> int:
+    """
+    Write pages [start_page, end_page) of the PDF at src_path to dest_path.
+    Each call opens the source itself, so ranges can be split in parallel
+    processes without shipping the whole PDF to each. Returns bytes written.
+    """
+    import PyPDF2
+    with open(src_path, "rb") as src:
+        reader = PyPDF2.PdfReader(src)
+        writer = PyPDF2.PdfWriter()
+        for page_num in range(start_page, min(end_page, len(reader.pages))):
+            writer.add_page(reader.pages[page_num])
+        with open(dest_path, "wb") as dest:
+            writer.write(dest)
+    return os.path.getsize(dest_path)
+
+
+# ──────────────────────────────────── the pool ──────────────────────────────────── #
+
+class PdfProcessPool:
+    """
+    Bounded process pool for CPU-bound PDF work (PyPDF2, libmagic), so the
+    API and worker event loops never parse PDFs themselves.
+
+    At most max_workers tasks, capped at the CPU count, run at once; further
+    callers wait in asyncio, and the per-task timeout only counts time spent
+    running. A task that
+    times out cannot be interrupted inside its process, so the pool is torn
+    down and recreated and PdfTaskTimeout is raised. Other tasks that were
+    running in the torn-down pool fail with BrokenProcessPool and are run
+    once more on the new one.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, timeout: Optional[float] = None) -> None:
+        cfg = settings()
+        # One admitted task per process, so none queues inside the executor on the clock
+        self._workers = max(1, min(max_workers or cfg.pdf_pool_workers, os.cpu_count() or 1))
+        self._timeout = timeout if timeout is not None else cfg.pdf_task_timeout
+        self._slots = asyncio.Semaphore(self._workers)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self._workers)
+            logger.info(f"[PdfProcessPool] Started process pool with {self._workers} workers")
+        return self._pool
+
+    def _recycle(self, pool: ProcessPoolExecutor) -> None:
+        if self._pool is pool:
+            self._pool = None
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.terminate()
+        # Futures still pending fail with BrokenProcessPool, which run() retries
+        pool.shutdown(wait=False)
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        """Run a picklable function in the pool, raising PdfTaskTimeout past the time budget"""
+        timeout = timeout if timeout is not None else self._timeout
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            for attempt in range(2):
+                pool = self._get_pool()
+                future = loop.run_in_executor(pool, fn, *args)
+                try:
+                    return await asyncio.wait_for(future, timeout=timeout)
+                except asyncio.TimeoutError:
+                    logger.error(f"[PdfProcessPool] {fn.__name__} exceeded {timeout}s, recycling pool")
+                    self._recycle(pool)
+                    raise PdfTaskTimeout(f"{fn.__name__} exceeded {timeout}s")
+                except BrokenProcessPool:
+                    # Recycled for another task's timeout, or a worker process died
+                    if attempt:
+                        raise
+                    logger.warning(f"[PdfProcessPool] Pool broke during {fn.__name__}, retrying on a new pool")
+                    self._recycle(pool)
+
+    async def check_bytes(self, file_content: bytes, filename: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+        return await self.run(check_pdf_bytes, file_content, filename)
+
+    async def validate_file(self, path: str, filename: str) -> Optional[str]:
+        return await self.run(validate_pdf_file, path, filename)
+
+    async def page_count(self, file_content: bytes) -> int:
+        return await self.run(count_pdf_pages, file_content)
+
+    async def split(self, file_content: bytes, pages_per_chunk: int = 20) -> List[bytes]:
+        return await self.run(split_pdf, file_content, pages_per_chunk)
+
+    async def split_range(self, src_path: str, start_page: int, end_page: int, dest_path: str) -> int:
+        return await self.run(split_pdf_range, src_path, start_page, end_page, dest_path)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
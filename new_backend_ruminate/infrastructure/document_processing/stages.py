@@ -0,0 +1,73 @@
+# new_backend_ruminate/infrastructure/document_processing/stages.py
+from __future__ import annotations
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from new_backend_ruminate.config import settings
+from new_backend_ruminate.infrastructure.document_processing.pdf_pool import PdfProcessPool
+
+STAGES = ("download", "validate", "marker", "persist", "analyze")
+
+
+@dataclass
+class _StageStats:
+    limit: int
+    active: int = 0
+    waiting: int = 0
+    completed: int = 0
+
+
+class ProcessingStages:
+    """
+    Per-stage concurrency limits for document processing.
+
+    A job only holds a stage's slot while it is in that stage, so many jobs
+    can wait on Marker (cheap, I/O-bound polling) while downloads, CPU-bound
+    validation, DB persistence and LLM analysis each run under their own,
+    smaller limits. CPU work runs in the shared PdfProcessPool.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, pdf_pool: Optional[PdfProcessPool] = None) -> None:
+        cfg = settings()
+        limits = limits or {}
+        self._stats = {
+            "download": _StageStats(limits.get("download", cfg.processing_download_concurrency)),
+            "validate": _StageStats(limits.get("validate", cfg.processing_validate_concurrency)),
+            "marker": _StageStats(limits.get("marker", cfg.processing_marker_concurrency)),
+            "persist": _StageStats(limits.get("persist", cfg.processing_persist_concurrency)),
+            "analyze": _StageStats(limits.get("analyze", cfg.processing_analysis_concurrency)),
+        }
+        self._semaphores = {name: asyncio.Semaphore(stats.limit) for name, stats in self._stats.items()}
+        self._pdf_pool = pdf_pool or PdfProcessPool()
+
+    @asynccontextmanager
+    async def stage(self, name: str) -> AsyncIterator[None]:
+        stats = self._stats[name]
+        stats.waiting += 1
+        try:
+            await self._semaphores[name].acquire()
+        finally:
+            stats.waiting -= 1
+        stats.active += 1
+        try:
+            yield
+        finally:
+            stats.active -= 1
+            stats.completed += 1
+            self._semaphores[name].release()
+
+    async def run_cpu(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a picklable, CPU-bound function in the process pool under the validate limit"""
+        async with self.stage("validate"):
+            return await self._pdf_pool.run(fn, *args)
+
+    def shutdown(self) -> None:
+        self._pdf_pool.shutdown()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            name: {"limit": s.limit, "active": s.active, "waiting": s.waiting, "completed": s.completed}
+            for name, s in self._stats.items()
+        }
@@ -0,0 +1,77 @@
+# new_backend_ruminate/infrastructure/queue/fair.py
+from __future__ import annotations
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from new_backend_ruminate.infrastructure.queue.job import LANES, QueuedJob
+
+
+class _Lane:
+    """Deficit round-robin over the fair keys (users) with jobs in one lane"""
+
+    def __init__(self, quantum: int) -> None:
+        self.quantum = quantum
+        self.ring: Deque[str] = deque()                # active keys; the head's turn is in progress
+        self.jobs: Dict[str, Deque[QueuedJob]] = {}
+        self.deficit: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return sum(len(q) for q in self.jobs.values())
+
+    def push(self, job: QueuedJob) -> None:
+        key = job.fair_key
+        queue = self.jobs.setdefault(key, deque())
+        queue.append(job)
+        if len(queue) == 1:                            # key becomes active
+            self.ring.append(key)
+            self.deficit[key] = self.quantum if len(self.ring) == 1 else 0
+
+    def _end_turn(self, drop: bool) -> None:
+        key = self.ring.popleft()
+        if drop:
+            self.jobs.pop(key, None)
+            self.deficit.pop(key, None)
+        else:
+            self.ring.append(key)
+        if self.ring:
+            self.deficit[self.ring[0]] += self.quantum
+
+    def pop(self) -> Optional[QueuedJob]:
+        while self.ring:
+            key = self.ring[0]
+            queue = self.jobs[key]
+            if self.deficit[key] < queue[0].cost:
+                self._end_turn(drop=False)
+                continue
+            job = queue.popleft()
+            self.deficit[key] -= job.cost
+            if not queue:
+                self._end_turn(drop=True)
+            return job
+        return None
+
+
+class FairScheduler:
+    """
+    Strict priority between lanes (see JobPriority), deficit round-robin
+    between fair keys inside a lane: each key receives `quantum` units of
+    credit per turn and is charged each job's cost, so one user's fifty
+    large uploads interleave with everybody else's instead of running first.
+    RedisProcessingQueue implements the same algorithm in Lua.
+    """
+
+    def __init__(self, quantum: int = 1) -> None:
+        self._lanes = {lane: _Lane(quantum) for lane in LANES}
+
+    def __len__(self) -> int:
+        return sum(len(lane) for lane in self._lanes.values())
+
+    def push(self, job: QueuedJob) -> None:
+        self._lanes[job.priority].push(job)
+
+    def pop(self) -> Optional[QueuedJob]:
+        for lane in LANES:
+            job = self._lanes[lane].pop()
+            if job is not None:
+                return job
+        return None
@@ -1,23 +1,153 @@
 # new_backend_ruminate/infrastructure/queue/inproc_queue.py
 from __future__ import annotations
 import asyncio
-import json
-from typing import Any, Dict, Optional
+import heapq
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from new_backend_ruminate.config import settings
+from new_backend_ruminate.infrastructure.queue.fair import FairScheduler
+from new_backend_ruminate.infrastructure.queue.job import JobPriority, QueuedJob, backoff_delay
 
 
 class InProcessProcessingQueue:
-    def __init__(self) -> None:
-        self._q: asyncio.Queue[str] = asyncio.Queue(maxsize=1024)
+    """
+    In-memory queue with the same reliability semantics as
+    RedisProcessingQueue: reserved jobs stay in flight until acked, expire
+    after the visibility timeout unless heartbeated, are retried with
+    exponential backoff and end up in the dead-letter list after
+    max_attempts. Ready jobs are scheduled by priority lane, then fairly
+    across users (FairScheduler). Jobs do not survive a restart.
+    """
+
+    # Only a worker loop in this same process consumes it; the API has none
+    worker_backed = False
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        visibility_timeout: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        backoff_max: Optional[float] = None,
+        fair_quantum: Optional[int] = None,
+    ) -> None:
+        cfg = settings()
+        self._maxsize = maxsize
+        self._visibility_timeout = visibility_timeout if visibility_timeout is not None else cfg.queue_visibility_timeout
+        self._max_attempts = max_attempts if max_attempts is not None else cfg.queue_max_attempts
+        self._backoff_base = backoff_base if backoff_base is not None else cfg.queue_backoff_base
+        self._backoff_max = backoff_max if backoff_max is not None else cfg.queue_backoff_max
+
+        self._ready = FairScheduler(fair_quantum if fair_quantum is not None else cfg.queue_fair_quantum)
+        self._delayed: List[Tuple[float, int, QueuedJob]] = []      # (ready_at, seq, job) heap
+        self._seq = 0
+        self._in_flight: Dict[str, Tuple[QueuedJob, float]] = {}    # id -> (job, lease deadline)
+        self._dead: List[QueuedJob] = []
+        self._changed = asyncio.Event()
+
+    # ─────────────────────────────── producers ─────────────────────────────── #
 
-    async def enqueue(self, job: Dict[str, Any]) -> None:
-        await self._q.put(json.dumps(job))
+    async def enqueue(
+        self,
+        job: Dict[str, Any],
+        priority: JobPriority | str = JobPriority.USER,
+        fair_key: Optional[str] = None,
+        cost: int = 1,
+    ) -> None:
+        """Queue a job in a priority lane; fair_key defaults to the job's user_id"""
+        while len(self._ready) >= self._maxsize:
+            self._changed.clear()
+            await self._changed.wait()
+        self._ready.push(QueuedJob.new(job, priority=priority, fair_key=fair_key, cost=cost))
+        self._changed.set()
+
+    # ─────────────────────────────── consumers ─────────────────────────────── #
+
+    async def reserve(self, timeout_seconds: float = 10) -> Optional[QueuedJob]:
+        """Take the next job and hold it in flight until ack/nack or lease expiry"""
+        deadline = time.monotonic() + timeout_seconds
+        while True:
+            self._promote_delayed()
+            job = self._ready.pop()
+            if job is not None:
+                self._in_flight[job.id] = (job, time.monotonic() + self._visibility_timeout)
+                self._changed.set()
+                return job
+
+            now = time.monotonic()
+            if now >= deadline:
+                return None
+            wait = deadline - now
+            if self._delayed:
+                wait = min(wait, max(self._delayed[0][0] - now, 0))
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
 
     async def dequeue(self, timeout_seconds: int = 10) -> Optional[Dict[str, Any]]:
-        try:
-            payload = await asyncio.wait_for(self._q.get(), timeout=timeout_seconds)
-        except asyncio.TimeoutError:
+        """At-most-once convenience: reserve and immediately ack"""
+        job = await self.reserve(timeout_seconds)
+        if job is None:
             return None
-        try:
-            return json.loads(payload)
-        except Exception:
-            return None 
\ No newline at end of file
+        await self.ack(job)
+        return job.payload
+
+    async def heartbeat(self, job: QueuedJob) -> bool:
+        """Extend the job's lease; False if it is no longer held by this worker"""
+        if job.id not in self._in_flight:
+            return False
+        self._in_flight[job.id] = (job, time.monotonic() + self._visibility_timeout)
+        return True
+
+    async def ack(self, job: QueuedJob) -> None:
+        self._in_flight.pop(job.id, None)
+
+    async def nack(self, job: QueuedJob, error: str) -> bool:
+        """Schedule a retry with backoff; returns True if the job was dead-lettered instead"""
+        if self._in_flight.pop(job.id, None) is None:
+            return False
+        return self._retry_or_bury(job, error)
+
+    def _retry_or_bury(self, job: QueuedJob, error: str) -> bool:
+        failed = job.retried(error)
+        if failed.attempts >= self._max_attempts:
+            self._dead.append(failed)
+            return True
+        ready_at = time.monotonic() + backoff_delay(failed.attempts, self._backoff_base, self._backoff_max)
+        self._seq += 1
+        heapq.heappush(self._delayed, (ready_at, self._seq, failed))
+        self._changed.set()
+        return False
+
+    def _promote_delayed(self) -> None:
+        now = time.monotonic()
+        while self._delayed and self._delayed[0][0] <= now:
+            _, _, job = heapq.heappop(self._delayed)
+            self._ready.push(job)
+
+    # ─────────────────────────────── maintenance ───────────────────────────── #
+
+    async def reap(self) -> List[QueuedJob]:
+        """Requeue in-flight jobs whose lease expired; returns jobs moved to the dead-letter list"""
+        now = time.monotonic()
+        dead = []
+        for job_id, (job, lease) in list(self._in_flight.items()):
+            if lease < now:
+                del self._in_flight[job_id]
+                if self._retry_or_bury(job, "visibility timeout expired"):
+                    dead.append(self._dead[-1])
+        return dead
+
+    async def dead_letters(self, limit: int = 100) -> List[QueuedJob]:
+        return list(reversed(self._dead))[:limit]
+
+    async def stats(self) -> Dict[str, int]:
+        return {
+            "ready": len(self._ready),
+            "delayed": len(self._delayed),
+            "in_flight": len(self._in_flight),
+            "dead": len(self._dead),
+        }
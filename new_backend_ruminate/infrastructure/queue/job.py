@@ -0,0 +1,104 @@
+# new_backend_ruminate/infrastructure/queue/job.py
+from __future__ import annotations
+import json
+import random
+import uuid
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, Optional
+
+
+class JobPriority(str, Enum):
+    """Scheduling lanes; a lane is only served when every lane above it is empty"""
+    INTERACTIVE = "interactive"                    # first chunk of a fresh upload, someone is waiting
+    USER = "user"                                  # user-triggered start-processing
+    BATCH = "batch"                                # background chunk processing
+
+
+LANES = (JobPriority.INTERACTIVE.value, JobPriority.USER.value, JobPriority.BATCH.value)
+
+
+@dataclass
+class QueuedJob:
+    """
+    A reserved job. Workers must ack() it when done or nack() it on failure;
+    while it is being processed heartbeat() extends its visibility timeout.
+    """
+    id: str
+    payload: Dict[str, Any]
+    attempts: int = 0
+    last_error: Optional[str] = None
+    priority: str = JobPriority.USER.value
+    fair_key: str = ""                             # jobs sharing a key (a user) share a fair-queuing slot
+    cost: int = 1                                  # charged against the key's deficit when scheduled
+    raw: str = field(default="", repr=False)       # exact serialized form, used to remove it from Redis lists
+
+    @classmethod
+    def new(
+        cls,
+        payload: Dict[str, Any],
+        priority: JobPriority | str = JobPriority.USER,
+        fair_key: Optional[str] = None,
+        cost: int = 1,
+    ) -> "QueuedJob":
+        job = cls(
+            id=str(uuid.uuid4()),
+            payload=payload,
+            priority=JobPriority(priority).value,
+            fair_key=fair_key if fair_key is not None else str(payload.get("user_id") or ""),
+            cost=max(int(cost), 1),
+        )
+        job.raw = job.dumps()
+        return job
+
+    def dumps(self) -> str:
+        return json.dumps({
+            "id": self.id,
+            "payload": self.payload,
+            "attempts": self.attempts,
+            "last_error": self.last_error,
+            "priority": self.priority,
+            "fair_key": self.fair_key,
+            "cost": self.cost,
+        })
+
+    @classmethod
+    def loads(cls, raw: str) -> Optional["QueuedJob"]:
+        try:
+            data = json.loads(raw)
+            if "payload" not in data:                   # bare job dict from before jobs were wrapped
+                job = cls.new(data)
+                job.raw = raw
+                return job
+            return cls(
+                id=data["id"],
+                payload=data["payload"],
+                attempts=data.get("attempts", 0),
+                last_error=data.get("last_error"),
+                priority=data.get("priority", JobPriority.USER.value),
+                fair_key=data.get("fair_key", ""),
+                cost=data.get("cost", 1),
+                raw=raw,
+            )
+        except Exception:
+            return None
+
+    def retried(self, error: str) -> "QueuedJob":
+        """Copy of this job with one more failed attempt recorded"""
+        job = QueuedJob(
+            id=self.id,
+            payload=self.payload,
+            attempts=self.attempts + 1,
+            last_error=error,
+            priority=self.priority,
+            fair_key=self.fair_key,
+            cost=self.cost,
+        )
+        job.raw = job.dumps()
+        return job
+
+
+def backoff_delay(attempts: int, base: float, cap: float) -> float:
+    """Exponential backoff (half fixed, half jitter) for the given number of failed attempts"""
+    delay = min(cap, base * (2 ** max(attempts - 1, 0)))
+    return delay / 2 + random.uniform(0, delay / 2)
@@ -1,61 +1,359 @@
 # new_backend_ruminate/infrastructure/queue/redis_queue.py
 from __future__ import annotations
-import json
-from typing import Any, Dict, Optional
-
-import redis.asyncio as aioredis
-import socket
-from urllib.parse import urlparse
+import logging
+import time
+from typing import Any, Dict, List, Optional
 
 from new_backend_ruminate.config import settings
+from new_backend_ruminate.infrastructure.redis_client import build_redis_client
+from new_backend_ruminate.infrastructure.queue.job import LANES, JobPriority, QueuedJob, backoff_delay
+
+logger = logging.getLogger(__name__)
+
+# Atomically take a job out of the processing list and, if it was still
+# there, drop its lease and push its retried copy onto the dead-letter list
+# (score == "") or the delayed zset. Returns 0 when the job had already been
+# acked or requeued by someone else, so it is never duplicated.
+_REQUEUE_SCRIPT = """
+if redis.call('LREM', KEYS[1], 1, ARGV[1]) == 0 then
+    return 0
+end
+redis.call('HDEL', KEYS[2], ARGV[2])
+if ARGV[4] == '' then
+    redis.call('LPUSH', KEYS[3], ARGV[3])
+else
+    redis.call('ZADD', KEYS[3], ARGV[4], ARGV[3])
+end
+return 1
+"""
+
+# Append a job to its user's queue in a lane; a user whose queue was empty
+# joins the end of the lane's round-robin ring (with a fresh quantum if the
+# ring was empty). Also drops a wake-up token for blocked workers. Shared by
+# the scripts below that end by pushing a job.
+_PUSH_FUNCTION = """
+local function push(queue, ring, deficit, signal, raw, fair_key, quantum)
+    if redis.call('LPUSH', queue, raw) == 1 then
+        redis.call('RPUSH', ring, fair_key)
+        if redis.call('LLEN', ring) == 1 then
+            redis.call('HSET', deficit, fair_key, quantum)
+        else
+            redis.call('HSET', deficit, fair_key, 0)
+        end
+    end
+    redis.call('LPUSH', signal, '1')
+    redis.call('LTRIM', signal, 0, 999)
+end
+"""
+
+# KEYS: user queue, ring, deficit, signal   ARGV: raw, fair_key, quantum
+_PUSH_SCRIPT = _PUSH_FUNCTION + """
+push(KEYS[1], KEYS[2], KEYS[3], KEYS[4], ARGV[1], ARGV[2], ARGV[3])
+return 1
+"""
+
+# Move a due retry from the delayed zset into its lane in one step, so a
+# crash can't lose it between the ZREM and the push. Returns 0 if another
+# worker promoted it first.
+# KEYS: delayed, user queue, ring, deficit, signal   ARGV: raw, fair_key, quantum
+_PROMOTE_SCRIPT = _PUSH_FUNCTION + """
+if redis.call('ZREM', KEYS[1], ARGV[1]) == 0 then
+    return 0
+end
+push(KEYS[2], KEYS[3], KEYS[4], KEYS[5], ARGV[1], ARGV[2], ARGV[3])
+return 1
+"""
+
+# Same for the legacy FIFO list: pop its tail only if it is still the job the
+# caller parsed, then push the re-encoded job (or drop it if ARGV[2] is "",
+# in which case only KEYS[1] is needed).
+# KEYS: legacy list, user queue, ring, deficit, signal
+# ARGV: raw as popped, re-encoded raw, fair_key, quantum
+_MIGRATE_SCRIPT = _PUSH_FUNCTION + """
+if redis.call('LINDEX', KEYS[1], -1) ~= ARGV[1] then
+    return 0
+end
+redis.call('RPOP', KEYS[1])
+if ARGV[2] ~= '' then
+    push(KEYS[2], KEYS[3], KEYS[4], KEYS[5], ARGV[2], ARGV[3], ARGV[4])
+end
+return 1
+"""
+
+# Extend a lease only while the job is still in the processing list, so a
+# job the reaper already requeued isn't leased again (LPOS: Redis 6.0.6+).
+# KEYS: processing, leases   ARGV: raw, job id, lease deadline
+_HEARTBEAT_SCRIPT = """
+if not redis.call('LPOS', KEYS[1], ARGV[1]) then
+    return 0
+end
+redis.call('HSET', KEYS[2], ARGV[2], ARGV[3])
+return 1
+"""
+
+# Pick the next job: lanes in priority order, deficit round-robin between the
+# users of a lane (same algorithm as FairScheduler). The job is moved into
+# the processing list and leased in the same step. The per-user queue keys
+# are built here from ARGV rather than passed in KEYS, see the Redis Cluster
+# note on RedisProcessingQueue.
+# KEYS: processing, leases, then ring + deficit per lane
+# ARGV: queue key, quantum, lease deadline, then lane names
+_TAKE_SCRIPT = """
+local quantum = tonumber(ARGV[2])
+local function next_turn(ring, deficit)
+    local head = redis.call('LINDEX', ring, 0)
+    if head then
+        redis.call('HINCRBY', deficit, head, quantum)
+    end
+end
+for i = 0, (#KEYS - 2) / 2 - 1 do
+    local ring = KEYS[3 + 2 * i]
+    local deficit = KEYS[4 + 2 * i]
+    local prefix = ARGV[1] .. ':' .. ARGV[4 + i] .. ':u:'
+    for _ = 1, 10000 do
+        local key = redis.call('LINDEX', ring, 0)
+        if not key then
+            break
+        end
+        local queue = prefix .. key
+        local raw = redis.call('LINDEX', queue, -1)
+        if not raw then
+            redis.call('LPOP', ring)
+            redis.call('HDEL', deficit, key)
+            next_turn(ring, deficit)
+        else
+            local job = cjson.decode(raw)
+            local cost = tonumber(job['cost'] or 1)
+            local credit = tonumber(redis.call('HGET', deficit, key) or '0')
+            if credit < cost then
+                redis.call('LMOVE', ring, ring, 'LEFT', 'RIGHT')
+                next_turn(ring, deficit)
+            else
+                redis.call('RPOP', queue)
+                if redis.call('LLEN', queue) == 0 then
+                    redis.call('LPOP', ring)
+                    redis.call('HDEL', deficit, key)
+                    next_turn(ring, deficit)
+                else
+                    redis.call('HSET', deficit, key, credit - cost)
+                end
+                redis.call('LPUSH', KEYS[1], raw)
+                redis.call('HSET', KEYS[2], job['id'], ARGV[3])
+                return raw
+            end
+        end
+    end
+end
+return false
+"""
 
 
 class RedisProcessingQueue:
-    def __init__(self, url: Optional[str] = None, queue_key: str = "processing:jobs") -> None:
-        self._url = url or settings().redis_url
+    """
+    Reliable, prioritised job queue on Redis lists.
+
+    Ready jobs live in one list per (priority lane, user). reserve() picks
+    the next one in a Lua script (lanes in priority order, deficit
+    round-robin between users, see FairScheduler), moves it into a
+    processing list and records a lease (deadline) in a hash. Idle workers
+    block on a signal list that enqueue() pushes to. Workers heartbeat() to
+    extend the lease, ack() to remove the job, or nack() to schedule a retry
+    in a delayed zset with exponential backoff. After max_attempts the job
+    goes to the dead-letter list. reap() requeues jobs whose lease expired,
+    e.g. because their worker was OOM-killed, counting it as a failed attempt.
+
+    Keys: <queue_key>:<lane>:ring / :deficit / :u:<user>, :processing,
+    :leases, :delayed, :dead, :signal. <queue_key> itself is the legacy FIFO
+    list and is drained into the lanes.
+
+    The reserve script reads per-user queues it does not declare in KEYS.
+    On Redis Cluster every key must therefore hash to one slot: use a hash
+    tag as the queue key, e.g. "{processing:jobs}".
+    """
+
+    # Consumed by separate worker processes (worker/processor.py)
+    worker_backed = True
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        queue_key: str = "processing:jobs",
+        visibility_timeout: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        backoff_max: Optional[float] = None,
+        fair_quantum: Optional[int] = None,
+    ) -> None:
+        cfg = settings()
+        self._url = url or cfg.redis_url
         self._queue_key = queue_key
-        self._client = self._build_client(self._url)
-
-    def _build_client(self, url: str):
-        # Prefer IPv6 if hostname has only AAAA record
-        parsed = urlparse(url)
-        scheme = parsed.scheme
-        host = parsed.hostname
-        port = parsed.port or 6379
-        username = parsed.username or None
-        password = parsed.password or None
-        use_ssl = scheme == 'rediss'
-
-        ipv6_addr = None
-        try:
-            infos = socket.getaddrinfo(host, port, socket.AF_INET6, socket.SOCK_STREAM)
-            if infos:
-                ipv6_addr = infos[0][4][0]
-        except Exception:
-            ipv6_addr = None
-        if ipv6_addr:
-            return aioredis.Redis(
-                host=ipv6_addr,
-                port=port,
-                username=username,
-                password=password,
-                ssl=use_ssl,
-                decode_responses=True,
-            )
-        # Fallback to URL if IPv6 resolution not available
-        return aioredis.from_url(url, decode_responses=True)
+        self._processing_key = f"{queue_key}:processing"
+        self._leases_key = f"{queue_key}:leases"
+        self._delayed_key = f"{queue_key}:delayed"
+        self._dead_key = f"{queue_key}:dead"
+        self._signal_key = f"{queue_key}:signal"
+        self._visibility_timeout = visibility_timeout if visibility_timeout is not None else cfg.queue_visibility_timeout
+        self._max_attempts = max_attempts if max_attempts is not None else cfg.queue_max_attempts
+        self._backoff_base = backoff_base if backoff_base is not None else cfg.queue_backoff_base
+        self._backoff_max = backoff_max if backoff_max is not None else cfg.queue_backoff_max
+        self._quantum = fair_quantum if fair_quantum is not None else cfg.queue_fair_quantum
+        self._client = build_redis_client(self._url)
+        self._requeue = self._client.register_script(_REQUEUE_SCRIPT)
+        self._push_script = self._client.register_script(_PUSH_SCRIPT)
+        self._take_script = self._client.register_script(_TAKE_SCRIPT)
+        self._promote_script = self._client.register_script(_PROMOTE_SCRIPT)
+        self._migrate_script = self._client.register_script(_MIGRATE_SCRIPT)
+        self._heartbeat_script = self._client.register_script(_HEARTBEAT_SCRIPT)
+
+    def _ring_key(self, lane: str) -> str:
+        return f"{self._queue_key}:{lane}:ring"
+
+    def _deficit_key(self, lane: str) -> str:
+        return f"{self._queue_key}:{lane}:deficit"
 
-    async def enqueue(self, job: Dict[str, Any]) -> None:
-        payload = json.dumps(job)
-        await self._client.lpush(self._queue_key, payload)
+    def _user_queue_key(self, lane: str, fair_key: str) -> str:
+        return f"{self._queue_key}:{lane}:u:{fair_key}"
+
+    async def enqueue(
+        self,
+        job: Dict[str, Any],
+        priority: JobPriority | str = JobPriority.USER,
+        fair_key: Optional[str] = None,
+        cost: int = 1,
+    ) -> None:
+        """Queue a job in a priority lane; fair_key defaults to the job's user_id"""
+        await self._push(QueuedJob.new(job, priority=priority, fair_key=fair_key, cost=cost))
+
+    def _lane_keys(self, job: QueuedJob) -> List[str]:
+        """KEYS for pushing job onto its lane: user queue, ring, deficit, signal"""
+        return [
+            self._user_queue_key(job.priority, job.fair_key),
+            self._ring_key(job.priority),
+            self._deficit_key(job.priority),
+            self._signal_key,
+        ]
+
+    async def _push(self, job: QueuedJob) -> None:
+        await self._push_script(keys=self._lane_keys(job), args=[job.raw, job.fair_key, self._quantum])
+
+    async def reserve(self, timeout_seconds: float = 10) -> Optional[QueuedJob]:
+        """Lease the next job by priority and fairness, waiting up to timeout_seconds"""
+        keys = [self._processing_key, self._leases_key]
+        for lane in LANES:
+            keys += [self._ring_key(lane), self._deficit_key(lane)]
+        deadline = time.monotonic() + timeout_seconds
+        while True:
+            await self._promote_delayed()
+            raw = await self._take_script(
+                keys=keys,
+                args=[self._queue_key, self._quantum, time.time() + self._visibility_timeout, *LANES],
+            )
+            if raw is not None:
+                return QueuedJob.loads(raw)
+            remaining = deadline - time.monotonic()
+            if remaining < 0.01:
+                return None
+            # Wake on the next enqueue; re-check at least every second for due retries
+            await self._client.blpop(self._signal_key, timeout=min(remaining, 1.0))
 
     async def dequeue(self, timeout_seconds: int = 10) -> Optional[Dict[str, Any]]:
-        # BRPOP returns (key, value) or None on timeout
-        result = await self._client.brpop(self._queue_key, timeout=timeout_seconds)
-        if not result:
+        """At-most-once convenience: reserve and immediately ack"""
+        job = await self.reserve(timeout_seconds)
+        if job is None:
             return None
-        _, payload = result
-        try:
-            return json.loads(payload)
-        except Exception:
-            return None 
\ No newline at end of file
+        await self.ack(job)
+        return job.payload
+
+    async def heartbeat(self, job: QueuedJob) -> bool:
+        """Extend the job's lease; False if it is no longer held by this worker"""
+        extended = await self._heartbeat_script(
+            keys=[self._processing_key, self._leases_key],
+            args=[job.raw, job.id, time.time() + self._visibility_timeout],
+        )
+        return bool(extended)
+
+    async def ack(self, job: QueuedJob) -> None:
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.lrem(self._processing_key, 1, job.raw)
+            pipe.hdel(self._leases_key, job.id)
+            await pipe.execute()
+
+    async def nack(self, job: QueuedJob, error: str) -> bool:
+        """Schedule a retry with backoff; returns True if the job was dead-lettered instead"""
+        return await self._retry_or_bury(job, error) == "dead"
+
+    async def _retry_or_bury(self, job: QueuedJob, error: str) -> Optional[str]:
+        failed = job.retried(error)
+        if failed.attempts >= self._max_attempts:
+            target, score, outcome = self._dead_key, "", "dead"
+        else:
+            delay = backoff_delay(failed.attempts, self._backoff_base, self._backoff_max)
+            target, score, outcome = self._delayed_key, str(time.time() + delay), "retry"
+        moved = await self._requeue(
+            keys=[self._processing_key, self._leases_key, target],
+            args=[job.raw, job.id, failed.raw, score],
+        )
+        return outcome if moved else None
+
+    async def _promote_delayed(self) -> None:
+        due = await self._client.zrangebyscore(self._delayed_key, "-inf", time.time(), start=0, num=100)
+        for raw in due:
+            job = QueuedJob.loads(raw)
+            if job is None:
+                logger.error(f"[RedisProcessingQueue] Dropping unparseable retry: {raw[:200]}")
+                await self._client.zrem(self._delayed_key, raw)
+                continue
+            # Only the caller whose ZREM succeeds pushes, so concurrent workers don't duplicate
+            await self._promote_script(
+                keys=[self._delayed_key, *self._lane_keys(job)],
+                args=[raw, job.fair_key, self._quantum],
+            )
+
+        # Jobs left in the pre-lanes FIFO list by an older deployment
+        for _ in range(100):
+            raw = await self._client.lindex(self._queue_key, -1)
+            if raw is None:
+                break
+            job = QueuedJob.loads(raw)
+            if job is None:
+                logger.error(f"[RedisProcessingQueue] Dropping unparseable job: {raw[:200]}")
+                await self._migrate_script(keys=[self._queue_key], args=[raw, "", "", 0])
+                continue
+            job.raw = job.dumps()
+            await self._migrate_script(
+                keys=[self._queue_key, *self._lane_keys(job)],
+                args=[raw, job.raw, job.fair_key, self._quantum],
+            )
+
+    async def reap(self) -> List[QueuedJob]:
+        """Requeue in-flight jobs whose lease expired; returns jobs moved to the dead-letter list"""
+        now = time.time()
+        dead = []
+        for raw in await self._client.lrange(self._processing_key, 0, -1):
+            job = QueuedJob.loads(raw)
+            if job is None:
+                await self._client.lrem(self._processing_key, 1, raw)
+                continue
+            lease = await self._client.hget(self._leases_key, job.id)
+            # No lease: acked since the LRANGE (reserve leases atomically)
+            if lease is not None and float(lease) < now:
+                logger.warning(f"[RedisProcessingQueue] Lease expired for job {job.id} (attempt {job.attempts + 1})")
+                if await self._retry_or_bury(job, "visibility timeout expired") == "dead":
+                    dead.append(job.retried("visibility timeout expired"))
+        return dead
+
+    async def dead_letters(self, limit: int = 100) -> List[QueuedJob]:
+        raws = await self._client.lrange(self._dead_key, 0, limit - 1)
+        return [job for job in (QueuedJob.loads(raw) for raw in raws) if job is not None]
+
+    async def stats(self) -> Dict[str, int]:
+        ready = await self._client.llen(self._queue_key)
+        for lane in LANES:
+            for fair_key in await self._client.lrange(self._ring_key(lane), 0, -1):
+                ready += await self._client.llen(self._user_queue_key(lane, fair_key))
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.zcard(self._delayed_key)
+            pipe.llen(self._processing_key)
+            pipe.llen(self._dead_key)
+            delayed, in_flight, dead = await pipe.execute()
+        return {"ready": ready, "delayed": delayed, "in_flight": in_flight, "dead": dead}
@@ -0,0 +1,35 @@
+# new_backend_ruminate/infrastructure/redis_client.py
+import socket
+from urllib.parse import urlparse
+
+import redis.asyncio as aioredis
+
+
+def build_redis_client(url: str) -> aioredis.Redis:
+    """Async Redis client with decoded responses, preferring IPv6 if the host has only an AAAA record"""
+    parsed = urlparse(url)
+    scheme = parsed.scheme
+    host = parsed.hostname
+    port = parsed.port or 6379
+    username = parsed.username or None
+    password = parsed.password or None
+    use_ssl = scheme == 'rediss'
+
+    ipv6_addr = None
+    try:
+        infos = socket.getaddrinfo(host, port, socket.AF_INET6, socket.SOCK_STREAM)
+        if infos:
+            ipv6_addr = infos[0][4][0]
+    except Exception:
+        ipv6_addr = None
+    if ipv6_addr:
+        return aioredis.Redis(
+            host=ipv6_addr,
+            port=port,
+            username=username,
+            password=password,
+            ssl=use_ssl,
+            decode_responses=True,
+        )
+    # Fallback to URL if IPv6 resolution not available
+    return aioredis.from_url(url, decode_responses=True)
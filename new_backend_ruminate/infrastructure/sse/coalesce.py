@@ -0,0 +1,76 @@
+# new_backend_ruminate/infrastructure/sse/coalesce.py
+import asyncio
+from typing import AsyncIterable, AsyncIterator, List, Optional
+
+from new_backend_ruminate.config import settings
+
+
+async def coalesce_stream(
+    source: AsyncIterable[str],
+    *,
+    window_ms: Optional[int] = None,
+    max_chars: Optional[int] = None,
+) -> AsyncIterator[str]:
+    """
+    Batch streamed LLM text into fewer, larger chunks.
+
+    The first text chunk is yielded immediately so first-token latency is
+    unchanged. Later text is buffered and flushed once window_ms has passed
+    since the first buffered chunk or max_chars is reached, whichever comes
+    first. The window is enforced even while the source is stalled. JSON
+    event chunks ('{"type"...') flush pending text and pass through as-is,
+    so ordering is preserved.
+    """
+    cfg = settings()
+    window = (window_ms if window_ms is not None else cfg.stream_coalesce_window_ms) / 1000
+    max_chars = max_chars or cfg.stream_coalesce_max_chars
+    loop = asyncio.get_running_loop()
+
+    it = source.__aiter__()
+    buffer: List[str] = []
+    size = 0
+    deadline: Optional[float] = None
+    sent_first_text = False
+
+    next_chunk = asyncio.ensure_future(it.__anext__())
+    try:
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - loop.time())
+            done, _ = await asyncio.wait({next_chunk}, timeout=timeout)
+            if not done:                                    # window elapsed while the source is quiet
+                yield "".join(buffer)
+                buffer.clear()
+                size, deadline = 0, None
+                continue
+
+            try:
+                chunk = next_chunk.result()
+            except StopAsyncIteration:
+                break
+            next_chunk = asyncio.ensure_future(it.__anext__())
+
+            if not chunk:
+                continue
+            if chunk.startswith('{"type"') or not sent_first_text:
+                if buffer:
+                    yield "".join(buffer)
+                    buffer.clear()
+                    size, deadline = 0, None
+                sent_first_text = sent_first_text or not chunk.startswith('{"type"')
+                yield chunk
+                continue
+
+            buffer.append(chunk)
+            size += len(chunk)
+            if deadline is None:
+                deadline = loop.time() + window
+            if size >= max_chars or loop.time() >= deadline:
+                yield "".join(buffer)
+                buffer.clear()
+                size, deadline = 0, None
+
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        if not next_chunk.done():
+            next_chunk.cancel()
@@ -2,49 +2,197 @@
 
 import asyncio
 import logging
-from collections import defaultdict
-from typing import AsyncIterator, Dict, List
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from new_backend_ruminate.config import settings
 
 logger = logging.getLogger(__name__)
 
+OVERFLOW_POLICIES = ("drop_oldest", "coalesce", "disconnect")
+
+
+class _Subscriber:
+    """One consumer's bounded buffer; written synchronously by publish()"""
+
+    __slots__ = ("buffer", "wakeup", "closed")
+
+    def __init__(self) -> None:
+        self.buffer: Deque[Optional[str]] = deque()
+        self.wakeup = asyncio.Event()
+        self.closed = False
+
+    def push(self, chunk: Optional[str]) -> None:
+        self.buffer.append(chunk)
+        self.wakeup.set()
+
+
+@dataclass
+class _StreamStats:
+    published: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+    disconnected: int = 0
+
 
 class EventStreamHub:
     """
     In-process publish/subscribe hub.  Multiple consumers per stream are
-    supported by maintaining a list[Queue] for each stream_id.
+    supported by keeping a bounded buffer per consumer.
+
+    publish() never awaits: chunks are appended to each consumer's buffer
+    synchronously, so a slow SSE client cannot stall publishers on its own
+    or any other stream. When a consumer's buffer is full the stream's
+    overflow policy applies:
+
+    * drop_oldest – discard the oldest buffered chunk
+    * coalesce    – append the chunk's text to the newest buffered text
+                    chunk; control chunks are queued past the limit rather
+                    than evicting text. Meant for LLM token streams, where
+                    no text may be lost
+    * disconnect  – close that consumer; the client reconnects
     """
 
-    def __init__(self) -> None:
-        self._queues: Dict[str, List[asyncio.Queue[str]]] = defaultdict(list)
-        self._lock = asyncio.Lock()
+    def __init__(self, max_queue_size: Optional[int] = None, overflow_policy: Optional[str] = None) -> None:
+        overflow_policy = overflow_policy or settings().sse_overflow_policy
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {overflow_policy!r}")
+        self._max_queue_size = max_queue_size or settings().sse_queue_size
+        self._default_policy = overflow_policy
+        self._subscribers: Dict[str, List[_Subscriber]] = defaultdict(list)
+        self._policies: Dict[str, str] = {}
+        self._stats: Dict[str, _StreamStats] = defaultdict(_StreamStats)
+        self._totals = _StreamStats()
+
+    def set_overflow_policy(self, stream_id: str, policy: str) -> None:
+        """Override the overflow policy for one stream"""
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {policy!r}")
+        self._policies[stream_id] = policy
 
     async def register_consumer(self, stream_id: str) -> AsyncIterator[str]:
-        q: asyncio.Queue[str] = asyncio.Queue(maxsize=256)
-        async with self._lock:
-            self._queues[stream_id].append(q)
+        sub = _Subscriber()
+        self._subscribers[stream_id].append(sub)
 
         try:
             while True:
-                chunk = await q.get()
+                while not sub.buffer:
+                    if sub.closed:
+                        return
+                    sub.wakeup.clear()
+                    await sub.wakeup.wait()
+                chunk = sub.buffer.popleft()
                 if chunk is None:                           # termination sentinel
                     return
                 yield chunk
         finally:
-            async with self._lock:
-                lst = self._queues.get(stream_id)
-                if lst and q in lst:
-                    lst.remove(q)
-                    if not lst:
-                        self._queues.pop(stream_id, None)
+            lst = self._subscribers.get(stream_id)
+            if lst and sub in lst:
+                lst.remove(sub)
+                if not lst:
+                    self._subscribers.pop(stream_id, None)
+
+    async def stream_events(
+        self, stream_id: str, last_event_id: Optional[str] = None, from_latest: bool = False
+    ) -> AsyncIterator[Tuple[Optional[str], str]]:
+        """
+        Same interface as RedisStreamHub.stream_events. Events are not
+        retained in-process, so there are no event ids to resume from and
+        every consumer starts from the latest event.
+        """
+        async for chunk in self.register_consumer(stream_id):
+            yield None, chunk
 
     async def publish(self, stream_id: str, chunk: str) -> None:
-        async with self._lock:
-            queues = self._queues.get(stream_id, [])
-            for q in queues:
-                await q.put(chunk)
+        subscribers = self._subscribers.get(stream_id)
+        if not subscribers:
+            return
+        stats = self._stats[stream_id]
+        stats.published += 1
+        self._totals.published += 1
+        policy = self._policies.get(stream_id, self._default_policy)
+        for sub in list(subscribers):
+            if len(sub.buffer) < self._max_queue_size:
+                sub.push(chunk)
+            else:
+                self._overflow(stream_id, sub, chunk, policy, stats)
+
+    def _overflow(self, stream_id: str, sub: _Subscriber, chunk: str, policy: str, stats: _StreamStats) -> None:
+        if policy == "disconnect":
+            self._count(stats, disconnected=1, dropped=len(sub.buffer) + 1)
+            logger.warning(f"[EventStreamHub] Disconnecting slow consumer on {stream_id}")
+            sub.buffer.clear()
+            sub.closed = True
+            sub.wakeup.set()
+            subscribers = self._subscribers[stream_id]
+            subscribers.remove(sub)
+            if not subscribers:
+                self._subscribers.pop(stream_id, None)
+            return
+
+        if policy == "coalesce":
+            last = sub.buffer[-1]
+            if last is not None and _is_text(last) and _is_text(chunk):
+                sub.buffer[-1] = last + chunk
+                self._count(stats, coalesced=1)
+            else:
+                sub.push(chunk)
+            return
+
+        sub.buffer.popleft()
+        self._count(stats, dropped=1)
+        sub.push(chunk)
+
+    def _count(self, stats: _StreamStats, **increments: int) -> None:
+        for field, n in increments.items():
+            setattr(stats, field, getattr(stats, field) + n)
+            setattr(self._totals, field, getattr(self._totals, field) + n)
 
     async def terminate(self, stream_id: str) -> None:
-        async with self._lock:
-            queues = self._queues.pop(stream_id, [])
-            for q in queues:
-                await q.put(None)
+        for sub in self._subscribers.pop(stream_id, []):
+            sub.push(None)                                  # sentinel bypasses the size limit
+        self._policies.pop(stream_id, None)
+        self._stats.pop(stream_id, None)
+
+    def stream_metrics(self, stream_id: str) -> Optional[Dict[str, Any]]:
+        """Queue depth and overflow counters for one open stream"""
+        subscribers = self._subscribers.get(stream_id)
+        if not subscribers:
+            return None
+        depths = [len(sub.buffer) for sub in subscribers]
+        stats = self._stats.get(stream_id, _StreamStats())
+        return {
+            "consumers": len(subscribers),
+            "max_queue_depth": max(depths),
+            "total_queue_depth": sum(depths),
+            "policy": self._policies.get(stream_id, self._default_policy),
+            "published": stats.published,
+            "dropped": stats.dropped,
+            "coalesced": stats.coalesced,
+            "disconnected": stats.disconnected,
+        }
+
+    async def metrics(self) -> Dict[str, Any]:
+        """
+        Aggregate queue depth over open streams, plus lifetime totals.
+        Stream ids are left out: they are message ids and this is served
+        without auth. Async to match RedisStreamHub.metrics.
+        """
+        depths = [len(sub.buffer) for subscribers in self._subscribers.values() for sub in subscribers]
+        return {
+            "streams": len(self._subscribers),
+            "consumers": len(depths),
+            "max_queue_depth": max(depths, default=0),
+            "total_queue_depth": sum(depths),
+            "totals": {
+                "published": self._totals.published,
+                "dropped": self._totals.dropped,
+                "coalesced": self._totals.coalesced,
+                "disconnected": self._totals.disconnected,
+            },
+        }
+
+def _is_text(chunk: str) -> bool:
+    """Token text can be merged; JSON events and the [DONE] marker cannot"""
+    return not (chunk.startswith("{") or chunk == "[DONE]")
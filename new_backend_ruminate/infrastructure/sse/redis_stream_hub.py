@@ -0,0 +1,130 @@
+# new_backend_ruminate/infrastructure/sse/redis_stream_hub.py
+from __future__ import annotations
+import logging
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from new_backend_ruminate.config import settings
+from new_backend_ruminate.infrastructure.redis_client import build_redis_client
+
+logger = logging.getLogger(__name__)
+
+_DATA_FIELD = "d"
+_END_FIELD = "end"
+
+
+class RedisStreamHub:
+    """
+    Redis Streams-backed event hub, shared by every API replica and worker.
+
+    Each stream_id maps to a Redis stream (sse:<stream_id>) appended with
+    XADD, trimmed to roughly sse_stream_maxlen entries and expired
+    sse_stream_ttl seconds after its last write. Consumers read with XREAD
+    starting from the beginning of the stream, or after a Last-Event-ID,
+    so late subscribers and reconnects receive every event. Notification
+    channels subscribe from_latest instead, and only see new events. terminate()
+    appends an end marker that stops all consumers. metrics() covers the
+    streams this process is reading.
+
+    Exposes both the EventStreamHub interface (publish / terminate /
+    register_consumer) and the event publisher interface (publish /
+    subscribe).
+    """
+
+    def __init__(
+        self,
+        url: str | None = None,
+        maxlen: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+        block_ms: Optional[int] = None,
+    ) -> None:
+        cfg = settings()
+        self._url = url or cfg.redis_url
+        self._maxlen = maxlen if maxlen is not None else cfg.sse_stream_maxlen
+        self._ttl = ttl_seconds if ttl_seconds is not None else cfg.sse_stream_ttl
+        self._block_ms = block_ms if block_ms is not None else cfg.sse_block_ms
+        self._client = build_redis_client(self._url)
+        self._consumers: Dict[str, int] = {}
+
+    @staticmethod
+    def _key(stream_id: str) -> str:
+        return f"sse:{stream_id}"
+
+    async def _append(self, stream_id: str, fields: dict) -> str:
+        key = self._key(stream_id)
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.xadd(key, fields, maxlen=self._maxlen, approximate=True)
+            pipe.expire(key, self._ttl)
+            event_id, _ = await pipe.execute()
+        return event_id
+
+    def set_overflow_policy(self, stream_id: str, policy: str) -> None:
+        """No-op: consumers read from Redis at their own pace, nothing is buffered per consumer"""
+
+    async def metrics(self) -> Dict[str, Any]:
+        """Streams read by this process, their consumers and total length (XLEN); no stream ids"""
+        stream_ids = list(self._consumers)
+        async with self._client.pipeline(transaction=False) as pipe:
+            for stream_id in stream_ids:
+                pipe.xlen(self._key(stream_id))
+            lengths = await pipe.execute() if stream_ids else []
+        return {
+            "streams": len(stream_ids),
+            "consumers": sum(self._consumers.get(stream_id, 0) for stream_id in stream_ids),
+            "length": sum(lengths),
+        }
+
+    async def publish(self, stream_id: str, chunk: str) -> None:
+        await self._append(stream_id, {_DATA_FIELD: chunk})
+
+    async def terminate(self, stream_id: str) -> None:
+        await self._append(stream_id, {_END_FIELD: "1"})
+
+    async def stream_events(
+        self,
+        stream_id: str,
+        last_event_id: Optional[str] = None,
+        from_latest: bool = False,
+    ) -> AsyncIterator[Tuple[Optional[str], str]]:
+        """
+        Yield (event_id, chunk) from the start of the stream, or after
+        last_event_id, until the stream is terminated. With from_latest,
+        start after the stream's current last entry instead. Gives up once
+        no event has arrived for the stream TTL.
+        """
+        key = self._key(stream_id)
+        cursor = last_event_id or "0-0"
+        if from_latest and not last_event_id:
+            # Resolve "$" once, so events added between two XREADs are not skipped
+            latest = await self._client.xrevrange(key, count=1)
+            if latest:
+                cursor = latest[0][0]
+        idle_ms = 0
+        self._consumers[stream_id] = self._consumers.get(stream_id, 0) + 1
+        try:
+            while True:
+                response = await self._client.xread({key: cursor}, count=100, block=self._block_ms)
+                if not response:
+                    idle_ms += self._block_ms
+                    if idle_ms >= self._ttl * 1000:
+                        logger.info(f"[RedisStreamHub] {stream_id} idle for {self._ttl}s, closing consumer")
+                        return
+                    continue
+                idle_ms = 0
+                for _, entries in response:
+                    for event_id, fields in entries:
+                        cursor = event_id
+                        if _END_FIELD in fields:
+                            return
+                        yield event_id, fields.get(_DATA_FIELD, "")
+        finally:
+            remaining = self._consumers.pop(stream_id, 1) - 1
+            if remaining > 0:
+                self._consumers[stream_id] = remaining
+
+    async def register_consumer(self, stream_id: str) -> AsyncIterator[str]:
+        async for _, chunk in self.stream_events(stream_id):
+            yield chunk
+
+    async def subscribe(self, stream_id: str, from_latest: bool = False) -> AsyncIterator[str]:
+        async for _, chunk in self.stream_events(stream_id, from_latest=from_latest):
+            yield chunk
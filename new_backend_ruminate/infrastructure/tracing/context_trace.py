@@ -0,0 +1,129 @@
+# new_backend_ruminate/infrastructure/tracing/context_trace.py
+"""
+In-memory tracing of context builds and prompts.
+
+A trace is started per chat turn when the turn runs in debug mode or is
+sampled (context_trace_sample_rate). While it is active, trace_event()
+calls anywhere in the builder or providers append structured events to it;
+when no trace is active they return immediately. Finished traces go into
+a fixed-size ring buffer read through the debug API, so tracing never
+touches the disk.
+"""
+import random
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from new_backend_ruminate.config import settings
+
+_active_trace: ContextVar[Optional[Dict[str, Any]]] = ContextVar("context_trace", default=None)
+
+
+def trace_active() -> bool:
+    """True when the current task is recording a trace"""
+    return _active_trace.get() is not None
+
+
+def trace_event(name: str, **data: Any) -> None:
+    """Append an event to the active trace, if any"""
+    trace = _active_trace.get()
+    if trace is None:
+        return
+    elapsed_ms = (time.perf_counter() - trace["_start"]) * 1000
+    trace["events"].append({"name": name, "t_ms": round(elapsed_ms, 2), **data})
+
+
+class ContextTraceService:
+    """
+    Ring buffer of recent context traces. Capacity and sample rate default
+    to settings, read on first use so the global instance can be created at
+    import time without configuration.
+    """
+
+    def __init__(self, capacity: Optional[int] = None, sample_rate: Optional[float] = None):
+        self._capacity = capacity
+        self._sample_rate = sample_rate
+        self._buffer: Optional[Deque[Dict[str, Any]]] = None
+
+    @property
+    def _traces(self) -> Deque[Dict[str, Any]]:
+        if self._buffer is None:
+            if self._capacity is None:
+                self._capacity = settings().context_trace_capacity
+            self._buffer = deque(maxlen=self._capacity)
+        return self._buffer
+
+    def should_trace(self, debug_mode: bool = False) -> bool:
+        """Trace every debug-mode turn plus a random sample of the rest"""
+        if debug_mode:
+            return True
+        if self._sample_rate is None:
+            self._sample_rate = settings().context_trace_sample_rate
+        return self._sample_rate > 0 and random.random() < self._sample_rate
+
+    @contextmanager
+    def trace(
+        self,
+        enabled: bool,
+        *,
+        conversation_id: Optional[str] = None,
+        message_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> Iterator[None]:
+        """Record trace_event() calls made inside the block; no-op unless enabled"""
+        if not enabled:
+            yield
+            return
+
+        trace = {
+            "id": str(uuid.uuid4()),
+            "conversation_id": conversation_id,
+            "message_id": message_id,
+            "user_id": user_id,
+            "created_at": datetime.utcnow().isoformat(),
+            "events": [],
+            "_start": time.perf_counter(),
+        }
+        token = _active_trace.set(trace)
+        try:
+            yield
+        except Exception as e:
+            trace["error"] = str(e)
+            raise
+        finally:
+            _active_trace.reset(token)
+            trace["duration_ms"] = round((time.perf_counter() - trace.pop("_start")) * 1000, 2)
+            self._traces.append(trace)
+
+    def list_traces(
+        self,
+        *,
+        user_id: Optional[str] = None,
+        conversation_id: Optional[str] = None,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """Most recent traces first"""
+        traces = []
+        for trace in reversed(self._traces):
+            if user_id is not None and trace["user_id"] != user_id:
+                continue
+            if conversation_id is not None and trace["conversation_id"] != conversation_id:
+                continue
+            traces.append(trace)
+            if len(traces) >= limit:
+                break
+        return traces
+
+    def get_trace(self, trace_id: str) -> Optional[Dict[str, Any]]:
+        for trace in self._traces:
+            if trace["id"] == trace_id:
+                return trace
+        return None
+
+
+# Global instance
+context_trace_service = ContextTraceService()
@@ -21,9 +21,10 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from new_backend_ruminate.config import settings
 from new_backend_ruminate.infrastructure.db.bootstrap import init_engine
-from new_backend_ruminate.dependencies import get_event_hub  # optional: expose on app.state
+from new_backend_ruminate.dependencies import get_event_hub, get_event_publisher, get_marker_client  # optional: expose on app.state
 from new_backend_ruminate.api.conversation.routes import router as conversation_router
 from new_backend_ruminate.api.conversation.prompt_approval_routes import router as prompt_approval_router
+from new_backend_ruminate.api.conversation.context_trace_routes import router as context_trace_router
 from new_backend_ruminate.api.document.routes import router as document_router
 from new_backend_ruminate.api.document.text_enhancement_routes import router as text_enhancement_router
 # from new_backend_ruminate.api.document.definition_approval_routes import router as definition_approval_router
@@ -60,13 +61,29 @@ app.include_router(document_router)              # ← this line wires /document
 app.include_router(text_enhancement_router)      # ← this line wires /documents/{id}/text-enhancements/…
 # app.include_router(definition_approval_router)   # disabled: remove definition approval endpoints
 app.include_router(auth_router)                  # ← this line wires /auth/…
+app.include_router(context_trace_router)         # ← this line wires /debug/context-traces/…
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint for Fly.io monitoring"""
     return {"status": "healthy", "service": "ruminate-backend"}
 
+@app.get("/health/event-hub")
+async def event_hub_metrics():
+    """SSE fan-out totals: queue depth and dropped/coalesced chunks, or stream lengths on Redis"""
+    return await get_event_hub().metrics()
+
+@app.get("/health/marker")
+async def marker_client_metrics():
+    """Marker connection pool and poller metrics"""
+    return get_marker_client().metrics()
+
 @app.on_event("startup")
 async def _startup() -> None:
     await init_engine(settings())
+    await get_marker_client().start(notifications=get_event_publisher())
     app.state.event_hub = get_event_hub()          # handy for websocket upgrades
+
+@app.on_event("shutdown")
+async def _shutdown() -> None:
+    await get_marker_client().close()
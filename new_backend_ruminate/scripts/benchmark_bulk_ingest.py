@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark for persisting Marker results.
+
+Builds a synthetic 500-page Marker response and stores it twice: once via
+the per-row create_pages/create_blocks path (add + commit + refresh each row)
+and once via bulk_create_pages/bulk_create_blocks. Reports rows/second for both.
+
+Uses the database configured in settings (SQLite by default, PostgreSQL
+exercises the COPY path).
+
+    python scripts/benchmark_bulk_ingest.py --pages 500 --blocks-per-page 40
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from uuid import uuid4
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from new_backend_ruminate.infrastructure.db import bootstrap
+from new_backend_ruminate.infrastructure.db.meta import Base
+from new_backend_ruminate.config import settings
+from new_backend_ruminate.domain.document.entities import Document, DocumentStatus, Page, Block
+from new_backend_ruminate.infrastructure.document.rds_document_repository import RDSDocumentRepository
+
+# Import all models to register them with SQLAlchemy metadata
+import new_backend_ruminate.infrastructure.db.models
+
+
+def synthetic_marker_pages(num_pages: int, blocks_per_page: int) -> list:
+    """Build Marker-shaped page dicts with text blocks"""
+    pages = []
+    for page_idx in range(num_pages):
+        blocks = [
+            {
+                "id": f"/page/{page_idx}/Text/{i}",
+                "block_type": "Text",
+                "html": f"<p>Page {page_idx} paragraph {i}. " + "Lorem ipsum dolor sit amet. " * 8 + "</p>",
+                "polygon": [[72, 72 + i * 12], [540, 72 + i * 12], [540, 84 + i * 12], [72, 84 + i * 12]],
+                "section_hierarchy": {"1": f"/page/{page_idx}/SectionHeader/0"},
+                "images": {},
+            }
+            for i in range(blocks_per_page)
+        ]
+        pages.append({
+            "polygon": [[0, 0], [612, 0], [612, 792], [0, 792]],
+            "html": "",
+            "blocks": blocks,
+        })
+    return pages
+
+
+def to_domain(document_id: str, marker_pages: list) -> tuple:
+    """Mirror DocumentService._save_marker_results entity construction"""
+    pages, blocks = [], []
+    for idx, page_data in enumerate(marker_pages):
+        page = Page(
+            id=str(uuid4()),
+            document_id=document_id,
+            page_number=idx,
+            polygon=page_data.get("polygon"),
+            html_content=page_data.get("html", ""),
+        )
+        pages.append(page)
+        for block_data in page_data.get("blocks", []):
+            block = Block.from_marker_block(
+                marker_block=block_data,
+                document_id=document_id,
+                page_id=page.id,
+                page_number=page.page_number
+            )
+            blocks.append(block)
+            page.add_block(block.id)
+    return pages, blocks
+
+
+async def run_once(repo: RDSDocumentRepository, marker_pages: list, bulk: bool) -> tuple:
+    """Persist one synthetic document, returning (rows, seconds)"""
+    document_id = str(uuid4())
+    async with bootstrap.session_scope() as session:
+        await repo.create_document(
+            Document(id=document_id, status=DocumentStatus.PROCESSING_MARKER, title="bench.pdf"),
+            session
+        )
+    pages, blocks = to_domain(document_id, marker_pages)
+
+    start = time.perf_counter()
+    async with bootstrap.session_scope() as session:
+        if bulk:
+            await repo.bulk_create_pages(pages, session)
+            await repo.bulk_create_blocks(blocks, session)
+        else:
+            await repo.create_pages(pages, session)
+            await repo.create_blocks(blocks, session)
+    elapsed = time.perf_counter() - start
+
+    async with bootstrap.session_scope() as session:
+        await repo.delete_document(document_id, session)
+
+    return len(pages) + len(blocks), elapsed
+
+
+async def main(num_pages: int, blocks_per_page: int, create_tables: bool):
+    await bootstrap.init_engine(settings())
+    if create_tables:
+        async with bootstrap.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    repo = RDSDocumentRepository()
+    marker_pages = synthetic_marker_pages(num_pages, blocks_per_page)
+    print(f"Database: {bootstrap.engine.dialect.name}")
+    print(f"Synthetic Marker response: {num_pages} pages x {blocks_per_page} blocks")
+
+    try:
+        for label, bulk in (("per-row insert + refresh", False), ("bulk insert", True)):
+            rows, elapsed = await run_once(repo, marker_pages, bulk)
+            print(f"  {label:<26} {rows:>7} rows in {elapsed:7.2f}s  ({rows / elapsed:,.0f} rows/s)")
+    finally:
+        await bootstrap.engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--blocks-per-page", type=int, default=40)
+    parser.add_argument("--create-tables", action="store_true", help="Run create_all before benchmarking")
+    args = parser.parse_args()
+    asyncio.run(main(args.pages, args.blocks_per_page, args.create_tables))
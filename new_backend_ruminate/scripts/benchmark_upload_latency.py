@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark for upload request latency under concurrency.
+
+Runs the database side of an upload (document row, main conversation, root
+system message and storage key) for many simulated requests at once, in two
+ways: the multi-commit sequence uploads used to run (create_document + commit
++ refresh, create_conversation in its own session, an update_document for
+main_conversation_id and another for s3_pdf_path), and the single-transaction
+create_document_with_conversation path. Reports p50/p95/max latency and
+uploads/second per concurrency level. Storage is an in-memory no-op, so only
+database round trips are measured.
+
+Uses the database configured in settings (SQLite by default; point DB_URL at
+PostgreSQL to see realistic round-trip costs).
+
+    python scripts/benchmark_upload_latency.py --requests 200 --concurrency 1 8 32
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from uuid import uuid4
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from new_backend_ruminate.infrastructure.db import bootstrap
+from new_backend_ruminate.infrastructure.db.meta import Base
+from new_backend_ruminate.config import settings
+from new_backend_ruminate.domain.document.entities import Document, DocumentStatus
+from new_backend_ruminate.infrastructure.conversation.rds_conversation_repository import RDSConversationRepository
+from new_backend_ruminate.infrastructure.document.rds_document_repository import RDSDocumentRepository
+from new_backend_ruminate.infrastructure.sse.hub import EventStreamHub
+from new_backend_ruminate.services.conversation.service import ConversationService
+from new_backend_ruminate.tests.stubs import StubLLM, StubContextBuilder
+
+# Import all models to register them with SQLAlchemy metadata
+import new_backend_ruminate.infrastructure.db.models
+
+
+async def legacy_upload(repo: RDSDocumentRepository, conversations: ConversationService, user_id: str) -> str:
+    """The per-step commits uploads made before the unit-of-work path"""
+    document = Document(id=str(uuid4()), user_id=user_id, title="bench.pdf", status=DocumentStatus.PENDING)
+    async with bootstrap.session_scope() as session:
+        document = await repo.create_document(document, session)
+        main_conversation_id, _ = await conversations.create_conversation(
+            user_id=user_id, conv_type="chat", document_id=document.id
+        )
+        document.main_conversation_id = main_conversation_id
+        document = await repo.update_document(document, session)
+    async with bootstrap.session_scope() as session:
+        document.s3_pdf_path = f"documents/{document.id}/bench.pdf"
+        await repo.update_document(document, session)
+    return document.id
+
+
+async def unit_of_work_upload(repo: RDSDocumentRepository, conversations: ConversationService, user_id: str) -> str:
+    """Document, storage key, conversation and root message in one transaction"""
+    document_id = str(uuid4())
+    document = Document(
+        id=document_id,
+        user_id=user_id,
+        title="bench.pdf",
+        status=DocumentStatus.PENDING,
+        s3_pdf_path=f"documents/{document_id}/bench.pdf",
+    )
+    conversation, root_message = conversations.build_conversation(
+        user_id=user_id, conv_type="chat", document_id=document_id
+    )
+    async with bootstrap.session_scope() as session:
+        await repo.create_document_with_conversation(document, conversation, root_message, session)
+    return document_id
+
+
+async def run_level(upload, repo, conversations, num_requests: int, concurrency: int) -> dict:
+    """Issue num_requests uploads with at most concurrency in flight"""
+    slots = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one_request() -> None:
+        async with slots:
+            start = time.perf_counter()
+            await upload(repo, conversations, "bench-user")
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(num_requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "max": latencies[-1] * 1000,
+        "throughput": num_requests / elapsed,
+    }
+
+
+async def main(num_requests: int, levels: list, create_tables: bool):
+    await bootstrap.init_engine(settings())
+    if create_tables:
+        async with bootstrap.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    repo = RDSDocumentRepository()
+    conversations = ConversationService(RDSConversationRepository(), StubLLM(), EventStreamHub(), StubContextBuilder())
+    print(f"Database: {bootstrap.engine.dialect.name}")
+    print(f"{num_requests} uploads per run")
+
+    try:
+        for concurrency in levels:
+            print(f"Concurrency {concurrency}:")
+            for label, upload in (("multi-commit", legacy_upload), ("single transaction", unit_of_work_upload)):
+                stats = await run_level(upload, repo, conversations, num_requests, concurrency)
+                print(
+                    f"  {label:<20} p50 {stats['p50']:7.1f}ms  p95 {stats['p95']:7.1f}ms  "
+                    f"max {stats['max']:7.1f}ms  ({stats['throughput']:,.0f} uploads/s)"
+                )
+    finally:
+        await bootstrap.engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--create-tables", action="store_true", help="Run create_all before benchmarking")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.create_tables))
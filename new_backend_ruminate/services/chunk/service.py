@@ -1,18 +1,20 @@
 # new_backend_ruminate/services/chunk/service.py
 from __future__ import annotations
-from typing import List, Optional, Tuple
+from typing import List, Optional, Tuple, Union
 from uuid import uuid4
 from datetime import datetime
 import asyncio
-import re
+from new_backend_ruminate.utils.html_text import block_plain_text
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from new_backend_ruminate.domain.document.entities.chunk import Chunk, ChunkStatus
-from new_backend_ruminate.domain.document.entities import Block
+from new_backend_ruminate.domain.document.entities import Block, BlockText
 from new_backend_ruminate.domain.document.repositories.document_repository_interface import DocumentRepositoryInterface
 from new_backend_ruminate.domain.ports.llm import LLMService
 from new_backend_ruminate.domain.conversation.entities.message import Message, Role
+from new_backend_ruminate.infrastructure.db.bootstrap import session_scope
+from new_backend_ruminate.config import settings
 
 
 class ChunkService:
@@ -23,10 +25,15 @@ class ChunkService:
     def __init__(
         self,
         repo: DocumentRepositoryInterface,
-        llm: Optional[LLMService] = None
+        llm: Optional[LLMService] = None,
+        max_concurrency: Optional[int] = None
     ) -> None:
         self._repo = repo
         self._llm = llm
+        # Process-wide cap on concurrent summary LLM calls
+        self._summary_semaphore = asyncio.Semaphore(
+            max_concurrency or settings().chunk_summary_concurrency
+        )
     
     async def create_chunks_for_document(
         self,
@@ -101,54 +108,51 @@ class ChunkService:
         # Get all chunks up to the page
         chunks = await self._repo.get_chunks_up_to_page(document_id, up_to_page, session)
         
-        # Identify unprocessed chunks
-        unprocessed = [c for c in chunks if c.status == ChunkStatus.UNPROCESSED]
+        # Identify unprocessed chunks, and processing ones whose claim may be stale
+        candidates = [c for c in chunks if c.status in (ChunkStatus.UNPROCESSED, ChunkStatus.PROCESSING)]
         
-        if unprocessed:
-            # Generate summaries for unprocessed chunks in parallel
-            await self._generate_chunk_summaries_parallel(unprocessed, session)
+        if candidates:
+            # Claim chunks (UNPROCESSED -> PROCESSING) so concurrent requests never
+            # summarise the same chunk twice; chunks claimed elsewhere are skipped
+            # unless their claim has outlived chunk_claim_timeout
+            claimed = await self._repo.claim_chunks_for_processing(
+                [c.id for c in candidates], session, stale_after=settings().chunk_claim_timeout
+            )
+            
+            if claimed:
+                # Generate summaries for claimed chunks in parallel
+                await self._generate_chunk_summaries_parallel(claimed)
             
-            # Refresh chunks to get updated summaries
-            chunks = await self._repo.get_chunks_up_to_page(document_id, up_to_page, session)
+                # Refresh chunks to get updated summaries
+                chunks = await self._repo.get_chunks_up_to_page(document_id, up_to_page, session)
         
         # Return chunks with their summaries
         return [(chunk, chunk.summary or "") for chunk in chunks]
     
-    async def _generate_chunk_summaries_parallel(
-        self,
-        chunks: List[Chunk],
-        session: AsyncSession
-    ) -> None:
-        """Generate summaries for multiple chunks (sequentially to avoid session conflicts)"""
-        # TODO: Optimize with parallel execution using separate sessions
-        for chunk in chunks:
-            await self._generate_chunk_summary(chunk, session)
+    async def _generate_chunk_summaries_parallel(self, chunks: List[Chunk]) -> None:
+        """Generate summaries for multiple chunks concurrently, each in its own session"""
+        async def _bounded(chunk: Chunk) -> None:
+            async with self._summary_semaphore:
+                await self._generate_chunk_summary(chunk)
+        
+        await asyncio.gather(*(_bounded(chunk) for chunk in chunks))
     
-    async def _generate_chunk_summary(
-        self,
-        chunk: Chunk,
-        session: AsyncSession
-    ) -> None:
-        """Generate summary for a single chunk"""
+    async def _generate_chunk_summary(self, chunk: Chunk) -> None:
+        """Generate summary for a single claimed chunk"""
         try:
-            # Mark chunk as processing
-            chunk.set_processing()
-            await self._repo.update_chunk(chunk, session)
-            
-            # Get document info
-            document = await self._repo.get_document(chunk.document_id, session)
-            if not document:
-                raise ValueError(f"Document {chunk.document_id} not found")
-            
-            # Get all blocks for this chunk's pages
-            all_blocks = await self._repo.get_blocks_by_document(chunk.document_id, session)
-            chunk_blocks = [
-                b for b in all_blocks 
-                if b.page_number is not None and chunk.contains_page(b.page_number)
-            ]
-            
-            # Sort blocks by page number
-            chunk_blocks.sort(key=lambda b: (b.page_number or 0, b.id))
+            # Read inputs, then release the connection before the LLM call
+            async with session_scope() as session:
+                document = await self._repo.get_document(chunk.document_id, session)
+                if not document:
+                    raise ValueError(f"Document {chunk.document_id} not found")
+                
+                # Get text of this chunk's pages only, in reading order
+                chunk_blocks = await self._repo.get_text_blocks(
+                    chunk.document_id,
+                    session,
+                    start_page=chunk.start_page,
+                    end_page=chunk.end_page
+                )
             
             # Extract text from blocks
             chunk_text = self._extract_text_from_blocks(chunk_blocks)
@@ -165,26 +169,31 @@ class ChunkService:
             
             # Update chunk with summary
             chunk.set_ready(summary)
-            await self._repo.update_chunk(chunk, session)
+            async with session_scope() as session:
+                await self._repo.update_chunk(chunk, session)
             
         except Exception as e:
             # Mark chunk as errored
             chunk.set_error(str(e))
-            await self._repo.update_chunk(chunk, session)
+            async with session_scope() as session:
+                await self._repo.update_chunk(chunk, session)
             print(f"[ChunkService] Error generating summary for chunk {chunk.id}: {e}")
+        except BaseException:
+            # Cancelled (request detach, shutdown): release the claim so the chunk is picked up again
+            chunk.release()
+            async with session_scope() as session:
+                await self._repo.update_chunk(chunk, session)
+            raise
     
-    def _extract_text_from_blocks(self, blocks: List[Block]) -> str:
+    def _extract_text_from_blocks(self, blocks: List[Union[Block, BlockText]]) -> str:
         """Extract and clean text from blocks"""
         text_parts = []
         
         for block in blocks:
-            if block.html_content:
-                # Strip HTML tags
-                clean_text = re.sub(r'<[^>]+>', ' ', block.html_content)
-                # Clean up whitespace
-                clean_text = ' '.join(clean_text.split())
-                if clean_text.strip():
-                    text_parts.append(clean_text)
+            # Precomputed at ingest; extracted from HTML only for older rows
+            clean_text = block_plain_text(block)
+            if clean_text:
+                text_parts.append(clean_text)
         
         return "\n\n".join(text_parts)
     
@@ -1,24 +1,31 @@
 # new_backend_ruminate/services/conversation/service.py
 from __future__ import annotations
-from typing import List, Tuple, Any
+from typing import List, Optional, Tuple, Any
 from uuid import uuid4
 import json
+import logging
+import time
 
 from fastapi import BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from new_backend_ruminate.domain.conversation.entities.message import Message, Role
+from new_backend_ruminate.domain.conversation.entities.message import Message, MessageStatus, Role
 from new_backend_ruminate.domain.conversation.entities.conversation import Conversation
 from new_backend_ruminate.domain.conversation.repo import (
     ConversationRepository,
 )
 from new_backend_ruminate.infrastructure.sse.hub import EventStreamHub
+from new_backend_ruminate.infrastructure.sse.coalesce import coalesce_stream
 from new_backend_ruminate.domain.ports.llm import LLMService
 from new_backend_ruminate.infrastructure.db.bootstrap import session_scope
+from new_backend_ruminate.config import settings
 from new_backend_ruminate.context.builder import ContextBuilder
 from new_backend_ruminate.context.prompts import agent_system_prompt, default_system_prompts
 from new_backend_ruminate.domain.ports.tool import tool_registry
 from new_backend_ruminate.services.conversation.prompt_approval import prompt_approval_service
+from new_backend_ruminate.infrastructure.tracing.context_trace import context_trace_service, trace_event
+
+logger = logging.getLogger(__name__)
 
 class ConversationService:
     """Pure business logic: no Pydantic, no FastAPI, no DB-bootstrap."""
@@ -38,81 +45,180 @@ class ConversationService:
 
     # ─────────────────────────────── helpers ──────────────────────────────── #
 
+    async def _build_prompt(
+        self,
+        convo: Conversation,
+        thread: List[Message],
+        session: AsyncSession,
+        *,
+        ai_id: str,
+        user_id: str,
+        debug_mode: bool,
+    ) -> List[dict[str, str]]:
+        """Build the LLM prompt, tracing the build in debug mode or when sampled"""
+        traced = context_trace_service.should_trace(debug_mode)
+        with context_trace_service.trace(traced, conversation_id=convo.id, message_id=ai_id, user_id=user_id):
+            prompt = await self._ctx_builder.build(convo, thread, session=session)
+            trace_event(
+                "prompt",
+                messages=prompt,
+                message_count=len(prompt),
+                total_chars=sum(len(msg.get("content", "")) for msg in prompt),
+            )
+        return prompt
+
     async def _publish_stream(self, ai_id: str, prompt: List[dict[str, str]], conv_id: str = None, debug_mode: bool = False) -> None:
-        # Debug: Write exactly what we're sending to the LLM
-        with open("/tmp/llm_prompt_debug.json", "w") as f:
-            json.dump({
-                "ai_msg_id": ai_id,
-                "messages": prompt,
-                "message_count": len(prompt),
-                "total_chars": sum(len(msg.get("content", "")) for msg in prompt)
-            }, f, indent=2)
+        # Slow clients get merged token text instead of losing tokens
+        self._hub.set_overflow_policy(ai_id, "coalesce")
         
-        # If debug mode is enabled, request approval before sending to LLM
-        if debug_mode:
-            try:
-                # Create the approval request and get the ID
-                approval_id = prompt_approval_service.create_approval_request(
-                    prompt=prompt,
-                    conversation_id=conv_id,
-                    message_id=ai_id,
-                    metadata={
-                        "original_message_count": len(prompt),
-                        "total_chars": sum(len(msg.get("content", "")) for msg in prompt)
-                    }
+        cfg = settings()
+        parts: List[str] = []
+        completed = False
+        rejected = False
+        try:
+            # If debug mode is enabled, request approval before sending to LLM
+            if debug_mode:
+                try:
+                    # Create the approval request and get the ID
+                    approval_id = prompt_approval_service.create_approval_request(
+                        prompt=prompt,
+                        conversation_id=conv_id,
+                        message_id=ai_id,
+                        metadata={
+                            "original_message_count": len(prompt),
+                            "total_chars": sum(len(msg.get("content", "")) for msg in prompt)
+                        }
+                    )
+                    
+                    # Notify frontend about pending approval via SSE
+                    await self._hub.publish(ai_id, json.dumps({
+                        "type": "prompt_approval_required",
+                        "approval_id": approval_id,
+                        "conversation_id": conv_id,
+                        "message_id": ai_id
+                    }))
+                    
+                    # Wait for approval
+                    approved_prompt = await prompt_approval_service.wait_for_approval(approval_id)
+                    
+                    # Use the approved (potentially modified) prompt
+                    prompt = approved_prompt
+                    
+                    # Notify that approval was received
+                    await self._hub.publish(ai_id, json.dumps({
+                        "type": "prompt_approved",
+                        "message_id": ai_id
+                    }))
+                    
+                except RuntimeError as e:
+                    # Prompt was rejected
+                    await self._hub.publish(ai_id, json.dumps({
+                        "type": "prompt_rejected", 
+                        "message_id": ai_id,
+                        "reason": str(e)
+                    }))
+                    rejected = True
+                    return
+            
+            unsaved_chars = 0
+            last_checkpoint = time.monotonic()
+            async for chunk in coalesce_stream(self._llm.generate_response_stream(prompt)):
+                # Only add text chunks to the stored message, not JSON events
+                if not chunk.startswith('{"type"'):
+                    parts.append(chunk)
+                    unsaved_chars += len(chunk)
+                # But still publish everything to SSE for real-time UI updates
+                await self._hub.publish(ai_id, chunk)
+
+                # Checkpoint partial content so a crash or reload doesn't lose the answer
+                if unsaved_chars and (
+                    unsaved_chars >= cfg.stream_checkpoint_chars
+                    or time.monotonic() - last_checkpoint >= cfg.stream_checkpoint_interval
+                ):
+                    async with session_scope() as session:
+                        await self._repo.update_message_content(ai_id, "".join(parts), session)
+                    unsaved_chars = 0
+                    last_checkpoint = time.monotonic()
+            
+            # IMPORTANT: Save content to database BEFORE sending completion signal
+            # This ensures content is persisted before frontend refreshes
+            async with session_scope() as session:
+                await self._repo.update_message_content(
+                    ai_id, "".join(parts), session, status=MessageStatus.COMPLETED.value
                 )
-                
-                # Notify frontend about pending approval via SSE
-                await self._hub.publish(ai_id, json.dumps({
-                    "type": "prompt_approval_required",
-                    "approval_id": approval_id,
-                    "conversation_id": conv_id,
-                    "message_id": ai_id
-                }))
-                
-                # Wait for approval
-                approved_prompt = await prompt_approval_service.wait_for_approval(approval_id)
-                
-                # Use the approved (potentially modified) prompt
-                prompt = approved_prompt
-                
-                # Notify that approval was received
-                await self._hub.publish(ai_id, json.dumps({
-                    "type": "prompt_approved",
-                    "message_id": ai_id
-                }))
-                
-            except RuntimeError as e:
-                # Prompt was rejected
-                await self._hub.publish(ai_id, json.dumps({
-                    "type": "prompt_rejected", 
-                    "message_id": ai_id,
-                    "reason": str(e)
-                }))
-                await self._hub.publish(ai_id, "[DONE]")
-                await self._hub.terminate(ai_id)
-                return
-        
-        full = ""
-        async for chunk in self._llm.generate_response_stream(prompt):
-            # Only add text chunks to the stored message, not JSON events
-            if not chunk.startswith('{"type"'):
-                full += chunk
-            # But still publish everything to SSE for real-time UI updates
-            await self._hub.publish(ai_id, chunk)
-        
-        # IMPORTANT: Save content to database BEFORE sending completion signal
-        # This ensures content is persisted before frontend refreshes
-        async with session_scope() as session:
-            await self._repo.update_message_content(ai_id, full, session)
-        
-        # Now send completion signal after content is saved
-        await self._hub.publish(ai_id, "[DONE]")
-        await self._hub.terminate(ai_id)
+            completed = True
+        finally:
+            # Rejected prompt, LLM error or cancelled task: never leave the placeholder streaming
+            try:
+                if not completed:
+                    async with session_scope() as session:
+                        await self._repo.update_message_content(
+                            ai_id, "".join(parts), session, status=MessageStatus.FAILED.value
+                        )
+            finally:
+                # Always end the stream (content is saved by now) so SSE clients don't hang
+                try:
+                    if not completed and not rejected:
+                        await self._hub.publish(ai_id, json.dumps({
+                            "type": "stream_error",
+                            "message_id": ai_id
+                        }))
+                    await self._hub.publish(ai_id, "[DONE]")
+                    await self._hub.terminate(ai_id)
+                except Exception as e:
+                    logger.warning(f"[ConversationService] Failed to close stream {ai_id}: {e}")
 
 
     # ───────────────────────────── public API ─────────────────────────────── #
 
+    def build_conversation(
+        self,
+        *,
+        user_id: str,
+        conv_type: str = "chat",
+        meta: dict[str, Any] | None = None,
+        document_id: str | None = None,
+        source_block_id: str | None = None,
+        selected_text: str | None = None,
+        text_start_offset: int | None = None,
+        text_end_offset: int | None = None,
+    ) -> tuple[Conversation, Message]:
+        """
+        Build a conversation and its root system message without saving them.
+        Ids are assigned up front and the active thread is already set, so
+        both can be persisted together with whatever owns the conversation.
+        """
+        # Create conversation with appropriate fields
+        conv = Conversation(
+            id=str(uuid4()),
+            user_id=user_id,
+            type=conv_type.upper(), 
+            meta_data=meta or {},
+            document_id=document_id,
+            source_block_id=source_block_id,
+            selected_text=selected_text,
+            text_start_offset=text_start_offset,
+            text_end_offset=text_end_offset
+        )
+
+        # Select appropriate system prompt
+        if conv_type == "agent":
+            sys_text = agent_system_prompt(list(tool_registry.values()))
+        else:
+            sys_text = default_system_prompts.get(conv_type, default_system_prompts["chat"])
+
+        root = Message(
+            id=str(uuid4()),
+            conversation_id=conv.id,
+            role=Role.SYSTEM,
+            content=sys_text,
+            version=0,
+            document_id=document_id,  # Fix: Add document_id to system messages
+        )
+        conv.root_message_id = root.id
+        conv.active_thread_ids = [root.id]
+        return conv, root
+
     async def create_conversation(
         self,
         *,
@@ -125,38 +231,20 @@ class ConversationService:
         text_start_offset: int | None = None,
         text_end_offset: int | None = None,
     ) -> tuple[str, str]:
+        conv, root = self.build_conversation(
+            user_id=user_id,
+            conv_type=conv_type,
+            meta=meta,
+            document_id=document_id,
+            source_block_id=source_block_id,
+            selected_text=selected_text,
+            text_start_offset=text_start_offset,
+            text_end_offset=text_end_offset,
+        )
         async with session_scope() as session:
-            # Create conversation with appropriate fields
-            conv = Conversation(
-                user_id=user_id,
-                type=conv_type.upper(), 
-                meta_data=meta or {},
-                document_id=document_id,
-                source_block_id=source_block_id,
-                selected_text=selected_text,
-                text_start_offset=text_start_offset,
-                text_end_offset=text_end_offset
-            )
             await self._repo.create(conv, session)
-
-            # Select appropriate system prompt
-            if conv_type == "agent":
-                sys_text = agent_system_prompt(list(tool_registry.values()))
-            else:
-                sys_text = default_system_prompts.get(conv_type, default_system_prompts["chat"])
-
-            root = Message(
-                conversation_id=conv.id,
-                role=Role.SYSTEM,
-                content=sys_text,
-                version=0,
-                document_id=document_id,  # Fix: Add document_id to system messages
-            )
             await self._repo.add_message(root, session)
 
-            await self._repo.update_active_thread(conv.id, [root.id], session)
-            conv.root_message_id = root.id
-
         return conv.id, root.id
 
 
@@ -206,6 +294,7 @@ class ConversationService:
                 version=0,
                 role=Role.ASSISTANT,
                 content="",
+                status=MessageStatus.STREAMING.value,
                 user_id=user_id,
                 document_id=convo.document_id,  # Fix: Add document_id from conversation
             )
@@ -218,7 +307,9 @@ class ConversationService:
             thread_ids = [m.id for m in thread] + [user.id, ai_id]
             await self._repo.update_active_thread(conv_id, thread_ids, session)
             convo = await self._repo.get(conv_id, session)
-            prompt = await self._ctx_builder.build(convo, thread + [user], session=session)
+            prompt = await self._build_prompt(
+                convo, thread + [user], session, ai_id=ai_id, user_id=user_id, debug_mode=debug_mode
+            )
 
         # -------- 4  background stream --------
         background.add_task(self._publish_stream, ai_id, prompt, conv_id, debug_mode)
@@ -254,6 +345,7 @@ class ConversationService:
                 version=0,
                 role=Role.ASSISTANT,
                 content="",
+                status=MessageStatus.STREAMING.value,
                 user_id=user_id,
             )
             await self._repo.add_message(placeholder, session)
@@ -268,7 +360,9 @@ class ConversationService:
             new_thread = [m.id for m in prior[:cut]] + [sibling_id, ai_id]
             await self._repo.update_active_thread(conv_id, new_thread, session)
             convo = await self._repo.get(conv_id, session)
-            prompt = await self._ctx_builder.build(convo, prior[:cut] + [sibling], session=session)
+            prompt = await self._build_prompt(
+                convo, prior[:cut] + [sibling], session, ai_id=ai_id, user_id=user_id, debug_mode=debug_mode
+            )
 
         # 4 ─ background stream
         background.add_task(self._publish_stream, ai_id, prompt, conv_id, debug_mode)
@@ -290,6 +384,16 @@ class ConversationService:
         
         return await self._repo.message_versions(mid, session)
 
+    async def get_message_for_user(self, mid: str, user_id: str, session: AsyncSession) -> Optional[Message]:
+        """The message, or None if it doesn't exist or its conversation isn't the user's"""
+        message = await self._repo.get_message(mid, session)
+        if not message:
+            return None
+        conv = await self._repo.get(message.conversation_id, session)
+        if not conv or conv.user_id != user_id:
+            return None
+        return message
+
     async def get_conversation(self, cid: str, user_id: str, session: AsyncSession):
         conv = await self._repo.get(cid, session)
         if not conv or conv.user_id != user_id:
@@ -0,0 +1,99 @@
+# new_backend_ruminate/services/document/batch_ingestion.py
+from __future__ import annotations
+import asyncio
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional
+
+from new_backend_ruminate.config import settings
+from new_backend_ruminate.domain.object_storage.storage_interface import ObjectStorageInterface
+from new_backend_ruminate.infrastructure.document_processing.pdf_pool import PdfProcessPool
+
+
+@dataclass
+class ChunkSpec:
+    """One page range of a large PDF and where its part is stored"""
+    index: int
+    start_page: int
+    end_page: int
+    storage_key: str
+
+
+class BatchIngestionEngine:
+    """
+    Splits a large PDF into page-range chunks and uploads them to storage.
+
+    Every range is split by its own task in the PDF process pool (which
+    bounds CPU parallelism), written to a temp file and streamed to storage
+    as soon as it exists, with at most upload_concurrency uploads in flight.
+    No chunk is ever held in memory, and wall time approaches the cost of
+    the largest chunk rather than the sum of all of them.
+    """
+
+    def __init__(
+        self,
+        storage: ObjectStorageInterface,
+        pdf_pool: PdfProcessPool,
+        upload_concurrency: Optional[int] = None,
+    ) -> None:
+        self._storage = storage
+        self._pdf_pool = pdf_pool
+        self._upload_concurrency = upload_concurrency or settings().batch_upload_concurrency
+
+    @staticmethod
+    def plan(total_pages: int, pages_per_chunk: int, key_for: Callable[[int], str]) -> List[ChunkSpec]:
+        return [
+            ChunkSpec(
+                index=index,
+                start_page=start,
+                end_page=min(start + pages_per_chunk, total_pages),
+                storage_key=key_for(index),
+            )
+            for index, start in enumerate(range(0, total_pages, pages_per_chunk))
+        ]
+
+    async def split_and_upload(
+        self,
+        file_content: bytes,
+        chunks: List[ChunkSpec],
+        on_uploaded: Optional[Callable[[ChunkSpec], Awaitable[None]]] = None,
+    ) -> None:
+        """
+        Split and upload every chunk; on_uploaded runs as each one lands.
+        The first failure cancels the remaining chunks and is re-raised.
+        """
+        tmp_dir = tempfile.mkdtemp(prefix="ruminate_batch_")
+        src_path = os.path.join(tmp_dir, "source.pdf")
+        upload_slots = asyncio.Semaphore(self._upload_concurrency)
+
+        async def process(chunk: ChunkSpec) -> None:
+            part_path = os.path.join(tmp_dir, f"chunk-{chunk.index}.pdf")
+            await self._pdf_pool.split_range(src_path, chunk.start_page, chunk.end_page, part_path)
+            try:
+                async with upload_slots:
+                    with open(part_path, "rb") as part:
+                        await self._storage.upload_file(file=part, key=chunk.storage_key, content_type="application/pdf")
+            finally:
+                os.remove(part_path)
+            if on_uploaded is not None:
+                await on_uploaded(chunk)
+
+        try:
+            await asyncio.to_thread(_write_file, src_path, file_content)
+            tasks = [asyncio.create_task(process(chunk)) for chunk in chunks]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _write_file(path: str, content: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(content)
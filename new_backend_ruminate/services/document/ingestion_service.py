@@ -1,8 +1,9 @@
 # new_backend_ruminate/services/document/ingestion_service.py
 from __future__ import annotations
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from uuid import uuid4
 from datetime import datetime
+import asyncio
 import io
 
 from fastapi import BackgroundTasks
@@ -11,7 +12,16 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from new_backend_ruminate.domain.document.entities import Document, DocumentStatus
 from new_backend_ruminate.domain.document.repositories.document_repository_interface import DocumentRepositoryInterface
 from new_backend_ruminate.domain.object_storage.storage_interface import ObjectStorageInterface
+from new_backend_ruminate.config import settings
 from new_backend_ruminate.infrastructure.db.bootstrap import session_scope
+from new_backend_ruminate.infrastructure.document_processing.content_cache import blob_key, sha256_stream
+from new_backend_ruminate.infrastructure.queue.job import JobPriority
+
+if TYPE_CHECKING:
+    from new_backend_ruminate.services.document.service import DocumentService
+
+# Rough size of a PDF page, used to cost a queued job before the PDF is parsed
+_ESTIMATED_BYTES_PER_PAGE = 100 * 1024
 
 
 class IngestionService:
@@ -21,13 +31,15 @@ class IngestionService:
         self,
         repo: DocumentRepositoryInterface,
         storage: ObjectStorageInterface,
-        processing_queue: Optional[object] = None,
+        document_service: Optional[DocumentService] = None,
         conversation_service: Optional[object] = None,
+        content_dedup: Optional[bool] = None,
     ) -> None:
         self._repo = repo
         self._storage = storage
-        self._processing_queue = processing_queue
+        self._document_service = document_service
         self._conversation_service = conversation_service
+        self._content_dedup = settings().content_dedup if content_dedup is None else content_dedup
 
     async def create_document_and_enqueue(
         self,
@@ -36,9 +48,14 @@ class IngestionService:
         filename: str,
         s3_key: Optional[str] = None,
         file_stream: Optional[io.BufferedReader] = None,
+        background: Optional[BackgroundTasks] = None,
     ) -> Document:
-        """Create a document, ensure file in storage, and enqueue processing job."""
-        # Create document row
+        """
+        Create a document, ensure file in storage, and start processing through
+        the document service: queued when a worker consumes the queue, else in
+        background (processing is not started without background tasks).
+        """
+        # Build document row; it is saved once the file is in storage
         document = Document(
             id=str(uuid4()),
             user_id=user_id,
@@ -49,25 +66,19 @@ class IngestionService:
             updated_at=datetime.now(),
         )
 
-        async with session_scope() as session:
-            document = await self._repo.create_document(document, session)
-
-            # Create main conversation for the document (best-effort)
-            if self._conversation_service:
-                try:
-                    main_conversation_id, _ = await self._conversation_service.create_conversation(
-                        user_id=user_id,
-                        conv_type="chat",
-                        document_id=document.id,
-                    )
-                    document.main_conversation_id = main_conversation_id
-                    document = await self._repo.update_document(document, session)
-                except Exception:
-                    print("Error creating main conversation")
-
         # Ensure file is in storage
         if s3_key:
             storage_key = s3_key
+        elif file_stream is not None and self._content_dedup:
+            # Identical PDFs are stored once, under their SHA-256
+            document.content_hash = await asyncio.to_thread(sha256_stream, file_stream)
+            storage_key = blob_key(document.content_hash)
+            if not await self._storage.file_exists(storage_key):
+                await self._storage.upload_file(
+                    file=file_stream,
+                    key=storage_key,
+                    content_type="application/pdf",
+                )
         elif file_stream is not None:
             storage_key = f"documents/{document.id}/{filename}"
             await self._storage.upload_file(
@@ -78,20 +89,48 @@ class IngestionService:
         else:
             raise ValueError("Must provide either s3_key or file_stream")
 
-        # Update document with storage key
+        # Document, storage key, content hash and main conversation in one transaction
+        document.s3_pdf_path = storage_key
+        conversation, root_message = None, None
+        if self._conversation_service:
+            try:
+                conversation, root_message = self._conversation_service.build_conversation(
+                    user_id=user_id,
+                    conv_type="chat",
+                    document_id=document.id,
+                )
+            except Exception:
+                print("Error creating main conversation")
         async with session_scope() as session:
-            document.s3_pdf_path = storage_key
-            document = await self._repo.update_document(document, session)
+            document = await self._repo.create_document_with_conversation(
+                document, conversation, root_message, session
+            )
+
+        # A delete of the last other document with this content may have
+        # counted references before our row committed and removed the blob;
+        # now that the row is visible to it, put the blob back if needed
+        if document.content_hash and file_stream is not None and not await self._storage.file_exists(storage_key):
+            await self._storage.upload_file(
+                file=file_stream,
+                key=storage_key,
+                content_type="application/pdf",
+            )
+
+        if self._document_service is not None and background is not None:
+            # Fresh upload: someone is waiting on the first result
+            await self._document_service.start_processing(
+                background, document.id, storage_key,
+                user_id=user_id,
+                priority=JobPriority.INTERACTIVE,
+                page_count=_estimate_page_count(file_stream) if file_stream is not None else None,
+            )
+
+        return document
 
-        # Enqueue processing job (if configured) or return for fallback processing
-        if self._processing_queue:
-            job = {
-                "type": "process_document",
-                "document_id": document.id,
-                "storage_key": storage_key,
-            }
-            enqueue = getattr(self._processing_queue, "enqueue", None)
-            if enqueue is not None:
-                await enqueue(job)
 
-        return document 
\ No newline at end of file
+def _estimate_page_count(file_stream: io.BufferedReader) -> int:
+    """Page count estimated from the upload's size, without parsing the PDF"""
+    position = file_stream.tell()
+    size = file_stream.seek(0, io.SEEK_END)
+    file_stream.seek(position)
+    return max(1, size // _ESTIMATED_BYTES_PER_PAGE)
@@ -8,21 +8,30 @@ import json
 import io
 import tempfile
 import os
+import shutil
 
 from fastapi import BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from new_backend_ruminate.domain.document.entities import Document, DocumentStatus, Page, Block
+from new_backend_ruminate.domain.conversation.entities.conversation import Conversation
+from new_backend_ruminate.domain.conversation.entities.message import Message
 from new_backend_ruminate.domain.document.repositories.document_repository_interface import DocumentRepositoryInterface
 from new_backend_ruminate.domain.object_storage.storage_interface import ObjectStorageInterface
 from new_backend_ruminate.domain.ports.document_analyzer import DocumentAnalyzer
 from new_backend_ruminate.domain.ports.llm import LLMService
+from new_backend_ruminate.infrastructure.document_processing.content_cache import MarkerResultCache, is_blob_key, sha256_file
 from new_backend_ruminate.infrastructure.document_processing.marker_client import MarkerClient, MarkerResponse
+from new_backend_ruminate.infrastructure.document_processing.pdf_pool import PdfProcessPool, count_pdf_file_pages, validate_pdf_file
+from new_backend_ruminate.infrastructure.document_processing.stages import ProcessingStages
 from new_backend_ruminate.infrastructure.sse.hub import EventStreamHub
+from new_backend_ruminate.infrastructure.queue.job import JobPriority
 from new_backend_ruminate.infrastructure.db.bootstrap import session_scope
+from new_backend_ruminate.config import settings
 from new_backend_ruminate.context.renderers.note_generation import NoteGenerationContext
 from new_backend_ruminate.services.chunk import ChunkService
-from new_backend_ruminate.utils.file_validator import PDFValidator, SecurityScanner
+from new_backend_ruminate.services.document.batch_ingestion import BatchIngestionEngine
+from new_backend_ruminate.utils.html_text import block_plain_text
 
 # Publisher interface adapter type (duck-typed: publish/subscribe)
 class _PublisherAdapter:
@@ -48,6 +57,8 @@ class _PublisherAdapter:
 class DocumentService:
     """Service for handling document operations following the established patterns"""
     
+    PAGES_PER_BATCH_CHUNK = 20  # Large uploads are split into documents of this many pages
+    
     def __init__(
         self,
         repo: DocumentRepositoryInterface,
@@ -61,6 +72,9 @@ class DocumentService:
         chunk_service: Optional[ChunkService] = None,
         processing_queue: Optional[object] = None,
         event_publisher: Optional[object] = None,
+        stages: Optional[ProcessingStages] = None,
+        pdf_pool: Optional[PdfProcessPool] = None,
+        result_cache: Optional[MarkerResultCache] = None,
     ) -> None:
         self._repo = repo
         self._hub = hub
@@ -73,23 +87,84 @@ class DocumentService:
         self._conversation_service = conversation_service
         self._chunk_service = chunk_service
         self._processing_queue = processing_queue
+        self._pdf_pool = pdf_pool or PdfProcessPool()
+        self._stages = stages or ProcessingStages(pdf_pool=self._pdf_pool)
+        self._batch_engine = BatchIngestionEngine(storage, self._pdf_pool)
+        if result_cache is None and settings().content_dedup:
+            result_cache = MarkerResultCache(storage, self._marker_client.options_fingerprint())
+        self._result_cache = result_cache
     
     # ─────────────────────────────── helpers ──────────────────────────────── #
     
-    async def _enqueue_processing_job(self, document_id: str, storage_key: str) -> None:
+    async def _enqueue_processing_job(
+        self,
+        document_id: str,
+        storage_key: str,
+        *,
+        user_id: str,
+        priority: JobPriority = JobPriority.USER,
+        cost: int = 1,
+    ) -> None:
         if not self._processing_queue:
             return
         job = {
             "type": "process_document",
             "document_id": document_id,
             "storage_key": storage_key,
+            "user_id": user_id,
         }
         enqueue = getattr(self._processing_queue, "enqueue", None)
         if enqueue is not None:
-            await enqueue(job)
+            await enqueue(job, priority=priority, cost=cost)
+    
+    async def start_processing(
+        self,
+        background: BackgroundTasks,
+        document_id: str,
+        storage_key: str,
+        *,
+        user_id: str,
+        priority: JobPriority,
+        page_count: Optional[int] = None,
+    ) -> None:
+        """
+        Enqueue for the worker when a worker consumes the queue, else fall back
+        to a background task in this process. Jobs cost their page count.
+        """
+        if self._processing_queue is not None and getattr(self._processing_queue, "worker_backed", False):
+            await self._enqueue_processing_job(
+                document_id, storage_key, user_id=user_id, priority=priority, cost=page_count or 1
+            )
+        else:
+            background.add_task(
+                self._process_document_background,
+                document_id,
+                storage_key
+            )
     
     async def _process_document_background(self, document_id: str, storage_key: str) -> None:
         """Background task to process document with Marker API"""
+        try:
+            await self.process_document(document_id, storage_key)
+        except Exception as e:
+            await self.mark_processing_failed(document_id, str(e))
+    
+    async def process_document(self, document_id: str, storage_key: str) -> None:
+        """
+        Process a document with Marker API. Failures are raised, not recorded,
+        so a queue worker can retry the job and mark the document failed only
+        once it is dead-lettered. A redelivered job re-ingests a document that
+        never completed and returns without touching one that is READY.
+        """
+        async with session_scope() as session:
+            # Claim the document; a READY one was finished by an earlier delivery
+            document = await self._repo.claim_document_for_processing(document_id, session)
+        if not document:
+            return
+        content_hash = document.content_hash
+        
+        marker_response: Optional[MarkerResponse] = None
+        tmp_dir: Optional[str] = None
         try:
             # Emit processing started event
             event_data = json.dumps({
@@ -101,53 +176,68 @@ class DocumentService:
                 f"event: processing_started\ndata: {event_data}\n\n"
             )
             
-            async with session_scope() as session:
-                # Get document and update status
-                document = await self._repo.get_document(document_id, session)
-                if not document:
-                    return
-                
-                document.start_marker_processing()
-                await self._repo.update_document(document, session)
-            
-            # Download file from storage to temp file
-            tmp_dir = tempfile.mkdtemp(prefix="ruminate_pdf_")
-            tmp_path = os.path.join(tmp_dir, storage_key.split('/')[-1] or "document.pdf")
-            await self._storage.download_to_path(storage_key, tmp_path)
+            # A repeat upload hashed at ingestion skips download and Marker entirely
+            marker_response = await self._cached_marker_result(content_hash)
+            if marker_response is None:
+                # Each stage holds only its own concurrency slot (see ProcessingStages)
+                # Download file from storage to temp file
+                tmp_dir = tempfile.mkdtemp(prefix="ruminate_pdf_")
+                tmp_path = os.path.join(tmp_dir, storage_key.split('/')[-1] or "document.pdf")
+                async with self._stages.stage("download"):
+                    await self._storage.download_to_path(storage_key, tmp_path)
 
-            # Deep validation using file handle to limit memory copies
-            with open(tmp_path, 'rb') as f:
-                file_bytes = f.read()  # Single materialization
-            is_valid, error_message = PDFValidator.validate_bytes(file_bytes, filename=os.path.basename(tmp_path))
-            if not is_valid:
-                raise Exception(f"Invalid PDF file: {error_message}")
-            is_safe, security_warning = SecurityScanner.is_pdf_safe(file_bytes)
-            if not is_safe:
-                raise Exception(f"PDF contains potentially dangerous content: {security_warning}")
-            
-            # Process with Marker API
-            marker_response = await self._marker_client.process_document(
-                file_content=file_bytes,
-                filename=os.path.basename(tmp_path)
-            )
+                # Deep validation in the process pool, off the event loop, without reading the whole file
+                validation_error = await self._stages.run_cpu(validate_pdf_file, tmp_path, os.path.basename(tmp_path))
+                if validation_error:
+                    raise Exception(validation_error)
+                
+                # Direct-to-storage uploads are hashed here, once the bytes are local
+                if content_hash is None and self._result_cache is not None:
+                    content_hash = await asyncio.to_thread(sha256_file, tmp_path)
+                    marker_response = await self._cached_marker_result(content_hash)
             
-            if marker_response.status == "error":
-                raise Exception(marker_response.error or "Unknown Marker error")
+            if marker_response is None:
+                # Page count lets the Marker poller schedule around the expected completion time
+                try:
+                    page_count = await self._stages.run_cpu(count_pdf_file_pages, tmp_path)
+                except Exception:
+                    page_count = None
+                
+                # Process with Marker API, streaming the upload from disk
+                async with self._stages.stage("marker"):
+                    with open(tmp_path, 'rb') as f:
+                        marker_response = await self._marker_client.process_document(
+                            file_content=f,
+                            filename=os.path.basename(tmp_path),
+                            page_count=page_count
+                        )
+                
+                if marker_response.status == "error":
+                    raise Exception(marker_response.error or "Unknown Marker error")
+                if content_hash and self._result_cache and marker_response.result_file is not None:
+                    await self._result_cache.put(content_hash, marker_response.result_file)
             
             # Parse and save results
+            async with self._stages.stage("persist"):
+                async with session_scope() as session:
+                    await self._save_marker_results(document_id, marker_response, session)
+            
+            # Generate document summary if analyzer is available
+            print(f"[DocumentService] Analyzer available: {self._analyzer is not None}")
+            if self._analyzer and content_hash and await self._reuse_document_analysis(document_id, content_hash):
+                print(f"[DocumentService] Reused analysis of an identical document for {document_id}")
+            elif self._analyzer:
+                print(f"[DocumentService] Generating document summary for {document_id}")
+                async with self._stages.stage("analyze"):
+                    async with session_scope() as session:
+                        await self._generate_document_summary(document_id, session)
+            else:
+                print(f"[DocumentService] No analyzer available, skipping document summary generation")
+            
+            # Update document status
             async with session_scope() as session:
-                await self._save_marker_results(document_id, marker_response, session)
-                
-                # Generate document summary if analyzer is available
-                print(f"[DocumentService] Analyzer available: {self._analyzer is not None}")
-                if self._analyzer:
-                    print(f"[DocumentService] Generating document summary for {document_id}")
-                    await self._generate_document_summary(document_id, session)
-                else:
-                    print(f"[DocumentService] No analyzer available, skipping document summary generation")
-                
-                # Update document status
                 document = await self._repo.get_document(document_id, session)
+                document.content_hash = content_hash
                 document.set_ready()
                 await self._repo.update_document(document, session)
             
@@ -161,31 +251,70 @@ class DocumentService:
                 f"event: processing_completed\ndata: {event_data}\n\n"
             )
             
-        except Exception as e:
-            # Update document with error
-            async with session_scope() as session:
-                document = await self._repo.get_document(document_id, session)
-                if document:
-                    document.set_error(str(e))
-                    await self._repo.update_document(document, session)
-            
-            # Emit error event
-            event_data = json.dumps({
-                "status": DocumentStatus.ERROR.value,
-                "error": str(e),
-                "document_id": document_id
-            })
-            await self._publisher.publish(
-                f"document_{document_id}",
-                f"event: processing_error\ndata: {event_data}\n\n"
-            )
         finally:
-            try:
-                if 'tmp_path' in locals():
-                    os.remove(tmp_path)
-                    os.rmdir(os.path.dirname(tmp_path))
-            except Exception:
-                pass
+            # Nothing may be open yet if the download, validation or hashing failed
+            if marker_response is not None:
+                marker_response.close()
+            if tmp_dir is not None:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+    
+    async def _cached_marker_result(self, content_hash: Optional[str]) -> Optional[MarkerResponse]:
+        """A completed Marker response for identical content, if one is cached"""
+        if not content_hash or self._result_cache is None:
+            return None
+        payload = await self._result_cache.get(content_hash)
+        if payload is None:
+            return None
+        try:
+            return await self._marker_client.response_from_payload(payload)
+        except Exception as e:
+            payload.close()
+            print(f"[DocumentService] Ignoring unreadable cached Marker result for {content_hash}: {e}")
+            return None
+    
+    async def _reuse_document_analysis(self, document_id: str, content_hash: str) -> bool:
+        """Copy summary and info from an already analysed document with the same content"""
+        async with session_scope() as session:
+            source = await self._repo.get_analyzed_document_by_hash(content_hash, session, exclude_id=document_id)
+            if source is None:
+                return False
+            document = await self._repo.get_document(document_id, session)
+            document.summary = source.summary
+            document.document_info = source.document_info
+            doc_info = json.loads(source.document_info) if source.document_info else {}
+            if doc_info.get("title"):
+                document.title = doc_info["title"]
+            await self._repo.update_document(document, session)
+        
+        event_data = json.dumps({
+            "status": "ANALYSIS_COMPLETE",
+            "document_id": document_id,
+            "message": "Document analysis completed",
+            "extracted_info": doc_info
+        })
+        await self._publisher.publish(
+            f"document_{document_id}",
+            f"event: analysis_completed\ndata: {event_data}\n\n"
+        )
+        return True
+    
+    async def mark_processing_failed(self, document_id: str, error: str) -> None:
+        """Put the document in ERROR state and notify listeners, unless it is already READY"""
+        async with session_scope() as session:
+            document = await self._repo.fail_document_processing(document_id, error, session)
+        if not document:
+            return
+        
+        # Emit error event
+        event_data = json.dumps({
+            "status": DocumentStatus.ERROR.value,
+            "error": error,
+            "document_id": document_id
+        })
+        await self._publisher.publish(
+            f"document_{document_id}",
+            f"event: processing_error\ndata: {event_data}\n\n"
+        )
     
     async def _save_marker_results(
         self, 
@@ -193,15 +322,18 @@ class DocumentService:
         marker_response: MarkerResponse,
         session: AsyncSession
     ) -> None:
-        """Parse and save Marker API results to database"""
-        if not marker_response.pages:
+        """Parse and save Marker API results to database, one page at a time"""
+        total_pages = marker_response.page_count
+        if total_pages is None:
+            total_pages = len(marker_response.pages or [])
+        if not total_pages:
             raise ValueError("No pages returned from Marker API")
         
-        pages_to_create = []
-        blocks_to_create = []
+        # A redelivered job may find rows from a partial earlier attempt; the
+        # document was claimed, so it never completed and nothing references them
+        await self._repo.delete_document_content(document_id, session)
         
         # Create chunks for the document
-        total_pages = len(marker_response.pages)
         chunks = await self._chunk_service.create_chunks_for_document(
             document_id=document_id,
             total_pages=total_pages,
@@ -214,7 +346,12 @@ class DocumentService:
             for page_num in range(chunk.start_page, chunk.end_page):
                 chunk_map[page_num] = chunk.id
         
-        for idx, page_data in enumerate(marker_response.pages):
+        # Pages arrive incrementally; persist them in bounded batches as they are parsed
+        batch_pages = max(1, settings().processing_persist_batch_pages)
+        pending_pages: List[Page] = []
+        pending_blocks: List[Block] = []
+        idx = 0
+        async for page_data in self._marker_client.iter_pages(marker_response):
             # Create page - use 0-based indexing internally
             page = Page(
                 id=str(uuid4()),
@@ -225,12 +362,12 @@ class DocumentService:
                 created_at=datetime.now(),
                 updated_at=datetime.now()
             )
-            pages_to_create.append(page)
             
             # Get chunk_id for this page
             chunk_id = chunk_map.get(idx)
             
             # Create blocks for this page
+            blocks_to_create = []
             for block_data in page_data.get("blocks", []):
                 block = Block.from_marker_block(
                     marker_block=block_data,
@@ -242,11 +379,22 @@ class DocumentService:
                 block.chunk_id = chunk_id
                 blocks_to_create.append(block)
                 page.add_block(block.id)
-        
-        # Save all pages and blocks
-        await self._repo.create_pages(pages_to_create, session)
-        if blocks_to_create:
-            await self._repo.create_blocks(blocks_to_create, session)
+            
+            pending_pages.append(page)
+            pending_blocks.extend(blocks_to_create)
+            if len(pending_pages) >= batch_pages:
+                await self._flush_pages(pending_pages, pending_blocks, session)
+            idx += 1
+        await self._flush_pages(pending_pages, pending_blocks, session)
+    
+    async def _flush_pages(self, pages: List[Page], blocks: List[Block], session: AsyncSession) -> None:
+        """Insert buffered pages and blocks, then clear the buffers"""
+        if pages:
+            await self._repo.bulk_create_pages(pages, session)
+        if blocks:
+            await self._repo.bulk_create_blocks(blocks, session)
+        pages.clear()
+        blocks.clear()
     
     async def _generate_document_summary(
         self, 
@@ -255,9 +403,9 @@ class DocumentService:
     ) -> None:
         """Generate and save document summary and info using the analyzer"""
         try:
-            # Get document and blocks
+            # Get document and block text (the analyzer never needs images/geometry)
             document = await self._repo.get_document(document_id, session)
-            blocks = await self._repo.get_blocks_by_document(document_id, session)
+            blocks = await self._repo.get_text_blocks(document_id, session)
             
             if not blocks:
                 return
@@ -324,48 +472,16 @@ class DocumentService:
                 f"event: analysis_warning\ndata: {event_data}\n\n"
             )
     
-    def _get_pdf_page_count(self, file_content: bytes) -> int:
-        """Get the number of pages in a PDF file"""
+    async def _get_pdf_page_count(self, file_content: bytes) -> int:
+        """Get the number of pages in a PDF file (parsed in the PDF process pool)"""
         try:
-            import PyPDF2
-            reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-            page_count = len(reader.pages)
-            return page_count
+            return await self._pdf_pool.page_count(file_content)
         except Exception as e:
             import traceback
             print(f"[DocumentService] Traceback: {traceback.format_exc()}")
             # Default to assuming it's a large document if we can't read it
             return 50  # Assume large document to be safe
     
-    def _split_pdf_into_chunks(self, file_content: bytes, pages_per_chunk: int = 20) -> List[bytes]:
-        """Split PDF into smaller chunks of specified page count"""
-        try:
-            import PyPDF2
-            reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-            total_pages = len(reader.pages)
-            chunks = []
-            
-            for start_page in range(0, total_pages, pages_per_chunk):
-                end_page = min(start_page + pages_per_chunk, total_pages)
-                
-                # Create a new PDF with the chunk pages
-                writer = PyPDF2.PdfWriter()
-                for page_num in range(start_page, end_page):
-                    writer.add_page(reader.pages[page_num])
-                
-                # Write to bytes
-                chunk_buffer = io.BytesIO()
-                writer.write(chunk_buffer)
-                chunk_buffer.seek(0)
-                chunks.append(chunk_buffer.getvalue())
-            
-            return chunks
-        except Exception as e:
-            import traceback
-            print(f"[DocumentService] Traceback: {traceback.format_exc()}")
-            # If splitting fails, return the original file as a single chunk
-            return [file_content]
-    
     # ───────────────────────────── public API ─────────────────────────────── #
     
     async def upload_document(
@@ -397,16 +513,17 @@ class DocumentService:
                 raise ValueError(f"Failed to download file from S3: {str(e)}")
                 
         # Check PDF page count to determine if we need batch processing
-        page_count = self._get_pdf_page_count(file_content)
+        page_count = await self._get_pdf_page_count(file_content)
         
-        if page_count <= 20:
+        if page_count <= self.PAGES_PER_BATCH_CHUNK:
             # Single document processing (existing flow)
             return await self._upload_single_document(
                 background=background,
                 file_content=file_content,
                 filename=filename,
                 user_id=user_id,
-                s3_key=s3_key
+                s3_key=s3_key,
+                page_count=page_count
             )
         else:
             # Batch processing for large documents
@@ -427,66 +544,43 @@ class DocumentService:
         filename: str,
         user_id: str,
         s3_key: Optional[str] = None,
+        page_count: Optional[int] = None,
     ) -> Document:
         """Upload and process a single document (existing logic)"""
-        # Create document record
+        document_id = str(uuid4())
+        # Reuse an existing S3 key, or the key the upload below will write
+        storage_key = s3_key or f"documents/{document_id}/{filename}"
         document = Document(
-            id=str(uuid4()),
+            id=document_id,
             user_id=user_id,
             title=filename,
             status=DocumentStatus.PENDING,
+            s3_pdf_path=storage_key,
             is_auto_processed=True,  # Single documents auto-process
             created_at=datetime.now(),
             updated_at=datetime.now()
         )
+        conversation, root_message = self._build_main_conversation(document, user_id)
         
+        # Document, storage key and main conversation in one transaction
         async with session_scope() as session:
-            # Save document to database
-            document = await self._repo.create_document(document, session)
-            
-            # Create main conversation for the document
-            if self._conversation_service:
-                try:
-                    print(f"[DocumentService] Creating main conversation for document {document.id}")
-                    main_conversation_id, _ = await self._conversation_service.create_conversation(
-                        user_id=user_id,
-                        conv_type="chat",
-                        document_id=document.id
-                    )
-                    print(f"[DocumentService] Created main conversation {main_conversation_id}")
-                    # Store the main conversation ID in document
-                    document.main_conversation_id = main_conversation_id
-                    print(f"[DocumentService] Set document.main_conversation_id = {main_conversation_id}")
-                    document = await self._repo.update_document(document, session)
-                    print(f"[DocumentService] Updated document, main_conversation_id = {document.main_conversation_id}")
-                except Exception as e:
-                    print(f"[DocumentService] Warning: Failed to create main conversation: {e}")
-                    import traceback
-                    traceback.print_exc()
-                    # Don't fail document creation if conversation creation fails
-            else:
-                print(f"[DocumentService] No conversation service available")
+            document = await self._repo.create_document_with_conversation(
+                document, conversation, root_message, session
+            )
         
         # Upload file to storage or reuse existing S3 key
         try:
             if s3_key:
                 # File already in S3, just use the existing key
-                storage_key = s3_key
                 print(f"[DocumentService] Reusing existing S3 key: {storage_key}")
             else:
                 # Need to upload file to S3
-                storage_key = f"documents/{document.id}/{filename}"
                 await self._storage.upload_file(
                     file=io.BytesIO(file_content),
                     key=storage_key,
                     content_type="application/pdf"
                 )
                 print(f"[DocumentService] Uploaded file to S3: {storage_key}")
-            
-            # Update document with storage key
-            async with session_scope() as session:
-                document.s3_pdf_path = storage_key
-                document = await self._repo.update_document(document, session)
                 
         except Exception as e:
             async with session_scope() as session:
@@ -494,15 +588,11 @@ class DocumentService:
                 await self._repo.update_document(document, session)
             raise
         
-        # Start processing: enqueue if queue is configured, else fallback to background task
-        if self._processing_queue:
-            await self._enqueue_processing_job(document.id, storage_key)
-        else:
-            background.add_task(
-                self._process_document_background,
-                document.id,
-                storage_key
-            )
+        # Start processing: enqueue if a worker consumes the queue, else fallback to background task
+        await self.start_processing(
+            background, document.id, storage_key,
+            user_id=user_id, priority=JobPriority.INTERACTIVE, page_count=page_count
+        )
         
         return document
     
@@ -516,96 +606,91 @@ class DocumentService:
         total_pages: int,
         s3_key: Optional[str] = None,
     ) -> Document:
-        """Upload and create batch documents for large PDFs"""
+        """
+        Create every chunk document in one transaction, then split and upload
+        the chunks concurrently. The first chunk starts processing as soon as
+        its own upload lands.
+        """
         batch_id = str(uuid4())
-        pages_per_chunk = 20
-        total_chunks = (total_pages + pages_per_chunk - 1) // pages_per_chunk
+        chunks = BatchIngestionEngine.plan(
+            total_pages, self.PAGES_PER_BATCH_CHUNK, lambda index: f"documents/{batch_id}/chunk-{index}.pdf"
+        )
+        total_chunks = len(chunks)
+        now = datetime.now()
+        documents = [
+            Document(
+                id=str(uuid4()),
+                user_id=user_id,
+                title=f"{filename} (Part {chunk.index + 1} of {total_chunks})",
+                status=DocumentStatus.PENDING if chunk.index == 0 else DocumentStatus.AWAITING_PROCESSING,
+                s3_pdf_path=chunk.storage_key,
+                batch_id=batch_id,
+                chunk_index=chunk.index,
+                total_chunks=total_chunks,
+                is_auto_processed=chunk.index == 0,  # Only first chunk auto-processes
+                created_at=now,
+                updated_at=now
+            )
+            for chunk in chunks
+        ]
+        first_document = documents[0]
+        created = False
+        first_started = False
         
-        # Split PDF into chunks
-        pdf_chunks = self._split_pdf_into_chunks(file_content, pages_per_chunk)
-        documents = []
+        async def start_first_chunk(chunk) -> None:
+            nonlocal first_started
+            if chunk.index != 0:
+                return
+            await self.start_processing(
+                background, first_document.id, chunk.storage_key,
+                user_id=user_id, priority=JobPriority.INTERACTIVE,
+                page_count=chunk.end_page - chunk.start_page
+            )
+            first_started = True
         
         try:
+            # All chunk rows, storage keys and main conversations in a single transaction
+            entries = [
+                (document, *self._build_main_conversation(document, user_id))
+                for document in documents
+            ]
             async with session_scope() as session:
-                # Create all document records in batch
-                for i, chunk_content in enumerate(pdf_chunks):
-                    chunk_title = f"{filename} (Part {i+1} of {total_chunks})"
-                    is_first_chunk = i == 0
-                    
-                    document = Document(
-                        id=str(uuid4()),
-                        user_id=user_id,
-                        title=chunk_title,
-                        status=DocumentStatus.PENDING if is_first_chunk else DocumentStatus.AWAITING_PROCESSING,
-                        batch_id=batch_id,
-                        chunk_index=i,
-                        total_chunks=total_chunks,
-                        is_auto_processed=is_first_chunk,  # Only first chunk auto-processes
-                        created_at=datetime.now(),
-                        updated_at=datetime.now()
-                    )
-                    
-                    # Save to database
-                    document = await self._repo.create_document(document, session)
-                    
-                    # Create main conversation for each chunk
-                    if self._conversation_service:
-                        try:
-                            main_conversation_id, _ = await self._conversation_service.create_conversation(
-                                user_id=user_id,
-                                conv_type="chat",
-                                document_id=document.id
-                            )
-                            # Store the main conversation ID in document
-                            document.main_conversation_id = main_conversation_id
-                            document = await self._repo.update_document(document, session)
-                        except Exception as e:
-                            print(f"[DocumentService] Warning: Failed to create main conversation: {e}")
-                            # Don't fail document creation if conversation creation fails
-                    
-                    documents.append((document, chunk_content))
-            
-            # Upload all chunks to storage and start processing first chunk
-            first_document = None
-            for idx, (document, chunk_content) in enumerate(documents):
-                storage_key = f"documents/{batch_id}/chunk-{document.chunk_index}.pdf"
-                
-                await self._storage.upload_file(
-                    file=io.BytesIO(chunk_content),
-                    key=storage_key,
-                    content_type="application/pdf"
-                )
-                
-                # Update document with storage key
-                async with session_scope() as session:
-                    document.s3_pdf_path = storage_key
-                    updated_document = await self._repo.update_document(document, session)
-                
-                # Keep reference to first chunk and start processing it
-                if idx == 0:  # First document in the list
-                    first_document = updated_document
-                    if self._processing_queue:
-                        await self._enqueue_processing_job(first_document.id, storage_key)
-                    else:
-                        background.add_task(
-                            self._process_document_background,
-                            first_document.id,
-                            storage_key
-                        )
-            
-            if not first_document:
-                raise ValueError("Failed to create batch documents - no first document found")
+                await self._repo.create_documents_with_conversations(entries, session)
+            created = True
             
+            await self._batch_engine.split_and_upload(file_content, chunks, on_uploaded=start_first_chunk)
             return first_document
             
         except Exception as e:
-            # Clean up on error
-            async with session_scope() as session:
-                for document, _ in documents:
-                    document.set_error(f"Failed to upload batch: {str(e)}")
-                    await self._repo.update_document(document, session)
+            # Clean up on error: only rows that were committed, and not the
+            # first chunk once its processing started (it may already be running)
+            if created:
+                async with session_scope() as session:
+                    for document in documents:
+                        if document is first_document and first_started:
+                            continue
+                        document.set_error(f"Failed to upload batch: {str(e)}")
+                        await self._repo.update_document(document, session)
             raise
     
+    def _build_main_conversation(
+        self, document: Document, user_id: str
+    ) -> Tuple[Optional[Conversation], Optional[Message]]:
+        """Unsaved main conversation and root message for a new document, if possible"""
+        if not self._conversation_service:
+            print(f"[DocumentService] No conversation service available")
+            return None, None
+        try:
+            return self._conversation_service.build_conversation(
+                user_id=user_id,
+                conv_type="chat",
+                document_id=document.id
+            )
+        except Exception as e:
+            print(f"[DocumentService] Warning: Failed to create main conversation: {e}")
+            # Don't fail document creation if conversation creation fails
+            return None, None
+    
     async def get_document(self, document_id: str, user_id: str, session: AsyncSession) -> Optional[Document]:
         """Get document by ID, with user ownership validation"""
         document = await self._repo.get_document(document_id, session)
@@ -763,7 +848,6 @@ class DocumentService:
         - context: The context used to generate the definition
         """
         from new_backend_ruminate.domain.conversation.entities.message import Message, Role
-        import re
         
         # First, gather all data from DB within session scope
         document_title = None
@@ -779,16 +863,16 @@ class DocumentService:
             document_title = document.title
             document_summary = document.summary
             
-            # Get the specific block
-            block = await self._repo.get_block(block_id, session)
+            # Get the specific block (text columns only)
+            block = await self._repo.get_block_text(block_id, session)
             if not block or block.document_id != document_id:
                 raise ValueError("Block not found or does not belong to document")
             
-            # Get surrounding blocks for context (2 blocks before and after)
-            all_blocks = await self._repo.get_blocks_by_document(document_id, session)
+            # Get surrounding blocks for context (2 blocks before and after),
+            # already in reading order and without image payloads
+            sorted_blocks = await self._repo.get_text_blocks(document_id, session)
             
-            # Sort blocks by page number and find the target block index
-            sorted_blocks = sorted(all_blocks, key=lambda b: (b.page_number or 0, b.id))
+            # Find the target block index
             block_index = next((i for i, b in enumerate(sorted_blocks) if b.id == block_id), None)
             
             if block_index is None:
@@ -804,8 +888,8 @@ class DocumentService:
         context_parts = []
         for b in context_blocks:
             if b.html_content:
-                # Strip HTML tags for cleaner context
-                clean_text = re.sub('<.*?>', '', b.html_content)
+                # Precomputed plain text for cleaner context
+                clean_text = block_plain_text(b)
                 if b.id == block_id:
                     context_parts.append(f"[TARGET BLOCK]: {clean_text}")
                 else:
@@ -992,8 +1076,8 @@ DO NOT say things like "in this document" or anything - imagine you're just prov
         from new_backend_ruminate.domain.conversation.entities.message import Message, Role
         import uuid
         
-        # Verify user has access to the block
-        block = await self._repo.get_block(block_id, session)
+        # Verify user has access to the block (images are not needed for notes)
+        block = await self._repo.get_block(block_id, session, include_images=False)
         if not block:
             raise ValueError("Block not found")
             
@@ -1195,32 +1279,29 @@ DO NOT say things like "in this document" or anything - imagine you're just prov
             return False
         
         try:
-            # Delete PDF file from object storage if it exists
+            storage_key = None
             if document.s3_pdf_path:
-                try:
-                    # Handle both old format (full S3 URI) and new format (just the key)
-                    storage_path = document.s3_pdf_path
-                    if storage_path.startswith('s3://'):
-                        # Extract key from full S3 URI: s3://bucket-name/key -> key
-                        storage_key = '/'.join(storage_path.split('/')[3:])
-                    else:
-                        # Already just the key
-                        storage_key = storage_path
-                    
-                    deleted = await self._storage.delete_file(storage_key)
-                    if deleted:
-                        print(f"[DocumentService] Successfully deleted PDF from storage")
-                    else:
-                        print(f"[DocumentService] PDF file not found in storage (may have been already deleted)")
-                except Exception as storage_error:
-                    # Log but don't fail the entire delete operation
-                    print(f"[DocumentService] Warning: Failed to delete PDF from storage: {storage_error}")
+                # Handle both old format (full S3 URI) and new format (just the key)
+                storage_path = document.s3_pdf_path
+                if storage_path.startswith('s3://'):
+                    # Extract key from full S3 URI: s3://bucket-name/key -> key
+                    storage_key = '/'.join(storage_path.split('/')[3:])
+                else:
+                    # Already just the key
+                    storage_key = storage_path
+            
+            # Delete PDF file from object storage if it exists
+            # (content-addressed blobs may back other documents; handled below)
+            if storage_key and not is_blob_key(storage_key):
+                await self._delete_stored_file(storage_key)
             
             # Delete document from database (this will cascade to pages and blocks)
             deleted = await self._repo.delete_document(document_id, session)
             
-            if deleted:
+            if not deleted:
                 print(f"[DocumentService] Document not found in database: {document_id}")
+            elif storage_key and is_blob_key(storage_key):
+                await self._release_content(document.s3_pdf_path, storage_key, document.content_hash, session)
             
             return deleted
             
@@ -1228,6 +1309,27 @@ DO NOT say things like "in this document" or anything - imagine you're just prov
             print(f"[DocumentService] Error deleting document {document_id}: {type(e).__name__}: {str(e)}")
             raise ValueError(f"Failed to delete document: {str(e)}")
     
+    async def _delete_stored_file(self, storage_key: str) -> None:
+        try:
+            if await self._storage.delete_file(storage_key):
+                print(f"[DocumentService] Successfully deleted PDF from storage")
+            else:
+                print(f"[DocumentService] PDF file not found in storage (may have been already deleted)")
+        except Exception as storage_error:
+            # Log but don't fail the entire delete operation
+            print(f"[DocumentService] Warning: Failed to delete PDF from storage: {storage_error}")
+    
+    async def _release_content(
+        self, s3_pdf_path: str, storage_key: str, content_hash: Optional[str], session: AsyncSession
+    ) -> None:
+        """Delete the shared blob and cached Marker result once no document points at the blob"""
+        # Counted by path, not hash: cloned template documents share the blob
+        if await self._repo.count_documents_by_pdf_path(s3_pdf_path, session):
+            return
+        await self._delete_stored_file(storage_key)
+        if content_hash and self._result_cache is not None:
+            await self._result_cache.delete(content_hash)
+    
     async def update_reading_progress(
         self,
         document_id: str,
@@ -1254,7 +1356,15 @@ DO NOT say things like "in this document" or anything - imagine you're just prov
             ValueError: If document not found or user doesn't own it
             PermissionError: If user doesn't have access to the document
         """
-        # Get and validate document
+        # Common case: one conditional UPDATE that checks ownership, the block
+        # and that this position is further than current progress
+        updated_document = await self._repo.advance_reading_progress(
+            document_id, user_id, block_id, position, session
+        )
+        if updated_document:
+            return updated_document
+        
+        # Nothing updated: validate to report why, else progress was already further
         document = await self.get_document(document_id, user_id, session)
         if not document:
             raise ValueError("Document not found")
@@ -1264,18 +1374,7 @@ DO NOT say things like "in this document" or anything - imagine you're just prov
         if not block or block.document_id != document_id:
             raise ValueError("Block not found or does not belong to document")
         
-        # Only update if this position is further than current progress
-        current_position = document.furthest_read_position or -1
-        if position > current_position:
-            # Update reading progress
-            document.update_reading_progress(block_id, position)
-            
-            # Save to database
-            updated_document = await self._repo.update_document(document, session)
-            
-            return updated_document
-        else:
-            return document
+        return document
     
     async def start_chunk_processing(
         self,
@@ -1318,11 +1417,13 @@ DO NOT say things like "in this document" or anything - imagine you're just prov
             document.updated_at = datetime.now()
             await self._repo.update_document(document, session)
             
-            # Start background processing
-            background.add_task(
-                self._process_document_background,
-                document.id,
-                document.s3_pdf_path
+            # Start processing: enqueue if a worker consumes the queue, else fallback to background task.
+            # The user asked for this chunk, so it goes in the user lane, costed as a full chunk.
+            await self.start_processing(
+                background, document.id, document.s3_pdf_path,
+                user_id=user_id,
+                priority=JobPriority.USER,
+                page_count=self.PAGES_PER_BATCH_CHUNK if document.batch_id is not None else None
             )
             
             return document
@@ -23,8 +23,10 @@ async def test_marker():
     try:
         response = await client.process_document(content, "test_sup.pdf")
         
-        if response.pages:
-            for i, page in enumerate(response.pages):
+        pages = [page async for page in client.iter_pages(response)]
+        response.close()
+        if pages:
+            for i, page in enumerate(pages):
                 blocks = page.get('blocks', [])
                 
                 for j, block in enumerate(blocks):
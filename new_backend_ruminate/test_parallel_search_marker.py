@@ -175,15 +175,17 @@ If information is not available, use null."""
             print(f"❌ Marker API error: {marker_response.error}")
             return {"error": marker_response.error}
         
-        if not marker_response.pages:
+        pages = [page async for page in self.marker_client.iter_pages(marker_response)]
+        marker_response.close()
+        if not pages:
             print("❌ No pages returned from Marker")
             return {"error": "No pages in Marker output"}
         
-        print(f"✅ Marker processed {len(marker_response.pages)} pages")
+        print(f"✅ Marker processed {len(pages)} pages")
         
         # Step 2: Extract text from Marker output
         print("\n2️⃣  Extracting text from Marker output...")
-        text = self.extract_text_from_marker_output(marker_response.pages)
+        text = self.extract_text_from_marker_output(pages)
         print(f"✅ Extracted {len(text)} characters of text")
         
         # Step 3: Generate search queries
@@ -222,7 +224,7 @@ If information is not available, use null."""
         return {
             "pdf_path": pdf_path,
             "metadata": metadata,
-            "marker_pages": len(marker_response.pages),
+            "marker_pages": len(pages),
             "text_extracted": len(text),
             "search_results_count": len(all_results)
         }
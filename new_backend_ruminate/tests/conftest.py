@@ -1,7 +1,10 @@
 # tests/conftest.py
+import io
 import os
 import tempfile
+import pytest
 import pytest_asyncio
+import PyPDF2
 from sqlalchemy import text
 
 from new_backend_ruminate.infrastructure.db import bootstrap
@@ -55,3 +58,18 @@ async def db_session():
     """
     async with bootstrap.session_scope() as session:
         yield session
+
+
+@pytest.fixture
+def make_pdf():
+    """
+    Builds an in-memory PDF of blank pages: make_pdf(pages) -> bytes.
+    """
+    def _make_pdf(pages: int) -> bytes:
+        writer = PyPDF2.PdfWriter()
+        for _ in range(pages):
+            writer.add_blank_page(width=200, height=200)
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        return buffer.getvalue()
+    return _make_pdf
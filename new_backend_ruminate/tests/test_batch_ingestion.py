@@ -0,0 +1,217 @@
+"""Tests for splitting and uploading large PDFs in chunks"""
+import asyncio
+import io
+import pytest
+import PyPDF2
+from fastapi import BackgroundTasks
+from sqlalchemy import event
+
+from new_backend_ruminate.domain.conversation.entities.conversation import Conversation
+from new_backend_ruminate.domain.conversation.entities.message import Message, Role
+from new_backend_ruminate.domain.document.entities import Document, DocumentStatus
+from new_backend_ruminate.infrastructure.conversation.rds_conversation_repository import RDSConversationRepository
+from new_backend_ruminate.infrastructure.document.rds_document_repository import RDSDocumentRepository
+from new_backend_ruminate.infrastructure.sse.hub import EventStreamHub
+from new_backend_ruminate.infrastructure.document_processing.pdf_pool import PdfProcessPool
+from new_backend_ruminate.infrastructure.queue.inproc_queue import InProcessProcessingQueue
+from new_backend_ruminate.infrastructure.queue.job import JobPriority
+from new_backend_ruminate.services.conversation.service import ConversationService
+from new_backend_ruminate.services.document.batch_ingestion import BatchIngestionEngine
+from new_backend_ruminate.services.document.ingestion_service import IngestionService
+from new_backend_ruminate.services.document.service import DocumentService
+from new_backend_ruminate.tests.stubs import StubLLM, StubContextBuilder
+
+
+class _SlowStorage:
+    """Records uploads and how many ran at once"""
+
+    def __init__(self):
+        self.objects = {}
+        self.active = 0
+        self.peak = 0
+
+    async def upload_file(self, file, key, content_type=None):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.05)
+            self.objects[key] = file.read()
+        finally:
+            self.active -= 1
+        return key
+
+
+@pytest.mark.asyncio
+class TestBatchIngestion:
+    """Test BatchIngestionEngine and batch document rows"""
+
+    async def test_chunks_are_split_and_uploaded_concurrently(self, make_pdf):
+        storage = _SlowStorage()
+        pool = PdfProcessPool(max_workers=2, timeout=30)
+        engine = BatchIngestionEngine(storage, pool, upload_concurrency=2)
+        chunks = engine.plan(45, 20, lambda index: f"batch/chunk-{index}.pdf")
+        landed = []
+
+        async def on_uploaded(chunk):
+            landed.append(chunk.index)
+
+        try:
+            await engine.split_and_upload(make_pdf(45), chunks, on_uploaded=on_uploaded)
+        finally:
+            pool.shutdown()
+
+        assert [(c.start_page, c.end_page) for c in chunks] == [(0, 20), (20, 40), (40, 45)]
+        assert sorted(landed) == [0, 1, 2]
+        page_counts = [len(PyPDF2.PdfReader(io.BytesIO(storage.objects[c.storage_key])).pages) for c in chunks]
+        assert page_counts == [20, 20, 5]
+        assert storage.peak == 2
+
+    async def test_documents_and_main_conversations_in_one_flush(self, db_session):
+        repo = RDSDocumentRepository()
+        conversations = ConversationService(RDSConversationRepository(), StubLLM(), EventStreamHub(), StubContextBuilder())
+        documents = [
+            Document(user_id="uow-user", title=f"Paper {i}", s3_pdf_path=f"documents/uow/{i}.pdf")
+            for i in range(2)
+        ]
+        entries = [
+            (document, *conversations.build_conversation(user_id="uow-user", document_id=document.id))
+            for document in documents
+        ]
+        flushes = []
+        event.listen(db_session.sync_session, "after_flush", lambda *args: flushes.append(1))
+
+        assert await repo.create_documents_with_conversations(entries, db_session) == 2
+        assert len(flushes) == 1
+
+        for document, conversation, root in entries:
+            stored = await repo.get_document(document.id, db_session)
+            assert stored.s3_pdf_path == document.s3_pdf_path
+            assert stored.main_conversation_id == document.main_conversation_id == conversation.id
+            stored_conversation = await db_session.get(Conversation, conversation.id)
+            assert stored_conversation.document_id == document.id
+            assert stored_conversation.root_message_id == root.id
+            assert stored_conversation.active_thread_ids == [root.id]
+            stored_root = await db_session.get(Message, root.id)
+            assert stored_root.role == Role.SYSTEM and stored_root.document_id == document.id
+
+    async def test_start_processing_uses_user_lane_only_with_a_worker(self, db_session):
+        repo = RDSDocumentRepository()
+        queue = InProcessProcessingQueue()
+        service = DocumentService(repo=repo, hub=EventStreamHub(), storage=_SlowStorage(), processing_queue=queue)
+        documents = [
+            Document(user_id="lane-user", title=f"Book (Part 2 of 3) {i}", batch_id="batch-lane", chunk_index=1,
+                     total_chunks=3, s3_pdf_path=f"documents/batch-lane/chunk-{i}.pdf",
+                     status=DocumentStatus.AWAITING_PROCESSING)
+            for i in range(2)
+        ]
+        await repo.create_documents_with_conversations([(d, None, None) for d in documents], db_session)
+
+        try:
+            # Nothing consumes an in-process queue in the API: process in the background
+            background = BackgroundTasks()
+            await service.start_chunk_processing(documents[0].id, "lane-user", background, db_session)
+            assert len(background.tasks) == 1
+            assert await queue.reserve(timeout_seconds=0) is None
+
+            queue.worker_backed = True
+            background = BackgroundTasks()
+            await service.start_chunk_processing(documents[1].id, "lane-user", background, db_session)
+            job = await queue.reserve(timeout_seconds=0)
+        finally:
+            service._pdf_pool.shutdown()
+
+        assert not background.tasks
+        assert job.payload["document_id"] == documents[1].id
+        assert job.priority == JobPriority.USER.value
+        assert job.cost == DocumentService.PAGES_PER_BATCH_CHUNK
+
+    async def test_ingestion_upload_costs_estimated_pages_only_with_a_worker(self, make_pdf):
+        repo = RDSDocumentRepository()
+        queue = InProcessProcessingQueue()
+        storage = _SlowStorage()
+        service = DocumentService(repo=repo, hub=EventStreamHub(), storage=storage, processing_queue=queue)
+        ingestion = IngestionService(repo=repo, storage=storage, document_service=service, content_dedup=False)
+        pdf = make_pdf(3) + b"\0" * (5 * 100 * 1024)
+
+        try:
+            background = BackgroundTasks()
+            await ingestion.create_document_and_enqueue(
+                user_id="cost-user", filename="paper.pdf", file_stream=io.BytesIO(pdf), background=background
+            )
+            assert len(background.tasks) == 1
+            assert await queue.reserve(timeout_seconds=0) is None
+
+            queue.worker_backed = True
+            background = BackgroundTasks()
+            document = await ingestion.create_document_and_enqueue(
+                user_id="cost-user", filename="paper.pdf", file_stream=io.BytesIO(pdf), background=background
+            )
+            job = await queue.reserve(timeout_seconds=0)
+        finally:
+            service._pdf_pool.shutdown()
+
+        assert not background.tasks
+        assert job.payload["document_id"] == document.id
+        assert job.priority == JobPriority.INTERACTIVE.value
+        assert job.cost == 5
+
+    async def test_failed_create_raises_original_error(self, make_pdf, monkeypatch):
+        repo = RDSDocumentRepository()
+        service = DocumentService(repo=repo, hub=EventStreamHub(), storage=_SlowStorage())
+
+        async def fail(entries, session):
+            raise RuntimeError("database unavailable")
+
+        monkeypatch.setattr(repo, "create_documents_with_conversations", fail)
+        try:
+            with pytest.raises(RuntimeError, match="database unavailable"):
+                await service._upload_batch_document(
+                    background=BackgroundTasks(), file_content=make_pdf(45),
+                    filename="book.pdf", user_id="fail-user", total_pages=45,
+                )
+        finally:
+            service._pdf_pool.shutdown()
+
+    async def test_failed_upload_leaves_started_first_chunk_alone(self, make_pdf, db_session):
+        class _FailingStorage(_SlowStorage):
+            async def upload_file(self, file, key, content_type=None):
+                if key.endswith("chunk-1.pdf"):
+                    await asyncio.sleep(0.2)                # after chunk 0 has landed
+                    raise IOError("storage unavailable")
+                return await super().upload_file(file, key, content_type)
+
+        repo = RDSDocumentRepository()
+        service = DocumentService(repo=repo, hub=EventStreamHub(), storage=_FailingStorage())
+        background = BackgroundTasks()
+        try:
+            with pytest.raises(IOError):
+                await service._upload_batch_document(
+                    background=background, file_content=make_pdf(45),
+                    filename="book.pdf", user_id="partial-user", total_pages=45,
+                )
+        finally:
+            service._pdf_pool.shutdown()
+
+        documents = sorted(await repo.get_documents_by_user("partial-user", db_session), key=lambda d: d.chunk_index)
+        assert len(background.tasks) == 1
+        assert [d.status for d in documents] == [DocumentStatus.PENDING, DocumentStatus.ERROR, DocumentStatus.ERROR]
+
+    async def test_failed_first_chunk_start_marks_it_failed(self, make_pdf, db_session, monkeypatch):
+        repo = RDSDocumentRepository()
+        service = DocumentService(repo=repo, hub=EventStreamHub(), storage=_SlowStorage())
+
+        async def fail(*args, **kwargs):
+            raise RuntimeError("queue unavailable")
+
+        monkeypatch.setattr(service, "start_processing", fail)
+        try:
+            with pytest.raises(RuntimeError, match="queue unavailable"):
+                await service._upload_batch_document(
+                    background=BackgroundTasks(), file_content=make_pdf(45),
+                    filename="book.pdf", user_id="start-fail-user", total_pages=45,
+                )
+        finally:
+            service._pdf_pool.shutdown()
+
+        documents = await repo.get_documents_by_user("start-fail-user", db_session)
+        assert [d.status for d in documents] == [DocumentStatus.ERROR] * 3
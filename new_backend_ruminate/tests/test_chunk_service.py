@@ -3,6 +3,7 @@ import pytest
 from datetime import datetime
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
 from uuid import uuid4
+import asyncio
 
 from new_backend_ruminate.services.chunk import ChunkService
 from new_backend_ruminate.domain.document.entities.chunk import Chunk, ChunkStatus
@@ -392,7 +393,156 @@ class TestChunkService:
         assert updated_chunk.status == ChunkStatus.ERROR
         assert "LLM API error" in updated_chunk.processing_error
         assert updated_chunk.summary is None or updated_chunk.summary == ""
-    
+
+    async def test_parallel_summaries_respect_concurrency_limit(self, db_session):
+        """Test that chunk summaries run concurrently up to the configured limit"""
+        repo = RDSDocumentRepository()
+
+        in_flight = 0
+        peak = 0
+
+        async def slow_summary(messages, model=None):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.05)
+            in_flight -= 1
+            return "Concurrent summary"
+
+        mock_llm = AsyncMock()
+        mock_llm.generate_response = AsyncMock(side_effect=slow_summary)
+
+        chunk_service = ChunkService(repo=repo, llm=mock_llm, max_concurrency=2)
+
+        doc = Document(
+            id="test-doc-parallel",
+            user_id="user-123",
+            status=DocumentStatus.READY,
+            title="Long.pdf",
+            created_at=datetime.now(),
+            updated_at=datetime.now()
+        )
+        await repo.create_document(doc, db_session)
+
+        await chunk_service.create_chunks_for_document(
+            document_id="test-doc-parallel",
+            total_pages=100,  # 5 chunks
+            session=db_session
+        )
+
+        chunk_summaries = await chunk_service.get_or_generate_chunk_summaries(
+            document_id="test-doc-parallel",
+            up_to_page=99,
+            session=db_session
+        )
+
+        assert len(chunk_summaries) == 5
+        assert all(summary == "Concurrent summary" for _, summary in chunk_summaries)
+        assert mock_llm.generate_response.call_count == 5
+        assert peak == 2
+
+    async def test_claim_chunks_for_processing_is_exclusive(self, db_session):
+        """Test that a chunk can only be claimed once"""
+        repo = RDSDocumentRepository()
+        chunk_service = ChunkService(repo=repo, llm=None)
+
+        doc = Document(
+            id="test-doc-claim",
+            user_id="user-123",
+            status=DocumentStatus.READY,
+            title="Claim.pdf",
+            created_at=datetime.now(),
+            updated_at=datetime.now()
+        )
+        await repo.create_document(doc, db_session)
+
+        chunks = await chunk_service.create_chunks_for_document(
+            document_id="test-doc-claim",
+            total_pages=40,
+            session=db_session
+        )
+        chunk_ids = [c.id for c in chunks]
+
+        first = await repo.claim_chunks_for_processing(chunk_ids, db_session)
+        second = await repo.claim_chunks_for_processing(chunk_ids, db_session)
+
+        assert [c.id for c in first] == chunk_ids
+        assert all(c.status == ChunkStatus.PROCESSING for c in first)
+        assert second == []
+
+    async def test_stale_processing_claim_is_reclaimed(self, db_session):
+        """Test that a PROCESSING chunk is reclaimed once its claim outlives the timeout"""
+        repo = RDSDocumentRepository()
+        chunk_service = ChunkService(repo=repo, llm=None)
+
+        doc = Document(
+            id="test-doc-stale-claim",
+            user_id="user-123",
+            status=DocumentStatus.READY,
+            title="Stale.pdf",
+            created_at=datetime.now(),
+            updated_at=datetime.now()
+        )
+        await repo.create_document(doc, db_session)
+
+        chunks = await chunk_service.create_chunks_for_document(
+            document_id="test-doc-stale-claim",
+            total_pages=20,
+            session=db_session
+        )
+        chunk_ids = [c.id for c in chunks]
+
+        await repo.claim_chunks_for_processing(chunk_ids, db_session)
+        fresh = await repo.claim_chunks_for_processing(chunk_ids, db_session, stale_after=300)
+        stale = await repo.claim_chunks_for_processing(chunk_ids, db_session, stale_after=0)
+
+        assert fresh == []
+        assert [c.id for c in stale] == chunk_ids
+
+    async def test_cancelled_summary_releases_claim(self, db_session):
+        """Test that a cancelled summary puts its chunk back to UNPROCESSED"""
+        repo = RDSDocumentRepository()
+
+        mock_llm = AsyncMock()
+        mock_llm.generate_response = AsyncMock(side_effect=asyncio.CancelledError())
+
+        chunk_service = ChunkService(repo=repo, llm=mock_llm)
+
+        doc = Document(
+            id="test-doc-cancel",
+            user_id="user-123",
+            status=DocumentStatus.READY,
+            title="Cancel.pdf",
+            created_at=datetime.now(),
+            updated_at=datetime.now()
+        )
+        await repo.create_document(doc, db_session)
+
+        chunks = await chunk_service.create_chunks_for_document(
+            document_id="test-doc-cancel",
+            total_pages=20,
+            session=db_session
+        )
+        await repo.create_blocks([
+            Block(
+                id=f"block-cancel-{uuid4()}",
+                document_id="test-doc-cancel",
+                page_number=3,
+                block_type=BlockType.TEXT,
+                html_content="<p>Content</p>",
+                created_at=datetime.now(),
+                updated_at=datetime.now()
+            )
+        ], db_session)
+
+        claimed = await repo.claim_chunks_for_processing([chunks[0].id], db_session)
+        with pytest.raises(asyncio.CancelledError):
+            await chunk_service._generate_chunk_summary(claimed[0])
+
+        chunk = await repo.get_chunk(chunks[0].id, db_session)
+        assert chunk.status == ChunkStatus.UNPROCESSED
+        assert chunk.summary is None
+
     async def test_extract_text_from_blocks(self):
         """Test text extraction from HTML blocks"""
         chunk_service = ChunkService(repo=Mock(), llm=None)
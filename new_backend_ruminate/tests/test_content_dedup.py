@@ -0,0 +1,295 @@
+"""Tests for content-hash deduplication of uploads and Marker results"""
+import io
+import json
+import tempfile
+from typing import BinaryIO, Optional
+
+import pytest
+
+from new_backend_ruminate.domain.document.entities import Document
+from new_backend_ruminate.domain.object_storage.storage_interface import ObjectStorageInterface
+from new_backend_ruminate.infrastructure.db.bootstrap import session_scope
+from new_backend_ruminate.infrastructure.document.rds_document_repository import RDSDocumentRepository
+from new_backend_ruminate.infrastructure.document_processing.content_cache import blob_key, sha256_stream
+from new_backend_ruminate.infrastructure.document_processing.marker_client import MarkerClient, MarkerResponse
+from new_backend_ruminate.infrastructure.sse.hub import EventStreamHub
+from new_backend_ruminate.services.chunk import ChunkService
+from new_backend_ruminate.services.document.ingestion_service import IngestionService
+from new_backend_ruminate.services.document.service import DocumentService
+
+
+class _MemoryStorage(ObjectStorageInterface):
+    def __init__(self):
+        self.objects = {}
+        self.uploads = []
+        self.downloads = []
+
+    async def upload_file(self, file: BinaryIO, key: str, content_type: Optional[str] = None) -> str:
+        file.seek(0)
+        self.objects[key] = file.read()
+        self.uploads.append(key)
+        return key
+
+    async def download_file(self, key: str) -> bytes:
+        if key not in self.objects:
+            raise FileNotFoundError(key)
+        return self.objects[key]
+
+    async def download_to_path(self, key: str, dest_path: str) -> None:
+        content = await self.download_file(key)
+        self.downloads.append(key)
+        with open(dest_path, "wb") as f:
+            f.write(content)
+
+    async def delete_file(self, key: str) -> bool:
+        return self.objects.pop(key, None) is not None
+
+    async def file_exists(self, key: str) -> bool:
+        return key in self.objects
+
+    async def get_presigned_url(self, key: str, expiration: int = 3600) -> str:
+        return key
+
+    async def generate_presigned_post(self, key: str, content_type: Optional[str] = None, expires_in: int = 3600) -> dict:
+        return {"url": key, "fields": {}}
+
+
+class _CountingMarker(MarkerClient):
+    """Returns a fixed two-page payload and counts submissions"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    async def process_document(self, file_content, filename, page_count=None) -> MarkerResponse:
+        self.calls += 1
+        pages = [
+            {"block_type": "Page", "html": "", "children": [{"block_type": "Text", "html": f"<p>page {i}</p>"}]}
+            for i in range(2)
+        ]
+        spool = tempfile.SpooledTemporaryFile()
+        spool.write(json.dumps({"status": "complete", "success": True, "json": {"children": pages}}).encode())
+        return await self.response_from_payload(spool)
+
+
+@pytest.mark.asyncio
+class TestContentDedup:
+    """Test content-addressed uploads and the Marker result cache"""
+
+    async def test_repeat_upload_reuses_blob_and_marker_result(self, make_pdf):
+        storage = _MemoryStorage()
+        repo = RDSDocumentRepository()
+        marker = _CountingMarker()
+        ingestion = IngestionService(repo=repo, storage=storage, content_dedup=True)
+        service = DocumentService(
+            repo=repo,
+            hub=EventStreamHub(),
+            storage=storage,
+            marker_client=marker,
+            chunk_service=ChunkService(repo),
+        )
+        pdf = make_pdf(50)
+        content_hash = sha256_stream(io.BytesIO(pdf))
+
+        documents = []
+        try:
+            for _ in range(2):
+                document = await ingestion.create_document_and_enqueue(
+                    user_id="dedup-user", filename="paper.pdf", file_stream=io.BytesIO(pdf)
+                )
+                await service._process_document_background(document.id, document.s3_pdf_path)
+                documents.append(document)
+        finally:
+            service._pdf_pool.shutdown()
+
+        # Stored once under its hash, parsed by Marker once
+        assert [d.s3_pdf_path for d in documents] == [blob_key(content_hash)] * 2
+        assert storage.uploads.count(blob_key(content_hash)) == 1
+        assert marker.calls == 1
+        # The repeat upload never downloaded the PDF
+        assert storage.downloads.count(blob_key(content_hash)) == 1
+
+        async with session_scope() as session:
+            for document in documents:
+                stored = await repo.get_document(document.id, session)
+                pages = await repo.get_pages_by_document(document.id, session)
+                assert stored.status.value == "READY" and stored.content_hash == content_hash
+                assert len(pages) == 2
+
+    async def test_failed_download_marks_document_failed(self, make_pdf):
+        storage = _MemoryStorage()
+        repo = RDSDocumentRepository()
+        service = DocumentService(
+            repo=repo,
+            hub=EventStreamHub(),
+            storage=storage,
+            marker_client=_CountingMarker(),
+            chunk_service=ChunkService(repo),
+        )
+        ingestion = IngestionService(repo=repo, storage=storage, content_dedup=False)
+        document = await ingestion.create_document_and_enqueue(
+            user_id="dedup-user", filename="paper.pdf", file_stream=io.BytesIO(make_pdf(20))
+        )
+        storage.objects.clear()
+
+        try:
+            await service._process_document_background(document.id, document.s3_pdf_path)
+        finally:
+            service._pdf_pool.shutdown()
+
+        async with session_scope() as session:
+            stored = await repo.get_document(document.id, session)
+        assert stored.status.value == "ERROR"
+
+    async def test_last_delete_removes_blob_and_marker_result(self, make_pdf):
+        storage = _MemoryStorage()
+        repo = RDSDocumentRepository()
+        ingestion = IngestionService(repo=repo, storage=storage, content_dedup=True)
+        service = DocumentService(
+            repo=repo,
+            hub=EventStreamHub(),
+            storage=storage,
+            marker_client=_CountingMarker(),
+            chunk_service=ChunkService(repo),
+        )
+        pdf = make_pdf(20)
+        content_hash = sha256_stream(io.BytesIO(pdf))
+        cache_key = service._result_cache.key(content_hash)
+
+        documents = []
+        try:
+            for _ in range(2):
+                document = await ingestion.create_document_and_enqueue(
+                    user_id="delete-user", filename="paper.pdf", file_stream=io.BytesIO(pdf)
+                )
+                await service._process_document_background(document.id, document.s3_pdf_path)
+                documents.append(document)
+        finally:
+            service._pdf_pool.shutdown()
+
+        async with session_scope() as session:
+            assert await service.delete_document(documents[0].id, "delete-user", session)
+        # Still referenced by the second upload
+        assert blob_key(content_hash) in storage.objects and cache_key in storage.objects
+
+        async with session_scope() as session:
+            assert await service.delete_document(documents[1].id, "delete-user", session)
+        assert blob_key(content_hash) not in storage.objects
+        assert cache_key not in storage.objects
+
+    async def test_cloned_document_keeps_blob_alive(self, make_pdf):
+        """A clone shares the blob path; deleting the original must not remove the blob"""
+        storage = _MemoryStorage()
+        repo = RDSDocumentRepository()
+        ingestion = IngestionService(repo=repo, storage=storage, content_dedup=True)
+        service = DocumentService(
+            repo=repo,
+            hub=EventStreamHub(),
+            storage=storage,
+            marker_client=_CountingMarker(),
+            chunk_service=ChunkService(repo),
+        )
+        original = await ingestion.create_document_and_enqueue(
+            user_id="clone-user", filename="paper.pdf", file_stream=io.BytesIO(make_pdf(5))
+        )
+        # As cloned by a database function that predates content_hash
+        clone = Document(user_id="clone-user", title="paper.pdf", s3_pdf_path=original.s3_pdf_path)
+        async with session_scope() as session:
+            await repo.create_document(clone, session)
+            assert await service.delete_document(original.id, "clone-user", session)
+        assert original.s3_pdf_path in storage.objects
+
+        async with session_scope() as session:
+            assert await service.delete_document(clone.id, "clone-user", session)
+        assert original.s3_pdf_path not in storage.objects
+
+    async def test_upload_restores_blob_deleted_concurrently(self, make_pdf):
+        """A delete that counted references before the new row committed may remove the blob"""
+        pdf = make_pdf(5)
+        key = blob_key(sha256_stream(io.BytesIO(pdf)))
+
+        class _RacingStorage(_MemoryStorage):
+            async def file_exists(self, key: str) -> bool:
+                exists = key in self.objects
+                self.objects.pop(key, None)              # the other document's delete lands now
+                return exists
+
+        storage = _RacingStorage()
+        storage.objects[key] = pdf
+        ingestion = IngestionService(repo=RDSDocumentRepository(), storage=storage, content_dedup=True)
+
+        await ingestion.create_document_and_enqueue(user_id="race-user", filename="paper.pdf", file_stream=io.BytesIO(pdf))
+        assert storage.uploads == [key]
+
+    async def test_redelivered_job_reingests_from_scratch(self, make_pdf):
+        storage = _MemoryStorage()
+        repo = RDSDocumentRepository()
+        ingestion = IngestionService(repo=repo, storage=storage, content_dedup=False)
+        service = DocumentService(
+            repo=repo,
+            hub=EventStreamHub(),
+            storage=storage,
+            marker_client=_CountingMarker(),
+            chunk_service=ChunkService(repo),
+        )
+        document = await ingestion.create_document_and_enqueue(
+            user_id="retry-user", filename="paper.pdf", file_stream=io.BytesIO(make_pdf(20))
+        )
+
+        try:
+            await service.process_document(document.id, document.s3_pdf_path)
+            # An attempt that died mid-way leaves rows behind and the document unfinished
+            async with session_scope() as session:
+                stored = await repo.get_document(document.id, session)
+                stored.start_marker_processing()
+                await repo.update_document(stored, session)
+            await service.process_document(document.id, document.s3_pdf_path)
+            # Worker path: failures propagate so the job can be nacked
+            async with session_scope() as session:
+                stored = await repo.get_document(document.id, session)
+                stored.set_error("previous attempt failed")
+                await repo.update_document(stored, session)
+            storage.objects.clear()
+            with pytest.raises(Exception):
+                await service.process_document(document.id, document.s3_pdf_path)
+        finally:
+            service._pdf_pool.shutdown()
+
+        async with session_scope() as session:
+            assert len(await repo.get_pages_by_document(document.id, session)) == 2
+            assert len(await repo.get_chunks_by_document(document.id, session)) == 1
+
+    async def test_redelivered_completed_job_keeps_document(self, make_pdf):
+        """A worker that dies between READY and ack must not wipe or fail the document"""
+        storage = _MemoryStorage()
+        repo = RDSDocumentRepository()
+        marker = _CountingMarker()
+        ingestion = IngestionService(repo=repo, storage=storage, content_dedup=False)
+        service = DocumentService(
+            repo=repo,
+            hub=EventStreamHub(),
+            storage=storage,
+            marker_client=marker,
+            chunk_service=ChunkService(repo),
+        )
+        document = await ingestion.create_document_and_enqueue(
+            user_id="retry-user", filename="paper.pdf", file_stream=io.BytesIO(make_pdf(20))
+        )
+
+        try:
+            await service.process_document(document.id, document.s3_pdf_path)
+            async with session_scope() as session:
+                block_ids = [b.id for b in await repo.get_blocks_by_document(document.id, session)]
+            # Redelivery returns without re-ingesting, even with the PDF gone
+            storage.objects.clear()
+            await service.process_document(document.id, document.s3_pdf_path)
+            # and a dead-lettered copy of the job does not fail it
+            await service.mark_processing_failed(document.id, "Processing failed after 3 attempts")
+        finally:
+            service._pdf_pool.shutdown()
+
+        assert marker.calls == 1
+        async with session_scope() as session:
+            stored = await repo.get_document(document.id, session)
+            assert stored.status.value == "READY" and stored.processing_error is None
+            assert [b.id for b in await repo.get_blocks_by_document(document.id, session)] == block_ids
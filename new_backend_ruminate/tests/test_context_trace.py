@@ -0,0 +1,51 @@
+"""Tests for in-memory context tracing"""
+import asyncio
+import pytest
+
+from new_backend_ruminate.infrastructure.tracing.context_trace import ContextTraceService, trace_active, trace_event
+
+
+@pytest.mark.asyncio
+class TestContextTraceService:
+    """Test ContextTraceService"""
+
+    async def test_disabled_trace_records_nothing(self):
+        """Without debug mode or sampling no trace is kept"""
+        service = ContextTraceService(capacity=10, sample_rate=0.0)
+
+        enabled = service.should_trace(debug_mode=False)
+        with service.trace(enabled, conversation_id="conv-1", user_id="user-1"):
+            assert not trace_active()
+            trace_event("ignored", value=1)
+
+        assert enabled is False
+        assert service.list_traces() == []
+
+    async def test_events_from_concurrent_tasks_are_recorded(self):
+        """Events emitted by gathered tasks land in the turn's trace"""
+        service = ContextTraceService(capacity=10, sample_rate=0.0)
+
+        async def provider(provider_name):
+            await asyncio.sleep(0)
+            trace_event("provider", provider=provider_name)
+
+        with service.trace(service.should_trace(debug_mode=True), conversation_id="conv-1", message_id="ai-1", user_id="user-1"):
+            await asyncio.gather(provider("a"), provider("b"))
+            trace_event("prompt", message_count=2)
+
+        [trace] = service.list_traces(user_id="user-1")
+        assert trace["message_id"] == "ai-1"
+        assert [e["name"] for e in trace["events"]] == ["provider", "provider", "prompt"]
+        assert {e["provider"] for e in trace["events"][:2]} == {"a", "b"}
+        assert "_start" not in trace and trace["duration_ms"] >= 0
+        assert service.get_trace(trace["id"]) is trace
+
+    async def test_ring_buffer_keeps_most_recent(self):
+        """Old traces are dropped once capacity is reached, and listing filters by user"""
+        service = ContextTraceService(capacity=3, sample_rate=0.0)
+        for i in range(5):
+            with service.trace(True, conversation_id=f"conv-{i}", user_id="user-1" if i % 2 else "user-2"):
+                trace_event("step", i=i)
+
+        assert [t["conversation_id"] for t in service.list_traces()] == ["conv-4", "conv-3", "conv-2"]
+        assert [t["conversation_id"] for t in service.list_traces(user_id="user-1")] == ["conv-3"]
@@ -203,6 +203,7 @@ class TestBlockEntity:
         assert block.page_number == 0
         assert block.block_type == BlockType.SECTION_HEADER
         assert block.html_content == "<h1>Document Title</h1>"
+        assert block.plain_text == "Document Title"
         assert len(block.polygon) == 4
         assert block.section_hierarchy == {"level": 1}
         assert block.metadata == {"confidence": 0.95}
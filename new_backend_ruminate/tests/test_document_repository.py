@@ -2,7 +2,7 @@
 import pytest
 from datetime import datetime
 from sqlalchemy import select
-from new_backend_ruminate.domain.document.entities import Document, DocumentStatus, Page, Block, BlockType
+from new_backend_ruminate.domain.document.entities import Document, DocumentStatus, Page, Block, BlockType, BlockText
 from new_backend_ruminate.infrastructure.document.rds_document_repository import RDSDocumentRepository
 from new_backend_ruminate.infrastructure.document.models import DocumentModel, PageModel, BlockModel
 
@@ -177,6 +177,51 @@ class TestDocumentRepository:
         # Try deleting non-existent document
         not_deleted = await repo.delete_document("non-existent", db_session)
         assert not_deleted is False
+    
+    async def test_update_document_writes_only_changed_fields(self, db_session):
+        """Test that an update does not overwrite fields changed elsewhere"""
+        repo = RDSDocumentRepository()
+        await repo.create_document(
+            Document(id="test-partial", user_id="user-123", title="Paper.pdf"), db_session
+        )
+        
+        # Two copies loaded before either is saved
+        first = await repo.get_document("test-partial", db_session)
+        second = await repo.get_document("test-partial", db_session)
+        first.summary = "Summary"
+        second.title = "Renamed.pdf"
+        assert second.changed_fields() == {"title"}
+        
+        await repo.update_document(first, db_session)
+        updated = await repo.update_document(second, db_session)
+        
+        assert updated.summary == "Summary"
+        assert updated.title == "Renamed.pdf"
+        assert second.changed_fields() == set()
+    
+    async def test_advance_reading_progress(self, db_session):
+        """Test that reading progress only moves forward, for the owner, to the document's blocks"""
+        repo = RDSDocumentRepository()
+        await repo.create_document(
+            Document(id="test-progress", user_id="user-123", title="Paper.pdf"), db_session
+        )
+        await repo.create_blocks(
+            [Block(id=f"progress-block-{i}", document_id="test-progress", block_type=BlockType.TEXT) for i in range(3)],
+            db_session
+        )
+        
+        advanced = await repo.advance_reading_progress("test-progress", "user-123", "progress-block-1", 1, db_session)
+        assert advanced.furthest_read_block_id == "progress-block-1"
+        assert advanced.furthest_read_position == 1
+        
+        # Backwards, another user's request or a foreign block change nothing
+        assert await repo.advance_reading_progress("test-progress", "user-123", "progress-block-0", 0, db_session) is None
+        assert await repo.advance_reading_progress("test-progress", "user-999", "progress-block-2", 2, db_session) is None
+        assert await repo.advance_reading_progress("test-progress", "user-123", "block-elsewhere", 2, db_session) is None
+        
+        stored = await repo.get_document("test-progress", db_session)
+        assert stored.furthest_read_block_id == "progress-block-1"
+        assert stored.furthest_read_position == 1
 
 
 @pytest.mark.asyncio
@@ -337,7 +382,63 @@ class TestBlockRepository:
         for block in created_blocks:
             assert block.document_id == "doc-with-blocks"
             assert block.page_id == "page-for-blocks"
-    
+
+    async def test_bulk_create_pages_and_blocks(self, db_session):
+        """Test bulk insert path for pages and blocks"""
+        repo = RDSDocumentRepository()
+
+        doc = Document(
+            id="doc-bulk",
+            status=DocumentStatus.READY,
+            title="Bulk.pdf",
+            created_at=datetime.now(),
+            updated_at=datetime.now()
+        )
+        await repo.create_document(doc, db_session)
+
+        pages = []
+        blocks = []
+        for page_num in range(3):
+            page = Page(
+                id=f"page-bulk-{page_num}",
+                document_id="doc-bulk",
+                page_number=page_num,
+                polygon=[[0, 0], [612, 0], [612, 792], [0, 792]],
+                created_at=datetime.now(),
+                updated_at=datetime.now()
+            )
+            for i in range(2):
+                block = Block(
+                    id=f"block-bulk-p{page_num}-{i}",
+                    document_id="doc-bulk",
+                    page_id=page.id,
+                    page_number=page_num,
+                    block_type=BlockType.TEXT,
+                    html_content=f"<p>Page {page_num} Block {i}</p>",
+                    metadata={"source": "marker"},
+                    created_at=datetime.now(),
+                    updated_at=datetime.now()
+                )
+                page.add_block(block.id)
+                blocks.append(block)
+            pages.append(page)
+
+        assert await repo.bulk_create_pages(pages, db_session) == 3
+        assert await repo.bulk_create_blocks(blocks, db_session) == 6
+        assert await repo.bulk_create_blocks([], db_session) == 0
+
+        retrieved_pages = await repo.get_pages_by_document("doc-bulk", db_session)
+        assert [p.page_number for p in retrieved_pages] == [0, 1, 2]
+        assert retrieved_pages[1].block_ids == ["block-bulk-p1-0", "block-bulk-p1-1"]
+        assert retrieved_pages[0].polygon == [[0, 0], [612, 0], [612, 792], [0, 792]]
+
+        retrieved_blocks = await repo.get_blocks_by_document("doc-bulk", db_session)
+        assert [b.id for b in retrieved_blocks] == [b.id for b in blocks]
+        assert retrieved_blocks[0].block_type == BlockType.TEXT
+        assert retrieved_blocks[0].metadata == {"source": "marker"}
+        # plain_text is extracted on insert when the caller did not set it
+        assert retrieved_blocks[0].plain_text == "Page 0 Block 0"
+
     async def test_get_blocks_by_document(self, db_session):
         """Test getting blocks for a document"""
         repo = RDSDocumentRepository()
@@ -385,7 +486,77 @@ class TestBlockRepository:
         # Should be ordered by page number, then block id
         assert retrieved_blocks[0].page_number == 0
         assert retrieved_blocks[-1].page_number == 1
-    
+
+    async def test_get_text_blocks(self, db_session):
+        """Test text-only block reads by page range and chunk in reading order"""
+        repo = RDSDocumentRepository()
+
+        doc = Document(
+            id="doc-text-blocks",
+            status=DocumentStatus.READY,
+            title="Doc.pdf",
+            created_at=datetime.now(),
+            updated_at=datetime.now()
+        )
+        await repo.create_document(doc, db_session)
+
+        pages = []
+        blocks = []
+        for page_num in range(3):
+            page = Page(
+                id=f"page-tb-{page_num}",
+                document_id="doc-text-blocks",
+                page_number=page_num,
+                created_at=datetime.now(),
+                updated_at=datetime.now()
+            )
+            # Reading order deliberately differs from id order
+            for i in reversed(range(3)):
+                block = Block(
+                    id=f"block-tb-p{page_num}-{i}",
+                    document_id="doc-text-blocks",
+                    page_id=page.id,
+                    chunk_id="chunk-tb-0" if page_num < 2 else "chunk-tb-1",
+                    page_number=page_num,
+                    block_type=BlockType.TEXT,
+                    html_content=f"<p>Page {page_num} Block {i}</p>",
+                    images={"img": "base64data"},
+                    created_at=datetime.now(),
+                    updated_at=datetime.now()
+                )
+                page.add_block(block.id)
+                blocks.append(block)
+            pages.append(page)
+        await repo.bulk_create_pages(pages, db_session)
+        await repo.bulk_create_blocks(blocks, db_session)
+
+        in_range = await repo.get_text_blocks("doc-text-blocks", db_session, start_page=1, end_page=3)
+        assert [b.id for b in in_range] == [
+            "block-tb-p1-2", "block-tb-p1-1", "block-tb-p1-0",
+            "block-tb-p2-2", "block-tb-p2-1", "block-tb-p2-0",
+        ]
+        assert in_range[0].html_content == "<p>Page 1 Block 2</p>"
+        assert in_range[0].plain_text == "Page 1 Block 2"
+        assert in_range[0].block_type == BlockType.TEXT
+        assert isinstance(in_range[0], BlockText)
+        assert not hasattr(in_range[0], "images")
+
+        by_chunk = await repo.get_text_blocks("doc-text-blocks", db_session, chunk_id="chunk-tb-1")
+        assert [b.page_number for b in by_chunk] == [2, 2, 2]
+
+        block_text = await repo.get_block_text("block-tb-p0-1", db_session)
+        assert block_text.html_content == "<p>Page 0 Block 1</p>"
+        assert await repo.get_block_text("missing-block", db_session) is None
+
+        pages_with_text = await repo.get_pages_in_range_with_block_texts("doc-text-blocks", 1, 1, db_session)
+        assert [p.page_number for p in pages_with_text] == [0, 1, 2]
+        assert [b.id for b in pages_with_text[0].blocks] == ["block-tb-p0-2", "block-tb-p0-1", "block-tb-p0-0"]
+        assert all(isinstance(b, BlockText) for b in pages_with_text[0].blocks)
+
+        without_images = await repo.get_block("block-tb-p0-0", db_session, include_images=False)
+        assert without_images.images is None
+        assert without_images.html_content == "<p>Page 0 Block 0</p>"
+
     async def test_get_blocks_by_page(self, db_session):
         """Test getting blocks for a specific page"""
         repo = RDSDocumentRepository()
@@ -0,0 +1,99 @@
+"""Tests for EventStreamHub fan-out and overflow policies"""
+import asyncio
+import pytest
+
+from new_backend_ruminate.infrastructure.sse.hub import EventStreamHub
+
+
+async def _collect(agen):
+    return [chunk async for chunk in agen]
+
+
+@pytest.mark.asyncio
+class TestEventStreamHub:
+    """Test EventStreamHub"""
+
+    async def test_slow_consumer_does_not_block_publish(self):
+        """A consumer that never reads neither blocks publish nor holds back other streams"""
+        hub = EventStreamHub(max_queue_size=2, overflow_policy="drop_oldest")
+        stalled = hub.register_consumer("slow")
+        first = asyncio.create_task(stalled.__anext__())
+        await asyncio.sleep(0)
+        fast = asyncio.create_task(_collect(hub.register_consumer("fast")))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        for i in range(100):
+            await asyncio.wait_for(hub.publish("slow", f"s{i}"), timeout=0.1)
+        await hub.publish("fast", "ok")
+        await hub.terminate("fast")
+
+        assert await asyncio.wait_for(fast, timeout=1) == ["ok"]
+
+    async def test_drop_oldest_keeps_newest_chunks(self):
+        hub = EventStreamHub(max_queue_size=2, overflow_policy="drop_oldest")
+        consumer = hub.register_consumer("s")
+        pending = asyncio.create_task(consumer.__anext__())
+        await asyncio.sleep(0)
+
+        for chunk in ["a", "b", "c", "d"]:
+            await hub.publish("s", chunk)
+        # The waiting consumer is woken only after all four publishes ran
+        assert await pending == "c"
+        assert hub.stream_metrics("s")["dropped"] == 2
+
+        await hub.terminate("s")
+        assert await _collect(consumer) == ["d"]
+
+    async def test_coalesce_merges_text_but_not_control_chunks(self):
+        """Token text is merged instead of dropped; JSON events and [DONE] stay separate"""
+        hub = EventStreamHub(max_queue_size=2, overflow_policy="drop_oldest")
+        hub.set_overflow_policy("s", "coalesce")
+        task = asyncio.create_task(_collect(hub.register_consumer("s")))
+        await asyncio.sleep(0)
+
+        for chunk in ["Hel", "lo", " wor", "ld", "[DONE]"]:
+            await hub.publish("s", chunk)
+        metrics = hub.stream_metrics("s")
+        await hub.terminate("s")
+
+        assert await task == ["Hel", "lo world", "[DONE]"]
+        assert metrics["policy"] == "coalesce"
+        assert metrics["coalesced"] == 2
+        assert metrics["dropped"] == 0
+
+    async def test_disconnect_closes_only_the_slow_consumer(self):
+        hub = EventStreamHub(max_queue_size=1, overflow_policy="disconnect")
+        task = asyncio.create_task(_collect(hub.register_consumer("s")))
+        await asyncio.sleep(0)
+
+        await hub.publish("s", "a")
+        await hub.publish("s", "b")
+
+        assert await asyncio.wait_for(task, timeout=1) == []
+        metrics = await hub.metrics()
+        assert metrics["streams"] == 0
+        assert metrics["totals"]["disconnected"] == 1
+        assert metrics["totals"]["dropped"] == 2
+
+    async def test_metrics_report_queue_depth(self):
+        hub = EventStreamHub(max_queue_size=10)
+        consumers = [hub.register_consumer("s") for _ in range(2)]
+        tasks = [asyncio.create_task(c.__anext__()) for c in consumers]
+        await asyncio.sleep(0)
+
+        for chunk in ["a", "b", "c"]:
+            await hub.publish("s", chunk)
+        stream = hub.stream_metrics("s")
+        metrics = await hub.metrics()
+
+        assert stream["consumers"] == 2
+        assert stream["max_queue_depth"] == 3
+        assert stream["total_queue_depth"] == 6
+        assert metrics["streams"] == 1
+        assert metrics["consumers"] == 2
+        assert metrics["total_queue_depth"] == 6
+        assert await asyncio.gather(*tasks) == ["a", "a"]
+
+        await hub.terminate("s")
+        assert (await hub.metrics())["totals"]["published"] == 3
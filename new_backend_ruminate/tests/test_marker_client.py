@@ -0,0 +1,109 @@
+"""Tests for MarkerClient's shared connection pool and poll multiplexer"""
+import asyncio
+import time
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from new_backend_ruminate.infrastructure.document_processing.marker_client import MarkerClient
+from new_backend_ruminate.infrastructure.document_processing.marker_poller import MarkerPollMultiplexer, MarkerRateLimited
+
+
+def _fast_poller(poll_once, **overrides) -> MarkerPollMultiplexer:
+    options = dict(rate=100.0, min_interval=0.01, max_interval=0.05, backoff=1.5, expected_base=0.0, expected_per_page=0.0)
+    options.update(overrides)
+    return MarkerPollMultiplexer(poll_once, **options)
+
+
+def _marker_app() -> web.Application:
+    async def submit(request):
+        await request.post()
+        return web.json_response({"success": True, "request_id": "job-1", "request_check_url": str(request.url.with_path("/check"))})
+
+    async def check(request):
+        page = {"block_type": "Page", "html": "", "children": [{"block_type": "Text", "html": "<p>hi</p>"}]}
+        return web.json_response({"status": "complete", "success": True, "json": {"children": [page]}})
+
+    app = web.Application()
+    app.router.add_post("/marker", submit)
+    app.router.add_get("/check", check)
+    return app
+
+
+@pytest.mark.asyncio
+class TestMarkerClientSession:
+    """Test MarkerClient connection reuse"""
+
+    async def test_jobs_reuse_pooled_connections(self):
+        """Submits and polls across jobs share one keep-alive connection"""
+        async with TestServer(_marker_app()) as server:
+            client = MarkerClient()
+            client.base_url = str(server.make_url("/marker"))
+            client.poller = _fast_poller(client._poll_once)
+            await client.start()
+            try:
+                for _ in range(3):
+                    response = await client.process_document(b"%PDF-1.4 test", "test.pdf")
+                    assert response.status == "completed"
+                    response.close()
+                metrics = client.metrics()
+            finally:
+                await client.close()
+
+        assert metrics["requests"] == 6
+        assert metrics["connections_created"] == 1
+        assert metrics["connections_reused"] == 5
+        assert client.metrics()["session_open"] is False
+
+
+@pytest.mark.asyncio
+class TestMarkerPollMultiplexer:
+    """Test MarkerPollMultiplexer"""
+
+    async def test_many_jobs_share_the_rate_budget(self):
+        """Polls across all jobs stay within the global rate, including after a 429"""
+        poll_times = []
+        remaining = {f"job-{i}": 3 for i in range(10)}
+        limited = []
+
+        async def poll_once(url):
+            poll_times.append(time.monotonic())
+            if not limited:
+                limited.append(time.monotonic())
+                raise MarkerRateLimited(retry_after=0.2)
+            remaining[url] -= 1
+            return "done" if remaining[url] <= 0 else None
+
+        poller = _fast_poller(poll_once, rate=50.0)
+        started = time.monotonic()
+        results = await asyncio.gather(*(poller.wait(url, timeout=10) for url in remaining))
+        elapsed = time.monotonic() - started
+
+        assert results == ["done"] * 10
+        metrics = poller.metrics()
+        assert metrics["rate_limited"] == 1 and metrics["tracked_jobs"] == 0
+        # Polls already in flight finish, then nothing is sent until the Retry-After passes
+        [limited_at] = limited
+        assert not [t for t in poll_times if limited_at + 0.01 < t < limited_at + 0.19]
+        # After the pause the bucket starts empty, so the remaining polls are paced at 50/s
+        resumed = [t for t in poll_times if t > limited_at + 0.19]
+        assert elapsed >= 0.2 + (len(resumed) - 1) / 50 * 0.9
+
+    async def test_notify_polls_immediately_and_timeout_gives_up(self):
+        """A webhook notification short-circuits the schedule; a stuck job times out"""
+        ready = set()
+
+        async def poll_once(url):
+            return "done" if url in ready else None
+
+        poller = _fast_poller(poll_once, min_interval=5.0, max_interval=5.0)
+        waiter = asyncio.create_task(poller.wait("check-a", request_id="req-a", timeout=30))
+        await asyncio.sleep(0.01)
+        ready.add("check-a")
+        assert poller.notify("req-a") is True
+        assert await asyncio.wait_for(waiter, timeout=1) == "done"
+        assert poller.notify("req-a") is False
+
+        quick = _fast_poller(poll_once)
+        assert await quick.wait("check-b", timeout=0.1) is None
+        assert quick.metrics()["timed_out"] == 1
@@ -0,0 +1,78 @@
+"""Test streaming parse of completed Marker results"""
+import json
+import tempfile
+import pytest
+from new_backend_ruminate.infrastructure.document_processing.marker_client import MarkerClient, MarkerResponse
+
+
+def _spooled(payload: dict):
+    spool = tempfile.SpooledTemporaryFile(max_size=64)
+    spool.write(json.dumps(payload).encode())
+    return spool
+
+
+def _marker_payload(num_pages: int) -> dict:
+    children = [
+        {
+            "block_type": "Page",
+            "html": "&lt;content-ref&gt;",
+            "polygon": [[0.0, 0.0], [612.5, 0.0], [612.5, 792.0], [0.0, 792.0]],
+            "children": [
+                {
+                    "block_type": "Text",
+                    "html": f"<p>Page {i} text</p>",
+                    "polygon": [[72.25, 72.0], [540.0, 72.0], [540.0, 84.0], [72.25, 84.0]],
+                    "children": [
+                        {"block_type": "Line", "html": "<span>line</span>"}
+                    ]
+                }
+            ]
+        }
+        for i in range(num_pages)
+    ]
+    # A non-Page child at the top level is skipped
+    children.insert(1, {"block_type": "Document", "html": ""})
+    return {"status": "complete", "success": True, "json": {"children": children}}
+
+
+def test_scan_result_reads_status_and_counts_pages():
+    """Scanning reports status fields and the number of Page children"""
+    client = MarkerClient()
+    spool = _spooled(_marker_payload(3))
+
+    summary = client._scan_result(spool)
+
+    assert summary["status"] == "complete"
+    assert summary["success"] is True
+    assert summary["has_json"] is True
+    assert summary["page_count"] == 3
+
+
+@pytest.mark.asyncio
+async def test_iter_pages_streams_from_spooled_payload():
+    """Streaming mode yields the same pages as the in-memory parser"""
+    client = MarkerClient()
+    payload = _marker_payload(3)
+    response = MarkerResponse(status="completed", page_count=3, result_file=_spooled(payload))
+
+    streamed = [page async for page in client.iter_pages(response)]
+    expected = client._process_marker_json(payload["json"])
+
+    assert streamed == expected
+    assert len(streamed) == 3
+    assert streamed[0]["html"] == "<content-ref>"
+    assert [b["block_type"] for b in streamed[0]["blocks"]] == ["Text", "Line"]
+    assert isinstance(streamed[0]["polygon"][1][0], float)
+
+    response.close()
+    assert response.result_file is None
+
+
+@pytest.mark.asyncio
+async def test_iter_pages_uses_materialised_pages():
+    """Responses that already carry pages are yielded as-is"""
+    client = MarkerClient()
+    pages = [{"html": "", "blocks": []}]
+    response = MarkerResponse(status="completed", pages=pages)
+
+    assert [page async for page in client.iter_pages(response)] == pages
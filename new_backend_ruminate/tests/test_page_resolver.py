@@ -0,0 +1,70 @@
+"""Tests for current page resolution in the windowed context builder"""
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock
+
+from new_backend_ruminate.context.windowed.page_resolver import CurrentPageResolver
+from new_backend_ruminate.domain.conversation.entities.conversation import Conversation, ConversationType
+from new_backend_ruminate.domain.conversation.entities.message import Message, Role
+from new_backend_ruminate.domain.document.entities import Document, DocumentStatus, Block, BlockType
+from new_backend_ruminate.infrastructure.document.rds_document_repository import RDSDocumentRepository
+
+
+def _user_message(msg_id: str, block_id: str = None) -> Message:
+    return Message(id=msg_id, conversation_id="conv-1", role=Role.USER, content="?", block_id=block_id)
+
+
+@pytest.mark.asyncio
+class TestCurrentPageResolver:
+    """Test CurrentPageResolver"""
+
+    async def test_batches_candidates_and_caches_pages(self):
+        """All candidate blocks load in one query; repeat turns hit the cache"""
+        doc_repo = AsyncMock(spec=RDSDocumentRepository)
+        # Latest user block is unknown, so the next candidate wins
+        doc_repo.get_block_page_numbers.return_value = {"block-old": 0, "block-source": 7}
+        resolver = CurrentPageResolver(doc_repo)
+        conv = Conversation(id="conv-1", type=ConversationType.CHAT, document_id="doc-1", source_block_id="block-source")
+        thread = [
+            _user_message("m1", "block-old"),
+            Message(id="m2", conversation_id="conv-1", role=Role.ASSISTANT, content="!", block_id="block-assistant"),
+            _user_message("m3", "block-missing"),
+        ]
+
+        assert await resolver.resolve(conv, thread, session=AsyncMock()) == 0
+        doc_repo.get_block_page_numbers.assert_awaited_once()
+        assert doc_repo.get_block_page_numbers.await_args.args[0] == ["block-missing", "block-old", "block-source"]
+
+        # A new message on a cached block resolves without a query
+        thread.append(_user_message("m4", "block-source"))
+        assert await resolver.resolve(conv, thread, session=AsyncMock()) == 7
+        assert doc_repo.get_block_page_numbers.await_count == 1
+
+    async def test_rabbithole_is_pinned_to_source_block(self):
+        """Rabbithole conversations ignore message blocks"""
+        doc_repo = AsyncMock(spec=RDSDocumentRepository)
+        doc_repo.get_block_page_numbers.return_value = {"block-source": 3}
+        resolver = CurrentPageResolver(doc_repo)
+        conv = Conversation(id="conv-1", type=ConversationType.RABBITHOLE, document_id="doc-1", source_block_id="block-source")
+
+        assert await resolver.resolve(conv, [_user_message("m1", "block-other")], session=AsyncMock()) == 3
+        assert doc_repo.get_block_page_numbers.await_args.args[0] == ["block-source"]
+
+    async def test_get_block_page_numbers(self, db_session):
+        """The repository maps block ids to page numbers and omits unknown ids"""
+        repo = RDSDocumentRepository()
+        await repo.create_document(
+            Document(id="doc-resolve", status=DocumentStatus.READY, title="Resolve.pdf",
+                     created_at=datetime.now(), updated_at=datetime.now()),
+            db_session
+        )
+        await repo.bulk_create_blocks([
+            Block(id=f"block-resolve-{n}", document_id="doc-resolve", page_number=n,
+                  block_type=BlockType.TEXT, html_content="<p>x</p>",
+                  created_at=datetime.now(), updated_at=datetime.now())
+            for n in range(3)
+        ], db_session)
+
+        pages = await repo.get_block_page_numbers(["block-resolve-0", "block-resolve-2", "nope"], db_session)
+
+        assert pages == {"block-resolve-0": 0, "block-resolve-2": 2}
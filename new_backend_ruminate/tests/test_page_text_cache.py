@@ -0,0 +1,127 @@
+"""Tests for the rendered page text cache"""
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock
+
+from pydantic import ValidationError
+
+from new_backend_ruminate.config import _Settings
+from new_backend_ruminate.context.windowed.providers import PageRangeProvider
+from new_backend_ruminate.domain.conversation.entities.conversation import Conversation, ConversationType
+from new_backend_ruminate.domain.document.entities import Document, DocumentStatus, Page, Block, BlockType
+from new_backend_ruminate.infrastructure.cache.page_text_cache import InProcessPageTextCache
+from new_backend_ruminate.infrastructure.document.rds_document_repository import RDSDocumentRepository
+
+
+@pytest.mark.asyncio
+class TestInProcessPageTextCache:
+    """Test the in-process LRU backend"""
+
+    async def test_lru_eviction_by_size(self):
+        """Least recently used pages are evicted once the byte budget is exceeded"""
+        cache = InProcessPageTextCache(max_bytes=10)
+        await cache.set_many("doc", {0: "aaaa", 1: "bbbb"})
+        # Touch page 0 so page 1 becomes least recently used
+        assert await cache.get_many("doc", [0]) == {0: "aaaa"}
+
+        await cache.set_many("doc", {2: "cccc"})
+
+        assert await cache.get_many("doc", [0, 1, 2]) == {0: "aaaa", 2: "cccc"}
+        assert cache.size_bytes == 8
+
+    async def test_invalidation(self):
+        """Pages and whole documents can be invalidated"""
+        cache = InProcessPageTextCache(max_bytes=1024)
+        await cache.set_many("doc-a", {0: "zero", 1: "one", 2: ""})
+        await cache.set_many("doc-b", {0: "other"})
+
+        await cache.invalidate_pages("doc-a", [1])
+        assert await cache.get_many("doc-a", [0, 1, 2]) == {0: "zero", 2: ""}
+
+        await cache.invalidate_document("doc-a")
+        assert await cache.get_many("doc-a", [0, 1, 2]) == {}
+        assert await cache.get_many("doc-b", [0]) == {0: "other"}
+        assert cache.size_bytes == len("other")
+
+
+@pytest.mark.asyncio
+class TestPageRangeProviderCache:
+    """Test that the page range provider serves repeat windows from the cache"""
+
+    async def test_repeat_window_skips_database(self):
+        """A second message on the same page does no page query"""
+        doc_repo = AsyncMock(spec=RDSDocumentRepository)
+        doc_repo.get_block_page_numbers.return_value = {"block-1": 2}
+        doc_repo.get_pages_in_range_with_block_texts.return_value = [
+            Page(id=f"page-{n}", document_id="doc-1", page_number=n, blocks=[
+                Block(id=f"b-{n}", document_id="doc-1", page_number=n, html_content=f"<p>Page {n} text</p>")
+            ])
+            for n in range(0, 5)
+        ]
+        provider = PageRangeProvider(doc_repo, page_radius=2, page_cache=InProcessPageTextCache())
+        conv = Conversation(id="conv-1", type=ConversationType.RABBITHOLE, document_id="doc-1", source_block_id="block-1")
+
+        first = await provider.get_page_content(conv, [], session=AsyncMock())
+        second = await provider.get_page_content(conv, [], session=AsyncMock())
+
+        assert first == second
+        assert "--- Page 2 (CURRENT) ---\nPage 2 text" in first
+        assert doc_repo.get_pages_in_range_with_block_texts.await_count == 1
+
+    async def test_pages_missing_from_database_are_not_cached(self):
+        """A page the document doesn't have yet is looked up again, not cached as empty"""
+        cache = InProcessPageTextCache()
+        doc_repo = AsyncMock(spec=RDSDocumentRepository)
+        doc_repo.get_block_page_numbers.return_value = {"block-1": 2}
+        doc_repo.get_pages_in_range_with_block_texts.return_value = [
+            Page(id=f"page-{n}", document_id="doc-2", page_number=n, blocks=[
+                Block(id=f"b-{n}", document_id="doc-2", page_number=n, html_content=f"<p>Page {n} text</p>")
+            ])
+            for n in range(0, 4)
+        ]
+        provider = PageRangeProvider(doc_repo, page_radius=2, page_cache=cache)
+        conv = Conversation(id="conv-2", type=ConversationType.RABBITHOLE, document_id="doc-2", source_block_id="block-1")
+
+        first = await provider.get_page_content(conv, [], session=AsyncMock())
+
+        assert "Page 4" not in first
+        assert await cache.get_many("doc-2", [3, 4]) == {3: "Page 3 text"}
+
+    async def test_block_writes_invalidate_cached_pages(self, db_session):
+        """Writing blocks through the repository drops their pages from the cache"""
+        cache = InProcessPageTextCache()
+        repo = RDSDocumentRepository(page_text_cache=cache)
+        await repo.create_document(
+            Document(id="doc-cache", status=DocumentStatus.READY, title="Cache.pdf",
+                     created_at=datetime.now(), updated_at=datetime.now()),
+            db_session
+        )
+        await cache.set_many("doc-cache", {0: "", 1: "stale"})
+
+        block = Block(
+            id="block-cache-0",
+            document_id="doc-cache",
+            page_number=0,
+            block_type=BlockType.TEXT,
+            html_content="<p>New text</p>",
+            created_at=datetime.now(),
+            updated_at=datetime.now()
+        )
+        await repo.bulk_create_blocks([block], db_session)
+        assert await cache.get_many("doc-cache", [0, 1]) == {1: "stale"}
+
+        await repo.delete_document("doc-cache", db_session)
+        assert await cache.get_many("doc-cache", [1]) == {}
+
+
+class TestPageTextCacheBackendSetting:
+    """Test how the cache backend is chosen"""
+
+    def test_auto_follows_queue_backend(self):
+        """A worker-backed queue needs a cache the worker can invalidate"""
+        assert _Settings(openai_api_key="x", queue_backend="inproc").page_text_cache_backend == "inproc"
+        assert _Settings(openai_api_key="x", queue_backend="redis").page_text_cache_backend == "redis"
+
+    def test_inproc_cache_rejected_with_redis_queue(self):
+        with pytest.raises(ValidationError):
+            _Settings(openai_api_key="x", queue_backend="redis", page_text_cache_backend="inproc")
@@ -0,0 +1,97 @@
+"""Tests for the PDF process pool"""
+import asyncio
+import io
+import os
+import time
+import pytest
+import PyPDF2
+
+from new_backend_ruminate.infrastructure.document_processing.pdf_pool import PdfProcessPool, PdfTaskTimeout
+
+
+def _sleep(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+@pytest.mark.asyncio
+class TestPdfProcessPool:
+    """Test PdfProcessPool"""
+
+    async def test_page_count_and_split(self, make_pdf):
+        pool = PdfProcessPool(max_workers=2, timeout=30)
+        try:
+            content = make_pdf(5)
+            assert await pool.page_count(content) == 5
+            chunks = await pool.split(content, pages_per_chunk=2)
+        finally:
+            pool.shutdown()
+
+        assert [len(PyPDF2.PdfReader(io.BytesIO(c)).pages) for c in chunks] == [2, 2, 1]
+
+    async def test_event_loop_stays_responsive(self):
+        """The loop keeps ticking while a CPU task runs in the pool"""
+        pool = PdfProcessPool(max_workers=1, timeout=30)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        tick_task = asyncio.create_task(ticker())
+        try:
+            assert await pool.run(_sleep, 0.3) == 0.3
+        finally:
+            tick_task.cancel()
+            pool.shutdown()
+        assert ticks >= 10
+
+    async def test_timeout_recycles_pool(self):
+        pool = PdfProcessPool(max_workers=1, timeout=0.2)
+        try:
+            with pytest.raises(PdfTaskTimeout):
+                await pool.run(_sleep, 5)
+            # A fresh pool serves the next task
+            assert await pool.run(_sleep, 0, timeout=30) == 0
+        finally:
+            pool.shutdown()
+
+    async def test_timeout_does_not_fail_other_tasks(self, monkeypatch):
+        """A task running next to one that times out is retried on the new pool"""
+        monkeypatch.setattr(os, "cpu_count", lambda: 2)
+        pool = PdfProcessPool(max_workers=2, timeout=0.15)
+        try:
+            bystander = asyncio.create_task(pool.run(_sleep, 0.4, timeout=30))
+            await asyncio.sleep(0.05)
+            with pytest.raises(PdfTaskTimeout):
+                await pool.run(_sleep, 5)
+            assert not bystander.done()
+            assert await bystander == 0.4
+        finally:
+            pool.shutdown()
+
+    async def test_queued_task_is_not_timed_while_waiting(self, monkeypatch):
+        """With fewer CPUs than max_workers, extra tasks wait for a slot off the clock"""
+        monkeypatch.setattr(os, "cpu_count", lambda: 1)
+        pool = PdfProcessPool(max_workers=2, timeout=0.5)
+        try:
+            results = await asyncio.gather(pool.run(_sleep, 0.3), pool.run(_sleep, 0.3))
+        finally:
+            pool.shutdown()
+        assert results == [0.3, 0.3]
+
+    async def test_validate_file_from_disk(self, make_pdf, tmp_path):
+        """Files are validated and scanned in place, without reading them whole"""
+        pool = PdfProcessPool(max_workers=1, timeout=30)
+        clean = tmp_path / "clean.pdf"
+        clean.write_bytes(make_pdf(50))
+        scripted = tmp_path / "scripted.pdf"
+        scripted.write_bytes(make_pdf(50) + b"\n% /JavaScript\n")
+        try:
+            assert await pool.validate_file(str(clean), "clean.pdf") is None
+            warning = await pool.validate_file(str(scripted), "scripted.pdf")
+        finally:
+            pool.shutdown()
+        assert warning.startswith("PDF contains potentially dangerous content")
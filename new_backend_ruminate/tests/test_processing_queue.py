@@ -1,8 +1,11 @@
 import asyncio
+import json
 import os
+import uuid
 import pytest
 
 from new_backend_ruminate.infrastructure.queue.inproc_queue import InProcessProcessingQueue
+from new_backend_ruminate.infrastructure.queue.job import JobPriority
 from new_backend_ruminate.infrastructure.queue.redis_queue import RedisProcessingQueue
 from new_backend_ruminate.config import settings
 
@@ -38,4 +41,144 @@ async def test_redis_queue_enqueue_dequeue_roundtrip():
         pytest.skip("Redis queue did not return a job (likely Redis not running)")
 
     assert out["document_id"] == job["document_id"]
-    assert out["s3_key"] == job["s3_key"] 
\ No newline at end of file
+    assert out["s3_key"] == job["s3_key"] 
+
+@pytest.mark.asyncio
+async def test_inproc_queue_unacked_job_is_reaped_and_retried():
+    """A job whose worker stops heartbeating is requeued after the visibility timeout"""
+    q = InProcessProcessingQueue(visibility_timeout=0.05, max_attempts=3, backoff_base=0.01, backoff_max=0.01)
+    await q.enqueue({"document_id": "doc-3"})
+
+    job = await q.reserve(timeout_seconds=1)
+    assert await q.reserve(timeout_seconds=0.05) is None      # in flight, not visible
+
+    await asyncio.sleep(0.1)                                    # worker "died": no ack, no heartbeat
+    assert await q.reap() == []
+
+    retried = await q.reserve(timeout_seconds=1)
+    assert retried.id == job.id
+    assert retried.attempts == 1
+    assert retried.last_error == "visibility timeout expired"
+
+    await q.ack(retried)
+    assert await q.stats() == {"ready": 0, "delayed": 0, "in_flight": 0, "dead": 0}
+
+
+@pytest.mark.asyncio
+async def test_inproc_queue_heartbeat_extends_lease():
+    q = InProcessProcessingQueue(visibility_timeout=0.1)
+    await q.enqueue({"document_id": "doc-4"})
+    job = await q.reserve(timeout_seconds=1)
+
+    for _ in range(3):
+        await asyncio.sleep(0.05)
+        assert await q.heartbeat(job)
+        assert await q.reap() == []
+
+    await q.ack(job)
+    assert not await q.heartbeat(job)
+
+
+@pytest.mark.asyncio
+async def test_inproc_queue_nack_backs_off_then_dead_letters():
+    q = InProcessProcessingQueue(max_attempts=2, backoff_base=0.2, backoff_max=0.2)
+    await q.enqueue({"document_id": "doc-5"})
+
+    job = await q.reserve(timeout_seconds=1)
+    assert await q.nack(job, "marker timeout") is False
+    assert await q.reserve(timeout_seconds=0.05) is None      # still backing off (>= 0.1s)
+
+    job = await q.reserve(timeout_seconds=1)
+    assert job.attempts == 1
+    assert await q.nack(job, "marker timeout") is True
+
+    [dead] = await q.dead_letters()
+    assert dead.payload == {"document_id": "doc-5"}
+    assert dead.attempts == 2 and dead.last_error == "marker timeout"
+    assert (await q.stats())["dead"] == 1
+
+
+@pytest.mark.asyncio
+async def test_inproc_queue_interactive_lane_runs_first():
+    q = InProcessProcessingQueue()
+    await q.enqueue({"document_id": "batch", "user_id": "u1"}, priority=JobPriority.BATCH)
+    await q.enqueue({"document_id": "start", "user_id": "u1"}, priority=JobPriority.USER)
+    await q.enqueue({"document_id": "upload", "user_id": "u1"}, priority=JobPriority.INTERACTIVE)
+
+    order = [(await q.reserve(timeout_seconds=1)).payload["document_id"] for _ in range(3)]
+    assert order == ["upload", "start", "batch"]
+
+
+@pytest.mark.asyncio
+async def test_inproc_queue_is_fair_between_users():
+    """A user with a large backlog doesn't starve a user who enqueued later"""
+    q = InProcessProcessingQueue()
+    for i in range(50):
+        await q.enqueue({"document_id": f"heavy-{i}", "user_id": "heavy"}, priority=JobPriority.INTERACTIVE)
+    await q.enqueue({"document_id": "light-0", "user_id": "light"}, priority=JobPriority.INTERACTIVE)
+
+    first = [(await q.reserve(timeout_seconds=1)).payload["document_id"] for _ in range(3)]
+    assert first == ["heavy-0", "light-0", "heavy-1"]
+
+
+@pytest.mark.asyncio
+async def test_inproc_queue_drr_charges_job_cost():
+    """With quantum 2 a user with cost-2 jobs gets one job per turn, a user with cost-1 jobs two"""
+    q = InProcessProcessingQueue(fair_quantum=2)
+    for i in range(3):
+        await q.enqueue({"document_id": f"big-{i}"}, fair_key="big", cost=2)
+        await q.enqueue({"document_id": f"small-{i}"}, fair_key="small", cost=1)
+
+    order = [(await q.reserve(timeout_seconds=1)).payload["document_id"] for _ in range(6)]
+    assert order == ["big-0", "small-0", "small-1", "big-1", "small-2", "big-2"]
+
+
+async def _redis_queue_or_skip(**kwargs) -> RedisProcessingQueue:
+    try:
+        q = RedisProcessingQueue(url=settings().redis_url, queue_key=f"test:jobs:{uuid.uuid4()}", **kwargs)
+        await asyncio.wait_for(q._client.ping(), timeout=1)
+    except Exception as e:
+        pytest.skip(f"Redis not available or misconfigured: {e}")
+    return q
+
+
+async def _drop_keys(q: RedisProcessingQueue) -> None:
+    keys = [key async for key in q._client.scan_iter(match=f"{q._queue_key}*")]
+    if keys:
+        await q._client.delete(*keys)
+
+
+@pytest.mark.asyncio
+async def test_redis_queue_heartbeat_fails_once_reaped():
+    """A worker whose lease expired can't re-lease a job the reaper already requeued"""
+    q = await _redis_queue_or_skip(visibility_timeout=0.05, backoff_base=0.01, backoff_max=0.01)
+    try:
+        await q.enqueue({"document_id": "doc-hb"}, fair_key="u")
+        job = await q.reserve(timeout_seconds=1)
+        assert await q.heartbeat(job) is True
+
+        await asyncio.sleep(0.1)
+        await q.reap()
+        assert await q.heartbeat(job) is False
+        assert await q._client.hget(q._leases_key, job.id) is None
+
+        # The delayed retry is promoted back into its lane
+        await asyncio.sleep(0.05)
+        retried = await q.reserve(timeout_seconds=1)
+        assert retried.id == job.id and retried.attempts == 1
+        await q.ack(retried)
+        assert await q.stats() == {"ready": 0, "delayed": 0, "in_flight": 0, "dead": 0}
+    finally:
+        await _drop_keys(q)
+
+
+@pytest.mark.asyncio
+async def test_redis_queue_drains_legacy_list():
+    q = await _redis_queue_or_skip()
+    try:
+        await q._client.lpush(q._queue_key, json.dumps({"document_id": "old", "user_id": "u"}), "not json")
+        job = await q.reserve(timeout_seconds=1)
+        assert job.payload["document_id"] == "old"
+        assert await q._client.llen(q._queue_key) == 0
+    finally:
+        await _drop_keys(q)
@@ -0,0 +1,49 @@
+"""Tests for per-stage document processing limits"""
+import asyncio
+import pytest
+
+from new_backend_ruminate.infrastructure.document_processing.pdf_pool import validate_pdf_file
+from new_backend_ruminate.infrastructure.document_processing.stages import ProcessingStages
+
+
+@pytest.mark.asyncio
+class TestProcessingStages:
+    """Test ProcessingStages"""
+
+    async def test_stages_have_independent_limits(self):
+        """Jobs waiting on Marker don't hold back persistence, and each stage respects its limit"""
+        stages = ProcessingStages(limits={"marker": 3, "persist": 1})
+        release_marker = asyncio.Event()
+        peak = {"marker": 0, "persist": 0}
+
+        async def job(name):
+            async with stages.stage(name):
+                peak[name] = max(peak[name], stages.stats()[name]["active"])
+                if name == "marker":
+                    await release_marker.wait()
+                else:
+                    await asyncio.sleep(0.01)
+
+        markers = [asyncio.create_task(job("marker")) for _ in range(5)]
+        await asyncio.wait_for(asyncio.gather(*(job("persist") for _ in range(3))), timeout=1)
+
+        stats = stages.stats()
+        assert stats["marker"]["active"] == 3 and stats["marker"]["waiting"] == 2
+        assert stats["persist"]["completed"] == 3 and peak["persist"] == 1
+
+        release_marker.set()
+        await asyncio.gather(*markers)
+        assert peak["marker"] == 3
+        assert stages.stats()["marker"]["completed"] == 5
+
+    async def test_validation_runs_in_process_pool(self, tmp_path):
+        stages = ProcessingStages(limits={"validate": 1})
+        bogus = tmp_path / "not-a-pdf.pdf"
+        bogus.write_bytes(b"hello world")
+        try:
+            error = await stages.run_cpu(validate_pdf_file, str(bogus), bogus.name)
+        finally:
+            stages.shutdown()
+
+        assert error is not None and error.startswith("Invalid PDF file")
+        assert stages.stats()["validate"]["completed"] == 1
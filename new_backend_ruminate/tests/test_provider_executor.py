@@ -0,0 +1,80 @@
+"""Tests for concurrent context provider execution"""
+import asyncio
+import time
+import pytest
+from contextlib import asynccontextmanager
+
+from new_backend_ruminate.context.windowed.executor import ProviderExecutor, ProviderSpec
+
+
+@asynccontextmanager
+async def _fake_session_scope():
+    yield object()
+
+
+@pytest.mark.asyncio
+class TestProviderExecutor:
+    """Test ProviderExecutor"""
+
+    async def test_providers_run_concurrently_with_own_sessions(self):
+        """Independent providers overlap and only the shared one sees the caller's session"""
+        caller_session = object()
+        seen = {}
+
+        def provider(name, delay):
+            async def call(session):
+                seen[name] = session
+                await asyncio.sleep(delay)
+                return name
+            return call
+
+        executor = ProviderExecutor(_fake_session_scope)
+        start = time.perf_counter()
+        results = await executor.run([
+            ProviderSpec("a", provider("a", 0.1)),
+            ProviderSpec("b", provider("b", 0.1), shared_session=True),
+            ProviderSpec("c", provider("c", 0.1), timeout=1.0),
+        ], caller_session)
+        elapsed = time.perf_counter() - start
+
+        assert results == {"a": "a", "b": "b", "c": "c"}
+        assert elapsed < 0.25
+        assert seen["b"] is caller_session
+        assert seen["a"] is not caller_session and seen["c"] is not caller_session
+        assert seen["a"] is not seen["c"]
+        assert set(executor.stats) == {"a", "b", "c"}
+        assert executor.stats["a"].calls == 1
+
+    async def test_optional_provider_timeout_and_error_degrade(self):
+        """Slow or failing optional providers return their default"""
+        finished = asyncio.Event()
+
+        async def slow(session):
+            await asyncio.sleep(0.2)
+            finished.set()
+            return "late"
+
+        async def broken(session):
+            raise RuntimeError("boom")
+
+        executor = ProviderExecutor(_fake_session_scope)
+        results = await executor.run([
+            ProviderSpec("slow", slow, timeout=0.05, default="", detach_on_timeout=True),
+            ProviderSpec("broken", broken, timeout=1.0, default=None),
+        ], object())
+
+        assert results == {"slow": "", "broken": None}
+        assert executor.stats["slow"].timeouts == 1
+        assert executor.stats["broken"].errors == 1
+
+        # Detached work keeps running after the build returns
+        await asyncio.wait_for(finished.wait(), timeout=1.0)
+
+    async def test_required_provider_errors_propagate(self):
+        """Required providers (no timeout) raise"""
+        async def broken(session):
+            raise ValueError("required")
+
+        executor = ProviderExecutor(_fake_session_scope)
+        with pytest.raises(ValueError):
+            await executor.run([ProviderSpec("system_prompt", broken)], object())
@@ -0,0 +1,74 @@
+import asyncio
+import uuid
+import pytest
+
+from new_backend_ruminate.infrastructure.sse.redis_stream_hub import RedisStreamHub
+from new_backend_ruminate.config import settings
+
+
+async def _hub_or_skip() -> RedisStreamHub:
+    try:
+        hub = RedisStreamHub(url=settings().redis_url, block_ms=100)
+        await asyncio.wait_for(hub._client.ping(), timeout=1)
+    except Exception as e:
+        pytest.skip(f"Redis not available or misconfigured: {e}")
+    return hub
+
+
+async def _collect(agen):
+    return [item async for item in agen]
+
+
+@pytest.mark.asyncio
+async def test_late_subscriber_replays_full_history():
+    hub = await _hub_or_skip()
+    stream_id = f"test:{uuid.uuid4()}"
+
+    # Published before anyone subscribes
+    await hub.publish(stream_id, "foo ")
+    await hub.publish(stream_id, "bar")
+    await hub.terminate(stream_id)
+
+    events = await asyncio.wait_for(_collect(hub.stream_events(stream_id)), timeout=2)
+    assert [chunk for _, chunk in events] == ["foo ", "bar"]
+
+    # Resuming after the first event id only yields what came after it
+    resumed = await asyncio.wait_for(_collect(hub.stream_events(stream_id, last_event_id=events[0][0])), timeout=2)
+    assert [chunk for _, chunk in resumed] == ["bar"]
+
+    await hub._client.delete(f"sse:{stream_id}")
+
+
+@pytest.mark.asyncio
+async def test_live_fanout_to_multiple_consumers():
+    hub = await _hub_or_skip()
+    stream_id = f"test:{uuid.uuid4()}"
+
+    consumers = [asyncio.create_task(_collect(hub.register_consumer(stream_id))) for _ in range(2)]
+    await asyncio.sleep(0.05)
+    await hub.publish(stream_id, "tok")
+    metrics = await hub.metrics()
+    assert metrics["consumers"] >= 2 and metrics["length"] >= 1
+    assert stream_id not in str(metrics)
+    await hub.terminate(stream_id)
+
+    results = await asyncio.wait_for(asyncio.gather(*consumers), timeout=2)
+    assert results == [["tok"], ["tok"]]
+
+    await hub._client.delete(f"sse:{stream_id}")
+
+
+@pytest.mark.asyncio
+async def test_from_latest_skips_history():
+    hub = await _hub_or_skip()
+    stream_id = f"test:{uuid.uuid4()}"
+
+    await hub.publish(stream_id, "old")
+    consumer = asyncio.create_task(_collect(hub.subscribe(stream_id, from_latest=True)))
+    await asyncio.sleep(0.05)
+    await hub.publish(stream_id, "new")
+    await hub.terminate(stream_id)
+
+    assert await asyncio.wait_for(consumer, timeout=2) == ["new"]
+
+    await hub._client.delete(f"sse:{stream_id}")
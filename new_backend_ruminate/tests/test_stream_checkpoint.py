@@ -0,0 +1,123 @@
+"""Tests for incremental checkpointing of streamed assistant content"""
+import asyncio
+import json
+import uuid
+import pytest
+from sqlalchemy import select
+
+from new_backend_ruminate.config import settings
+from new_backend_ruminate.domain.conversation.entities.conversation import Conversation
+from new_backend_ruminate.domain.conversation.entities.message import Message, MessageStatus, Role
+from new_backend_ruminate.infrastructure.conversation.rds_conversation_repository import RDSConversationRepository
+from new_backend_ruminate.infrastructure.db.bootstrap import session_scope
+from new_backend_ruminate.infrastructure.sse.hub import EventStreamHub
+from new_backend_ruminate.services.conversation.prompt_approval import prompt_approval_service
+from new_backend_ruminate.services.conversation.service import ConversationService
+from new_backend_ruminate.tests.stubs import StubContextBuilder, StubLLM
+
+
+async def _load(message_id):
+    async with session_scope() as session:
+        row = (await session.execute(select(Message.content, Message.status).where(Message.id == message_id))).one()
+    return row.content, row.status
+
+
+class SlowLLM(StubLLM):
+    """Yields tokens slowly, recording what the database held mid-stream"""
+
+    def __init__(self, message_id, fail=False):
+        super().__init__()
+        self.message_id = message_id
+        self.fail = fail
+        self.seen_mid_stream = None
+
+    async def generate_response_stream(self, messages):
+        for token in ["one ", "two "]:
+            yield token
+            await asyncio.sleep(0.1)
+        self.seen_mid_stream = await _load(self.message_id)
+        yield "three "
+        await asyncio.sleep(0.1)
+        if self.fail:
+            raise RuntimeError("provider went away")
+
+
+async def _collect(agen):
+    return [item async for item in agen]
+
+
+async def _placeholder():
+    conv_id, ai_id = str(uuid.uuid4()), str(uuid.uuid4())
+    async with session_scope() as session:
+        session.add(Conversation(id=conv_id))
+        session.add(Message(id=ai_id, conversation_id=conv_id, role=Role.ASSISTANT, version=0,
+                            content="", status=MessageStatus.STREAMING.value))
+        await session.commit()
+    return ai_id
+
+
+@pytest.fixture
+def frequent_checkpoints(monkeypatch):
+    monkeypatch.setattr(settings(), "stream_checkpoint_chars", 1)
+    monkeypatch.setattr(settings(), "stream_coalesce_window_ms", 20)
+
+
+@pytest.mark.asyncio
+class TestStreamCheckpoint:
+    """Test ConversationService._publish_stream checkpointing"""
+
+    async def test_partial_content_is_persisted_while_streaming(self, frequent_checkpoints):
+        ai_id = await _placeholder()
+        llm = SlowLLM(ai_id)
+        svc = ConversationService(RDSConversationRepository(), llm, EventStreamHub(), StubContextBuilder())
+
+        await svc._publish_stream(ai_id, [{"role": "user", "content": "hi"}])
+
+        assert llm.seen_mid_stream == ("one two ", MessageStatus.STREAMING.value)
+        assert await _load(ai_id) == ("one two three ", MessageStatus.COMPLETED.value)
+
+    async def test_failed_stream_keeps_partial_content(self, frequent_checkpoints):
+        ai_id = await _placeholder()
+        hub = EventStreamHub()
+        svc = ConversationService(RDSConversationRepository(), SlowLLM(ai_id, fail=True), hub, StubContextBuilder())
+        consumer = asyncio.create_task(_collect(hub.register_consumer(ai_id)))
+        await asyncio.sleep(0)
+
+        with pytest.raises(RuntimeError):
+            await svc._publish_stream(ai_id, [{"role": "user", "content": "hi"}])
+
+        # The client is told the stream failed and is released
+        chunks = await asyncio.wait_for(consumer, timeout=1)
+        assert json.loads(chunks[-2])["type"] == "stream_error"
+        assert chunks[-1] == "[DONE]"
+        assert hub.stream_metrics(ai_id) is None
+        assert ai_id not in hub._policies
+
+        assert await _load(ai_id) == ("one two three ", MessageStatus.FAILED.value)
+
+    async def test_cancelled_stream_marks_message_failed(self, frequent_checkpoints):
+        ai_id = await _placeholder()
+        svc = ConversationService(RDSConversationRepository(), SlowLLM(ai_id), EventStreamHub(), StubContextBuilder())
+
+        task = asyncio.create_task(svc._publish_stream(ai_id, [{"role": "user", "content": "hi"}]))
+        await asyncio.sleep(0.15)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        content, status = await _load(ai_id)
+        assert status == MessageStatus.FAILED.value
+        assert content.startswith("one ")
+
+    async def test_rejected_prompt_marks_message_failed(self, monkeypatch):
+        ai_id = await _placeholder()
+        svc = ConversationService(RDSConversationRepository(), SlowLLM(ai_id), EventStreamHub(), StubContextBuilder())
+
+        async def reject(approval_id):
+            raise RuntimeError("Prompt rejected: too long")
+
+        monkeypatch.setattr(prompt_approval_service, "wait_for_approval", reject)
+
+        await svc._publish_stream(ai_id, [{"role": "user", "content": "hi"}], debug_mode=True)
+
+        assert await _load(ai_id) == ("", MessageStatus.FAILED.value)
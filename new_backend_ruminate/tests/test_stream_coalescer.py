@@ -0,0 +1,51 @@
+"""Tests for LLM token coalescing"""
+import asyncio
+import pytest
+
+from new_backend_ruminate.infrastructure.sse.coalesce import coalesce_stream
+
+
+async def _tokens(items, delay=0.0):
+    for item in items:
+        if delay:
+            await asyncio.sleep(delay)
+        yield item
+
+
+async def _collect(agen):
+    return [chunk async for chunk in agen]
+
+
+@pytest.mark.asyncio
+class TestCoalesceStream:
+    """Test coalesce_stream"""
+
+    async def test_first_token_passes_through_and_rest_is_batched(self):
+        chunks = await _collect(coalesce_stream(_tokens(["a", "b", "c", "d"]), window_ms=1000, max_chars=100))
+        assert chunks == ["a", "bcd"]
+
+    async def test_size_threshold_flushes(self):
+        chunks = await _collect(coalesce_stream(_tokens(["x"] + ["ab"] * 5), window_ms=1000, max_chars=4))
+        assert chunks == ["x", "abab", "abab", "ab"]
+
+    async def test_window_flushes_while_source_is_stalled(self):
+        """Buffered text is emitted after the window even if no further token arrives"""
+        async def source():
+            yield "first"
+            yield "buffered"
+            await asyncio.sleep(0.3)
+            yield "late"
+
+        received = []
+        start = asyncio.get_running_loop().time()
+        async for chunk in coalesce_stream(source(), window_ms=20, max_chars=100):
+            received.append((chunk, asyncio.get_running_loop().time() - start))
+
+        assert [c for c, _ in received] == ["first", "buffered", "late"]
+        assert received[1][1] < 0.2
+
+    async def test_json_events_flush_text_and_keep_order(self):
+        event = '{"type": "tool_use"}'
+        chunks = await _collect(coalesce_stream(_tokens([event, "a", "b", "c", event, "d"]), window_ms=1000, max_chars=100))
+        assert chunks == [event, "a", "bc", event, "d"]
+        assert "".join(c for c in chunks if c != event) == "abcd"
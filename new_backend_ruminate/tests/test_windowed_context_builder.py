@@ -20,7 +20,9 @@ from new_backend_ruminate.infrastructure.document.rds_document_repository import
 @pytest.fixture
 def mock_doc_repo():
     """Mock document repository for testing"""
-    return AsyncMock(spec=RDSDocumentRepository)
+    repo = AsyncMock(spec=RDSDocumentRepository)
+    repo.get_block_page_numbers.return_value = {}
+    return repo
 
 
 @pytest.fixture
@@ -129,6 +131,7 @@ class TestPageRangeProvider:
         """Test that chat conversations derive page from latest user message"""
         # Setup mocks
         mock_doc_repo.get_block.return_value = sample_block
+        mock_doc_repo.get_block_page_numbers.return_value = {"block-456": 5}
         mock_doc_repo.get_pages_in_range.return_value = sample_pages
         
         provider = PageRangeProvider(mock_doc_repo, page_radius=1)
@@ -141,7 +144,7 @@ class TestPageRangeProvider:
         )
         
         # Should derive page 5 from block-456 in latest user message
-        mock_doc_repo.get_block.assert_called_with("block-456", mock_session)
+        mock_doc_repo.get_block_page_numbers.assert_called_with(["block-456"], mock_session)
         mock_doc_repo.get_pages_in_range.assert_called_with("doc-123", 5, 1, mock_session)
         
         # Should format pages with current page marker
@@ -153,6 +156,7 @@ class TestPageRangeProvider:
         """Test that rabbithole conversations use fixed source_block_id"""
         # Setup mocks - same block but different user message block
         mock_doc_repo.get_block.return_value = sample_block
+        mock_doc_repo.get_block_page_numbers.return_value = {"block-456": 5}
         mock_doc_repo.get_pages_in_range.return_value = sample_pages
         
         # Modify thread to have user looking at different block
@@ -169,7 +173,7 @@ class TestPageRangeProvider:
         )
         
         # Should still use source_block_id from conversation, NOT latest message
-        mock_doc_repo.get_block.assert_called_with("block-456", mock_session)
+        mock_doc_repo.get_block_page_numbers.assert_called_with(["block-456"], mock_session)
         mock_doc_repo.get_pages_in_range.assert_called_with("doc-123", 5, 1, mock_session) 
         
         assert "--- Page 5 (CURRENT) ---" in result
@@ -183,6 +187,7 @@ class TestPageRangeProvider:
         ]
         
         mock_doc_repo.get_block.return_value = sample_block
+        mock_doc_repo.get_block_page_numbers.return_value = {"block-456": 5}
         mock_doc_repo.get_pages_in_range.return_value = pages_range
         
         provider = PageRangeProvider(mock_doc_repo, page_radius=2)
@@ -313,6 +318,7 @@ class TestWindowedContextBuilder:
         # Setup all mocks
         mock_doc_repo.get_document.return_value = sample_document
         mock_doc_repo.get_block.return_value = sample_block
+        mock_doc_repo.get_block_page_numbers.return_value = {"block-456": 5}
         mock_doc_repo.get_pages_in_range.return_value = sample_pages
         
         builder = WindowedContextBuilder(mock_doc_repo, page_radius=1)
@@ -342,6 +348,7 @@ class TestWindowedContextBuilder:
         # Setup all mocks
         mock_doc_repo.get_document.return_value = sample_document  
         mock_doc_repo.get_block.return_value = sample_block
+        mock_doc_repo.get_block_page_numbers.return_value = {"block-456": 5}
         mock_doc_repo.get_pages_in_range.return_value = sample_pages
         
         mock_session = AsyncMock()
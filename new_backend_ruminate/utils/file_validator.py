@@ -6,7 +6,8 @@ file structure validation, and size limits.
 
 import magic
 import PyPDF2
-from typing import Optional, Tuple
+import os
+from typing import BinaryIO, Optional, Tuple
 from fastapi import HTTPException, UploadFile
 import io
 
@@ -23,6 +24,9 @@ class PDFValidator:
     MAX_FILE_SIZE = 100 * 1024 * 1024  # 100MB
     MIN_FILE_SIZE = 1024  # 1KB minimum
     
+    # Bytes read for MIME and signature checks when validating from disk
+    HEADER_BYTES = 8192
+    
     # Allowed MIME types for PDF files
     ALLOWED_MIME_TYPES = {
         'application/pdf',
@@ -106,6 +110,36 @@ class PDFValidator:
         except Exception as e:
             return False, f"File validation error: {str(e)}"
     
+    @classmethod
+    def validate_path(cls, path: str, filename: Optional[str] = None) -> Tuple[bool, Optional[str]]:
+        """Validate a PDF on disk without loading it: only the header and the
+        regions PyPDF2 needs for the structure check are read.
+        Returns (is_valid, error_message)."""
+        try:
+            # 1. File size
+            file_size = os.path.getsize(path)
+            if not cls.MIN_FILE_SIZE <= file_size <= cls.MAX_FILE_SIZE:
+                return False, f"File size must be between {cls.MIN_FILE_SIZE} bytes and {cls.MAX_FILE_SIZE} bytes"
+            # 2. Optional extension hint
+            if filename is not None and not cls._validate_file_extension(filename):
+                return False, "File must have a .pdf extension"
+            with open(path, 'rb') as f:
+                header = f.read(cls.HEADER_BYTES)
+                # 3. MIME
+                if not cls._validate_mime_type(header):
+                    return False, "File is not a valid PDF (MIME type check failed)"
+                # 4. Signature
+                if not cls._validate_pdf_signature(header):
+                    return False, "File is not a valid PDF (signature check failed)"
+                # 5. Structure
+                f.seek(0)
+                structure_valid, structure_error = cls._validate_pdf_stream(f)
+            if not structure_valid:
+                return False, f"Invalid PDF structure: {structure_error}"
+            return True, None
+        except Exception as e:
+            return False, f"File validation error: {str(e)}"
+    
     @classmethod
     def _validate_file_size(cls, file_content: bytes) -> bool:
         """Validate file size is within acceptable limits"""
@@ -145,12 +179,14 @@ class PDFValidator:
     @classmethod
     def _validate_pdf_structure(cls, file_content: bytes) -> Tuple[bool, Optional[str]]:
         """Validate PDF internal structure using PyPDF2"""
+        return cls._validate_pdf_stream(io.BytesIO(file_content))
+    
+    @classmethod
+    def _validate_pdf_stream(cls, pdf_stream: BinaryIO) -> Tuple[bool, Optional[str]]:
+        """Validate PDF internal structure from a seekable stream using PyPDF2"""
         try:
-            # Create a BytesIO object from file content
-            pdf_buffer = io.BytesIO(file_content)
-            
             # Try to read PDF with PyPDF2
-            pdf_reader = PyPDF2.PdfReader(pdf_buffer)
+            pdf_reader = PyPDF2.PdfReader(pdf_stream)
             
             # Basic structure checks
             if len(pdf_reader.pages) == 0:
@@ -221,7 +257,7 @@ class SecurityScanner:
         Scan PDF content for dangerous patterns that should always be blocked
         
         Args:
-            file_content: PDF file content as bytes
+            file_content: PDF file content as bytes, or an mmap of the file
             
         Returns:
             Tuple of (has_dangerous_content, list_of_found_patterns)
@@ -229,7 +265,7 @@ class SecurityScanner:
         found_patterns = []
         
         for pattern in cls.DANGEROUS_PATTERNS:
-            if pattern in file_content:
+            if file_content.find(pattern) != -1:
                 found_patterns.append(pattern.decode('utf-8', errors='ignore'))
         
         return len(found_patterns) > 0, found_patterns
@@ -240,7 +276,7 @@ class SecurityScanner:
         Scan PDF content for suspicious patterns (informational only)
         
         Args:
-            file_content: PDF file content as bytes
+            file_content: PDF file content as bytes, or an mmap of the file
             
         Returns:
             Tuple of (has_suspicious_content, list_of_found_patterns)
@@ -248,7 +284,7 @@ class SecurityScanner:
         found_patterns = []
         
         for pattern in cls.SUSPICIOUS_PATTERNS:
-            if pattern in file_content:
+            if file_content.find(pattern) != -1:
                 found_patterns.append(pattern.decode('utf-8', errors='ignore'))
         
         return len(found_patterns) > 0, found_patterns
@@ -259,7 +295,7 @@ class SecurityScanner:
         Determine if PDF is safe based on content analysis
         
         Args:
-            file_content: PDF file content as bytes
+            file_content: PDF file content as bytes, or an mmap of the file
             
         Returns:
             Tuple of (is_safe, warning_message)
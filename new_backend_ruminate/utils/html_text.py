@@ -0,0 +1,27 @@
+# new_backend_ruminate/utils/html_text.py
+"""
+Shared HTML-to-plain-text extraction for document blocks.
+
+Block text is extracted once at ingest and stored in blocks.plain_text;
+readers should prefer that column and only fall back to extracting from
+html_content for rows that predate it.
+"""
+import re
+from typing import Any, Optional
+
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def html_to_text(html_content: Optional[str]) -> str:
+    """Strip HTML tags and collapse whitespace"""
+    if not html_content:
+        return ""
+    return ' '.join(_TAG_RE.sub(' ', html_content).split())
+
+
+def block_plain_text(block: Any) -> str:
+    """Return a block's precomputed plain text, extracting it from HTML if missing"""
+    plain_text = getattr(block, "plain_text", None)
+    if isinstance(plain_text, str):
+        return plain_text
+    return html_to_text(getattr(block, "html_content", None))
@@ -33,57 +33,109 @@ async def run_worker() -> None:
     # Import dependencies only after env is loaded and engine initialized
     from new_backend_ruminate.dependencies import (
         get_document_service,
+        get_event_publisher,
+        get_marker_client,
         get_processing_queue,
     )
 
     document_service = get_document_service()
     queue = get_processing_queue()
+    marker_client = get_marker_client()
+    await marker_client.start(notifications=get_event_publisher())
 
-    # Concurrency and memory guard
-    max_concurrency = int(os.getenv("WORKER_MAX_CONCURRENCY", "2"))
+    # Concurrency and memory guard. Jobs in flight are cheap while they wait
+    # on Marker; per-stage limits (ProcessingStages) bound the real work.
+    max_concurrency = int(os.getenv("WORKER_MAX_CONCURRENCY", str(settings().processing_max_in_flight)))
     mem_pause_pct = float(os.getenv("WORKER_MEMORY_PAUSE_PCT", "85"))
     sem = asyncio.Semaphore(max_concurrency)
 
-    async def process_job(job: dict) -> None:
+    cfg = settings()
+
+    async def keep_alive(job) -> None:
+        # Renew the lease so a long Marker run isn't mistaken for a dead worker
+        while True:
+            await asyncio.sleep(cfg.queue_heartbeat_interval)
+            try:
+                if not await queue.heartbeat(job):
+                    logger.warning(f"Lost lease on job {job.id}; it may be processed again")
+                    return
+            except Exception as e:
+                logger.warning(f"Heartbeat failed for job {job.id}: {e}")
+
+    async def bury(job) -> None:
+        document_id = job.payload.get("document_id")
+        logger.error(f"Job {job.id} dead-lettered after {job.attempts} attempts: {job.last_error}")
+        if document_id:
+            await document_service.mark_processing_failed(
+                document_id, f"Processing failed after {job.attempts} attempts: {job.last_error}"
+            )
+
+    async def process_job(job) -> None:
+        heartbeat = asyncio.create_task(keep_alive(job))
         try:
-            document_id = job.get("document_id")
-            storage_key = job.get("storage_key")
+            document_id = job.payload.get("document_id")
+            storage_key = job.payload.get("storage_key")
             if not document_id or not storage_key:
-                logger.error(f"Invalid job payload: {job}")
+                logger.error(f"Invalid job payload: {job.payload}")
+                await queue.ack(job)
                 return
-            logger.info(f"Processing document job: document_id={document_id}")
-            await document_service._process_document_background(document_id, storage_key)  # noqa: SLF001
+            logger.info(f"Processing document job: document_id={document_id} attempt={job.attempts + 1}")
+            # Failures raise, so they are nacked, retried with backoff and dead-lettered
+            await document_service.process_document(document_id, storage_key)
+            await queue.ack(job)
         except Exception as e:
             logger.exception(f"Worker job error: {e}")
+            try:
+                if await queue.nack(job, str(e)):
+                    await bury(job.retried(str(e)))
+            except Exception:
+                logger.exception(f"Failed to nack job {job.id}")
         finally:
+            heartbeat.cancel()
             sem.release()
 
+    async def reaper() -> None:
+        # Requeue jobs whose worker died mid-processing (e.g. OOM-killed)
+        while True:
+            try:
+                for job in await queue.reap():
+                    await bury(job)
+            except Exception as e:
+                logger.exception(f"Reaper error: {e}")
+            await asyncio.sleep(cfg.queue_reap_interval)
+
+    reaper_task = asyncio.create_task(reaper())
+
     logger.info(
         f"Worker started. max_concurrency={max_concurrency}, mem_pause_pct={mem_pause_pct}%"
     )
 
-    while True:
-        try:
-            # Memory guard: pause dequeuing if system memory is high
-            vm = psutil.virtual_memory()
-            if vm and vm.percent >= mem_pause_pct:
-                await asyncio.sleep(0.5)
-                continue
-
-            # Acquire a slot before dequeuing to apply backpressure
-            await sem.acquire()
-
-            job = await queue.dequeue(timeout_seconds=2)
-            if not job:
-                sem.release()
-                await asyncio.sleep(0.1)
-                continue
-
-            # Process concurrently up to semaphore limit
-            asyncio.create_task(process_job(job))
-        except Exception as e:
-            logger.exception(f"Worker loop error: {e}")
-            await asyncio.sleep(1)
+    try:
+        while True:
+            try:
+                # Memory guard: pause dequeuing if system memory is high
+                vm = psutil.virtual_memory()
+                if vm and vm.percent >= mem_pause_pct:
+                    await asyncio.sleep(0.5)
+                    continue
+
+                # Acquire a slot before dequeuing to apply backpressure
+                await sem.acquire()
+
+                job = await queue.reserve(timeout_seconds=2)
+                if not job:
+                    sem.release()
+                    await asyncio.sleep(0.1)
+                    continue
+
+                # Process concurrently up to semaphore limit
+                asyncio.create_task(process_job(job))
+            except Exception as e:
+                logger.exception(f"Worker loop error: {e}")
+                await asyncio.sleep(1)
+    finally:
+        reaper_task.cancel()
+        await marker_client.close()
 
 
 if __name__ == "__main__":